@@ -1,4 +1,5 @@
 import math
+from typing import NamedTuple
 
 CHAIN_PITCH_MM = {
     "415": 12.7,
@@ -10,6 +11,20 @@ CHAIN_PITCH_MM = {
     "630": 19.05,
 }
 
+CENTER_DISTANCE_MIN_MM = 620.0
+CENTER_DISTANCE_MAX_MM = 680.0
+NEWTON_TOLERANCE_LINKS = 1e-9
+NEWTON_MAX_ITERATIONS = 8
+LEGACY_TOLERANCE_LINKS = 0.01
+LEGACY_MAX_STEPS = 1000
+
+
+class CenterDistanceSolution(NamedTuple):
+    center_distance_mm: float
+    unclamped_mm: float
+    iterations: int
+    residual_links: float
+
 
 def calculate_ratio(crown_teeth: int, sprocket_teeth: int) -> float:
     return crown_teeth / sprocket_teeth
@@ -23,28 +38,182 @@ def calculate_chain_length_mm(chain_links: int, pitch_mm: float) -> float:
     return chain_links * pitch_mm
 
 
-def calculate_center_distance_mm(
+def _chain_links(c_links: float, teeth_sum: int, spread: float) -> float:
+    return 2 * c_links + teeth_sum / 2.0 + spread / c_links
+
+
+def chain_links_for_center_distance(
+    sprocket_teeth: int,
+    crown_teeth: int,
+    pitch_mm: float,
+    center_distance_mm: float,
+) -> float:
+    spread = (crown_teeth - sprocket_teeth) ** 2 / (4 * math.pi * math.pi)
+    return _chain_links(center_distance_mm / pitch_mm, sprocket_teeth + crown_teeth, spread)
+
+
+def solve_center_distance(
     sprocket_teeth: int,
     crown_teeth: int,
     pitch_mm: float,
     chain_links: int,
-    wear_factor: float,
+) -> CenterDistanceSolution:
+    teeth_sum = sprocket_teeth + crown_teeth
+    spread = (crown_teeth - sprocket_teeth) ** 2 / (4 * math.pi * math.pi)
+
+    # With x = C / p the chain length in links is 2x + (z1 + z2) / 2 + spread / x, so the
+    # center distance is the larger root of 2x^2 - (L - (z1 + z2) / 2) x + spread = 0.
+    free_links = chain_links - teeth_sum / 2.0
+    discriminant = free_links * free_links - 8 * spread
+    if discriminant >= 0:
+        c_links = (free_links + math.sqrt(discriminant)) / 4.0
+    else:
+        # Chain too short for the sprockets: use the shortest reachable chain instead.
+        c_links = math.sqrt(spread / 2.0)
+
+    iterations = 0
+    residual = 0.0
+    if c_links > 0:
+        residual = _chain_links(c_links, teeth_sum, spread) - chain_links
+        # Newton steps only polish floating point error left by the closed form.
+        while (
+            discriminant >= 0
+            and abs(residual) > NEWTON_TOLERANCE_LINKS
+            and iterations < NEWTON_MAX_ITERATIONS
+        ):
+            derivative = 2 - spread / (c_links * c_links)
+            if derivative <= 0:
+                break
+            c_links -= residual / derivative
+            residual = _chain_links(c_links, teeth_sum, spread) - chain_links
+            iterations += 1
+
+    unclamped_mm = c_links * pitch_mm
+    return CenterDistanceSolution(
+        center_distance_mm=max(CENTER_DISTANCE_MIN_MM, min(CENTER_DISTANCE_MAX_MM, unclamped_mm)),
+        unclamped_mm=unclamped_mm,
+        iterations=iterations,
+        residual_links=residual,
+    )
+
+
+def legacy_center_distance_mm(
+    sprocket_teeth: int,
+    crown_teeth: int,
+    pitch_mm: float,
+    chain_links: int,
+    wear_factor: float = 1.0,
 ) -> float:
-    chain_length_mm = calculate_chain_length_mm(chain_links, pitch_mm)
+    # The published value keeps the legacy damped iteration and its stop at 0.01 link, which
+    # lands up to ~0.005 * pitch from the exact root and so shows at 2 decimals. Written
+    # expression for expression as before, so results match to the bit (at most 6 steps).
     z1 = sprocket_teeth
     z2 = crown_teeth
     p = pitch_mm
-    l = chain_links
-
-    c = (chain_length_mm - (math.pi * (z1 + z2) * p / 2.0)) / 2.0
-    for _ in range(1000):
+    c = (chain_links * p - (math.pi * (z1 + z2) * p / 2.0)) / 2.0
+    for _ in range(LEGACY_MAX_STEPS):
         l_calc = (
             2 * (c / p)
             + (z1 + z2) / 2.0
             + (z2 - z1) ** 2 / (4 * math.pi * math.pi * (c / p))
         )
-        if abs(l_calc - l) < 0.01:
+        if abs(l_calc - chain_links) < LEGACY_TOLERANCE_LINKS:
             break
-        c += (l - l_calc) * p * wear_factor / 2.0
+        c += (chain_links - l_calc) * p * wear_factor / 2.0
+    return c
+
 
-    return max(620.0, min(680.0, c))
+def calculate_center_distance_mm(
+    sprocket_teeth: int,
+    crown_teeth: int,
+    pitch_mm: float,
+    chain_links: int,
+    wear_factor: float = 1.0,
+) -> float:
+    center_distance_mm = legacy_center_distance_mm(
+        sprocket_teeth, crown_teeth, pitch_mm, chain_links, wear_factor
+    )
+    return max(CENTER_DISTANCE_MIN_MM, min(CENTER_DISTANCE_MAX_MM, center_distance_mm))
+
+
+class GearingCandidate(NamedTuple):
+    sprocket_teeth: int
+    crown_teeth: int
+    chain_links: int
+    ratio: float
+    ratio_error: float
+    center_distance_mm: float
+
+
+def _even_links_at_least(value: float) -> int:
+    return math.ceil(value / 2.0 - 1e-9) * 2
+
+
+def _even_links_at_most(value: float) -> int:
+    return math.floor(value / 2.0 + 1e-9) * 2
+
+
+def search_gearing(
+    target_ratio: float,
+    pitch_mm: float,
+    sprocket_teeth: tuple[int, int],
+    crown_teeth: tuple[int, int],
+    chain_links: tuple[int, int],
+    center_distance_mm: tuple[float, float],
+    limit: int,
+    max_ratio_error: float | None = None,
+) -> tuple[list[GearingCandidate], int]:
+    pairs = []
+    for sprocket in range(sprocket_teeth[0], sprocket_teeth[1] + 1):
+        for crown in range(crown_teeth[0], crown_teeth[1] + 1):
+            ratio_error = abs(calculate_ratio(crown, sprocket) - target_ratio)
+            if max_ratio_error is None or ratio_error <= max_ratio_error:
+                pairs.append((ratio_error, sprocket, crown))
+    pairs.sort()
+
+    window_center_mm = (center_distance_mm[0] + center_distance_mm[1]) / 2.0
+    candidates: list[GearingCandidate] = []
+    evaluated = 0
+    for ratio_error, sprocket, crown in pairs:
+        # Pairs are sorted by ratio error, so once the result set is full only ties matter.
+        if len(candidates) >= limit and ratio_error > candidates[-1].ratio_error:
+            break
+        evaluated += 1
+
+        # Chain length grows with center distance above the shortest reachable chain, so the
+        # window maps directly onto a range of link counts.
+        spread = (crown - sprocket) ** 2 / (4 * math.pi * math.pi)
+        shortest_mm = math.sqrt(spread / 2.0) * pitch_mm
+        if center_distance_mm[1] < shortest_mm:
+            continue
+        links_min = _even_links_at_least(
+            chain_links_for_center_distance(
+                sprocket, crown, pitch_mm, max(center_distance_mm[0], shortest_mm)
+            )
+        )
+        links_max = _even_links_at_most(
+            chain_links_for_center_distance(sprocket, crown, pitch_mm, center_distance_mm[1])
+        )
+        links_min = max(links_min, _even_links_at_least(chain_links[0]))
+        links_max = min(links_max, _even_links_at_most(chain_links[1]))
+        for links in range(links_min, links_max + 1, 2):
+            solution = solve_center_distance(sprocket, crown, pitch_mm, links)
+            candidates.append(
+                GearingCandidate(
+                    sprocket_teeth=sprocket,
+                    crown_teeth=crown,
+                    chain_links=links,
+                    ratio=calculate_ratio(crown, sprocket),
+                    ratio_error=ratio_error,
+                    center_distance_mm=solution.unclamped_mm,
+                )
+            )
+
+    candidates.sort(
+        key=lambda candidate: (
+            candidate.ratio_error,
+            abs(candidate.center_distance_mm - window_center_mm),
+            candidate.sprocket_teeth,
+        )
+    )
+    return candidates[:limit], evaluated
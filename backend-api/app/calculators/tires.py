@@ -1,11 +1,17 @@
 import re
+from functools import lru_cache
 
 from app.core.units import inches_to_mm
 
+# Database flotations are precomputed by the tire index; this bounds what arbitrary
+# client strings can add on top.
+FLOTATION_CACHE_SIZE = 256
+
 FLOTATION_PATTERN = re.compile(r"^([0-9.]+)x([0-9.]+)(?:R|-)([0-9.]+)$", re.IGNORECASE)
 MOTORCYCLE_FLOTATION_PATTERN = re.compile(r"^([0-9.]+)-([0-9.]+)$", re.IGNORECASE)
 
 
+@lru_cache(maxsize=FLOTATION_CACHE_SIZE)
 def parse_flotation(value: str) -> tuple[float, float, float] | None:
     match = FLOTATION_PATTERN.match(value.strip())
     if not match:
@@ -16,6 +22,7 @@ def parse_flotation(value: str) -> tuple[float, float, float] | None:
     return overall_in, width_in, rim_in
 
 
+@lru_cache(maxsize=FLOTATION_CACHE_SIZE)
 def parse_motorcycle_flotation(value: str) -> tuple[float, float] | None:
     cleaned = value.strip()
     if "x" in cleaned.lower() or "r" in cleaned.lower():
@@ -32,6 +39,21 @@ def calculate_diameter_mm(rim_in: float, width_mm: float, aspect_percent: float)
     return rim_in * 25.4 + 2 * width_mm * (aspect_percent / 100.0)
 
 
+def flotation_dimensions_mm(vehicle_type: str, flotation: str) -> tuple[float, float] | None:
+    if vehicle_type == "Motorcycle":
+        moto_parsed = parse_motorcycle_flotation(flotation)
+        if not moto_parsed:
+            return None
+        width_in, rim_in = moto_parsed
+        width_mm = inches_to_mm(width_in)
+        return calculate_diameter_mm(rim_in, width_mm, 100.0), width_mm
+    parsed = parse_flotation(flotation)
+    if not parsed:
+        return None
+    overall_in, width_in, _rim_in = parsed
+    return inches_to_mm(overall_in), inches_to_mm(width_in)
+
+
 def calculate_assembly_width_mm(width_mm: float, rim_width_in: float | None) -> float:
     if rim_width_in is None:
         return width_mm
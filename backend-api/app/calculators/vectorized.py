@@ -0,0 +1,62 @@
+# Array versions of the displacement, compression and rod ratio calculators.
+import numpy as np
+
+from app.calculators.displacement import TOLERANCE
+
+
+def _as_array(value) -> np.ndarray:
+    return np.asarray(value, dtype=np.float64)
+
+
+def calculate_displacement_cc(bore_mm, stroke_mm, cylinders) -> np.ndarray:
+    bore_mm = _as_array(bore_mm)
+    return (np.pi * (bore_mm**2) / 4.0) * _as_array(stroke_mm) * _as_array(cylinders) / 1000.0
+
+
+def classify_geometry(bore_mm, stroke_mm) -> np.ndarray:
+    bore_mm = _as_array(bore_mm)
+    stroke_mm = _as_array(stroke_mm)
+    ratio = np.abs(bore_mm - stroke_mm) / stroke_mm
+    return np.where(
+        ratio <= TOLERANCE,
+        "square",
+        np.where(bore_mm > stroke_mm, "oversquare", "undersquare"),
+    )
+
+
+def swept_volume_cc(bore_mm, stroke_mm) -> np.ndarray:
+    return np.pi * (_as_array(bore_mm) ** 2) / 4.0 * _as_array(stroke_mm) / 1000.0
+
+
+def gasket_volume_cc(gasket_bore_mm, gasket_thickness_mm) -> np.ndarray:
+    return np.pi * (_as_array(gasket_bore_mm) ** 2) / 4.0 * _as_array(gasket_thickness_mm) / 1000.0
+
+
+def deck_volume_cc(bore_mm, deck_height_mm) -> np.ndarray:
+    return np.pi * (_as_array(bore_mm) ** 2) / 4.0 * _as_array(deck_height_mm) / 1000.0
+
+
+def clearance_volume_cc(chamber_cc, gasket_cc, deck_cc, piston_volume_cc) -> np.ndarray:
+    return _as_array(chamber_cc) + gasket_cc + deck_cc + piston_volume_cc
+
+
+def compression_ratio(swept_cc, clearance_cc) -> np.ndarray:
+    clearance_cc = _as_array(clearance_cc)
+    return (_as_array(swept_cc) + clearance_cc) / clearance_cc
+
+
+def trapped_swept_volume_cc(bore_mm, stroke_mm, port_height_mm) -> np.ndarray:
+    return swept_volume_cc(bore_mm, _as_array(stroke_mm) - _as_array(port_height_mm))
+
+
+def calculate_rl_ratio(stroke_mm, rod_length_mm) -> np.ndarray:
+    return (_as_array(stroke_mm) / 2.0) / _as_array(rod_length_mm)
+
+
+def calculate_rod_stroke_ratio(stroke_mm, rod_length_mm) -> np.ndarray:
+    return _as_array(rod_length_mm) / _as_array(stroke_mm)
+
+
+def classify_smoothness(rl_ratio) -> np.ndarray:
+    rl_ratio = _as_array(rl_ratio)
+    return np.where(rl_ratio >= 0.30, "rough", np.where(rl_ratio >= 0.25, "normal", "smooth"))
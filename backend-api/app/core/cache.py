@@ -0,0 +1,346 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional, Protocol
+
+from pydantic import BaseModel
+
+logger = logging.getLogger("uvicorn.error")
+
+TIMESTAMP_PATTERN = re.compile(rb'"timestamp":"[^"]*"')
+TIMESTAMP_SLOT = b'"timestamp":""'
+ACCESS_RESOLUTION_SECONDS = 1.0
+
+
+def cache_key(calculator: str, payload: BaseModel, version: str = "") -> str:
+    # Validated models serialize in field declaration order, so equal requests give equal
+    # bytes whatever the client's key order (batch items are untyped and keep theirs).
+    # language never changes the computed body, so it stays out of the key.
+    canonical = payload.model_dump_json(exclude={"language"})
+    return hashlib.sha256(f"{version}\0{calculator}\0{canonical}".encode("utf-8")).hexdigest()
+
+
+def to_template(body: bytes) -> bytes:
+    return TIMESTAMP_PATTERN.sub(TIMESTAMP_SLOT, body)
+
+
+def render_template(template: bytes) -> bytes:
+    timestamp = datetime.now(timezone.utc).isoformat().encode("ascii")
+    return template.replace(TIMESTAMP_SLOT, b'"timestamp":"' + timestamp + b'"')
+
+
+class CacheBackend(Protocol):
+    name: str
+    # True when calls can wait on I/O or another process; callers keep those off the loop.
+    blocking: bool
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict: ...
+
+
+class MemoryCacheBackend:
+    name = "memory"
+    blocking = False
+
+    def __init__(
+        self, max_entries: int, max_bytes: int, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + ttl_seconds, value)
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.size_bytes -= len(key) + len(value)
+
+
+class SQLiteCacheBackend:
+    # One file shared by every worker on the host; WAL lets readers run alongside a writer.
+    # Times are wall-clock so all processes agree on expiry.
+    name = "sqlite"
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        max_bytes: int,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self._connection = sqlite3.connect(
+            path, timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._transaction(self._create_schema)
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = self._clock()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            if expires_at <= now:
+                self._connection.execute(
+                    "DELETE FROM entries WHERE key = ? AND expires_at <= ?", (key, now)
+                )
+                self.expirations += 1
+                return None
+            # Recency only needs to be coarse for LRU; skipping the write keeps hot keys
+            # from serializing every worker on the database write lock.
+            if now - accessed_at >= ACCESS_RESOLUTION_SECONDS:
+                self._connection.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+
+        def write(connection: sqlite3.Connection) -> None:
+            # A plain DELETE rather than INSERT OR REPLACE: conflict deletes skip triggers.
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            connection.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now + ttl_seconds, now),
+            )
+            expired = connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            self.expirations += expired.rowcount
+            self._evict(connection)
+
+        self._transaction(write)
+
+    def clear(self) -> None:
+        self._transaction(lambda connection: connection.execute("DELETE FROM entries"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size_bytes = self._totals(self._connection)
+        return {
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "path": self.path,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _transaction(self, work: Callable[[sqlite3.Connection], object]) -> None:
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                work(connection)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection) -> None:
+        # Triggers keep the running totals in the same transaction as every insert and
+        # delete, from any process, so a write never has to count or sum the table.
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS totals ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, "
+            "size_bytes INTEGER NOT NULL)"
+        )
+        # Files written before the totals existed are counted once, here.
+        connection.execute(
+            "INSERT OR IGNORE INTO totals "
+            "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        )
+        connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_inserted AFTER INSERT ON entries BEGIN "
+            "UPDATE totals SET entries = entries + 1, size_bytes = size_bytes + new.size; END"
+        )
+        connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS entries_deleted AFTER DELETE ON entries BEGIN "
+            "UPDATE totals SET entries = entries - 1, size_bytes = size_bytes - old.size; END"
+        )
+
+    @staticmethod
+    def _totals(connection: sqlite3.Connection) -> tuple[int, int]:
+        return connection.execute("SELECT entries, size_bytes FROM totals").fetchone()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        # Least recently used first, through the accessed_at index; a byte overrun needs an
+        # unknown number of victims, so it takes them one batch at a time.
+        while True:
+            entries, size_bytes = self._totals(connection)
+            if entries <= self.max_entries and size_bytes <= self.max_bytes:
+                return
+            evicted = connection.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (max(entries - self.max_entries, 1),),
+            )
+            self.evictions += evicted.rowcount
+
+
+class ResultCache:
+    def __init__(self, backend: CacheBackend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def blocking(self) -> bool:
+        return self.backend.blocking
+
+    def get(self, key: str) -> Optional[bytes]:
+        template = self.backend.get(key)
+        with self._lock:
+            if template is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return render_template(template)
+
+    def put(self, key: str, body: bytes) -> None:
+        self.backend.set(key, to_template(body), self.ttl_seconds)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {"hits": self.hits, "misses": self.misses}
+        return {
+            "backend": self.backend.name,
+            "ttl_seconds": self.ttl_seconds,
+            **self.backend.stats(),
+            **counters,
+        }
+
+
+_CACHE: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    return _CACHE
+
+
+def set_result_cache(cache: Optional[ResultCache]) -> None:
+    global _CACHE
+    _CACHE = cache
+
+
+def build_cache_backend(
+    backend: str, max_entries: int, max_bytes: int, sqlite_path: str
+) -> CacheBackend:
+    if backend == "memory":
+        return MemoryCacheBackend(max_entries, max_bytes)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(sqlite_path, max_entries, max_bytes)
+    raise ValueError(f"unknown cache backend: {backend}")
+
+
+def configure_result_cache(
+    max_entries: int,
+    max_bytes: int,
+    ttl_seconds: float,
+    backend: str = "memory",
+    sqlite_path: str = "",
+) -> Optional[ResultCache]:
+    if max_entries <= 0 or max_bytes <= 0:
+        set_result_cache(None)
+        return None
+    cache = ResultCache(
+        build_cache_backend(backend, max_entries, max_bytes, sqlite_path), ttl_seconds
+    )
+    set_result_cache(cache)
+    logger.info(
+        "Result cache ready: %s backend, %d entries, %.1f MiB, ttl %.0f s",
+        backend,
+        max_entries,
+        max_bytes / (1024.0 * 1024.0),
+        ttl_seconds,
+    )
+    return cache
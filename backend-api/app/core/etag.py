@@ -0,0 +1,40 @@
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def calculator_version(
+    tires_version: str, app_dir: Path = APP_DIR, sprocket_table_version: str = ""
+) -> str:
+    # Any change to the code that shapes a response, to the tire data or to the solver that
+    # built the loaded sprocket table yields a new version.
+    digest = hashlib.sha256()
+    for path in sorted(app_dir.rglob("*.py")):
+        if "tests" in path.relative_to(app_dir).parts:
+            continue
+        digest.update(path.relative_to(app_dir).as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    digest.update(tires_version.encode("utf-8"))
+    digest.update(sprocket_table_version.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def make_etag(key: str) -> str:
+    return f'"{key[:40]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches.
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,375 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+PHASES = ("validation", "compute", "serialization")
+HISTOGRAMS = ("duration", *PHASES)
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class RequestTimings:
+    __slots__ = ("handler_started", "compute_finished", "error_code")
+
+    def __init__(self):
+        self.handler_started: Optional[float] = None
+        self.compute_finished: Optional[float] = None
+        self.error_code: Optional[str] = None
+
+
+# The middleware owns the object; handlers (also in the threadpool, which copies the
+# context) only write fields on it, so no value ever has to flow back through the context.
+_TIMINGS: ContextVar[Optional[RequestTimings]] = ContextVar("ptp_request_timings", default=None)
+
+
+def mark_handler_started() -> None:
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings.handler_started = time.perf_counter()
+
+
+def mark_compute_finished() -> None:
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings.compute_finished = time.perf_counter()
+
+
+def record_error_code(error_code: str) -> None:
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings.error_code = error_code
+
+
+class Histogram:
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+
+    def snapshot(self) -> dict:
+        return {"counts": list(self.counts), "total": self.total}
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "Histogram":
+        histogram = cls()
+        histogram.counts = list(data["counts"])
+        histogram.total = data["total"]
+        return histogram
+
+
+class RouteStats:
+    __slots__ = ("requests", "errors", "duration", "validation", "compute", "serialization")
+
+    def __init__(self):
+        self.requests: dict[tuple[str, int], int] = {}
+        self.errors: dict[str, int] = {}
+        self.duration = Histogram()
+        self.validation = Histogram()
+        self.compute = Histogram()
+        self.serialization = Histogram()
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": [
+                [method, status_code, value]
+                for (method, status_code), value in self.requests.items()
+            ],
+            "errors": dict(self.errors),
+            **{name: getattr(self, name).snapshot() for name in HISTOGRAMS},
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "RouteStats":
+        stats = cls()
+        stats.requests = {
+            (method, status_code): value for method, status_code, value in data["requests"]
+        }
+        stats.errors = dict(data["errors"])
+        for name in HISTOGRAMS:
+            setattr(stats, name, Histogram.from_snapshot(data[name]))
+        return stats
+
+
+class MetricsRegistry:
+    # Updated only from the event loop thread (the middleware), so no locking is needed.
+    def __init__(self):
+        self.routes: dict[str, RouteStats] = {}
+
+    def observe(
+        self,
+        route: str,
+        method: str,
+        status_code: int,
+        started: float,
+        response_started: float,
+        finished: float,
+        timings: RequestTimings,
+    ) -> None:
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteStats()
+        key = (method, status_code)
+        stats.requests[key] = stats.requests.get(key, 0) + 1
+        if status_code >= 400:
+            error_code = timings.error_code or f"http_{status_code}"
+            stats.errors[error_code] = stats.errors.get(error_code, 0) + 1
+        stats.duration.observe(finished - started)
+
+        handler_started = timings.handler_started
+        compute_finished = timings.compute_finished
+        if handler_started is not None and compute_finished is not None:
+            stats.validation.observe(handler_started - started)
+            stats.compute.observe(compute_finished - handler_started)
+            stats.serialization.observe(response_started - compute_finished)
+
+    def snapshot(self) -> dict:
+        return {route: stats.snapshot() for route, stats in self.routes.items()}
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "MetricsRegistry":
+        registry = cls()
+        registry.routes = {route: RouteStats.from_snapshot(stats) for route, stats in data.items()}
+        return registry
+
+    def render(self, pid: Optional[int] = None) -> str:
+        return render_registries([(pid if pid is not None else os.getpid(), self)])
+
+
+def render_registries(registries: list[tuple[int, MetricsRegistry]]) -> str:
+    # One registry per worker process, each series labelled with the worker's pid.
+    series = [
+        (f'pid="{pid}"', route, stats)
+        for pid, registry in sorted(registries, key=lambda item: item[0])
+        for route, stats in sorted(registry.routes.items())
+    ]
+    lines = [
+        "# HELP ptp_requests_total Requests handled, by route, method and status.",
+        "# TYPE ptp_requests_total counter",
+    ]
+    for pid_label, route, stats in series:
+        for (method, status_code), value in sorted(stats.requests.items()):
+            lines.append(
+                f'ptp_requests_total{{route="{route}",method="{method}",'
+                f'status="{status_code}",{pid_label}}} {value}'
+            )
+    lines += [
+        "# HELP ptp_errors_total Error responses, by route and error_code.",
+        "# TYPE ptp_errors_total counter",
+    ]
+    for pid_label, route, stats in series:
+        for error_code, value in sorted(stats.errors.items()):
+            lines.append(
+                f'ptp_errors_total{{route="{route}",error_code="{error_code}",'
+                f"{pid_label}}} {value}"
+            )
+    lines += [
+        "# HELP ptp_request_duration_seconds Time from request start to last body byte.",
+        "# TYPE ptp_request_duration_seconds histogram",
+    ]
+    for pid_label, route, stats in series:
+        labels = f'route="{route}",{pid_label}'
+        _render_histogram(lines, "ptp_request_duration_seconds", labels, stats.duration)
+    lines += [
+        "# HELP ptp_phase_duration_seconds Time spent per request phase "
+        "(validation, compute, serialization).",
+        "# TYPE ptp_phase_duration_seconds histogram",
+    ]
+    for pid_label, route, stats in series:
+        for phase in PHASES:
+            histogram = getattr(stats, phase)
+            if histogram.count:
+                _render_histogram(
+                    lines,
+                    "ptp_phase_duration_seconds",
+                    f'route="{route}",phase="{phase}",{pid_label}',
+                    histogram,
+                )
+    return "\n".join(lines) + "\n"
+
+
+def _render_histogram(lines: list[str], name: str, labels: str, histogram: Histogram) -> None:
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative + histogram.counts[-1]}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+    lines.append(f"{name}_count{{{labels}}} {cumulative + histogram.counts[-1]}")
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        perf_counter = time.perf_counter
+        started = perf_counter()
+        timings = RequestTimings()
+        token = _TIMINGS.set(timings)
+        state = [500, None]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state[0] = message["status"]
+                state[1] = perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _TIMINGS.reset(token)
+            finished = perf_counter()
+            route = scope.get("route")
+            self.registry.observe(
+                route.path if route is not None else "unmatched",
+                scope["method"],
+                state[0],
+                started,
+                state[1] if state[1] is not None else finished,
+                finished,
+                timings,
+            )
+
+
+class SharedMetricsDir:
+    # uvicorn --workers N puts every worker behind one port, so a scrape reaches one worker
+    # at random. Each worker publishes a snapshot file here and the scraped one renders all
+    # of them; files of exited workers are dropped (Prometheus sees a counter reset).
+    def __init__(self, path: str, pid: Optional[int] = None):
+        self.path = path
+        self.pid = pid if pid is not None else os.getpid()
+        # Publishing runs in a thread that shutdown cannot cancel; the lock and flag keep a
+        # late publish from bringing the file back after remove().
+        self._lock = threading.Lock()
+        self._removed = False
+        os.makedirs(path, exist_ok=True)
+
+    def publish(self, snapshot: dict) -> None:
+        target = os.path.join(self.path, f"{self.pid}.json")
+        temporary = f"{target}.tmp"
+        with self._lock:
+            if self._removed:
+                return
+            with open(temporary, "w", encoding="utf-8") as handle:
+                json.dump(snapshot, handle)
+            os.replace(temporary, target)
+
+    def collect(self, snapshot: dict) -> list[tuple[int, MetricsRegistry]]:
+        self.publish(snapshot)
+        registries = []
+        for name in os.listdir(self.path):
+            stem, extension = os.path.splitext(name)
+            if extension != ".json" or not stem.isdigit():
+                continue
+            pid = int(stem)
+            file_path = os.path.join(self.path, name)
+            if pid != self.pid and not _process_alive(pid):
+                _remove_quietly(file_path)
+                continue
+            try:
+                with open(file_path, encoding="utf-8") as handle:
+                    registries.append((pid, MetricsRegistry.from_snapshot(json.load(handle))))
+            except (OSError, ValueError, KeyError):
+                continue
+        return registries
+
+    def remove(self) -> None:
+        with self._lock:
+            self._removed = True
+            _remove_quietly(os.path.join(self.path, f"{self.pid}.json"))
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def publish_metrics(
+    shared: SharedMetricsDir, registry: MetricsRegistry, interval_seconds: float
+) -> None:
+    # The snapshot is taken on the event loop, the only thread that updates the registry.
+    while True:
+        try:
+            await asyncio.to_thread(shared.publish, registry.snapshot())
+        except OSError:
+            logger.exception("Could not publish metrics to %s", shared.path)
+        await asyncio.sleep(interval_seconds)
+
+
+REGISTRY = MetricsRegistry()
+_SHARED: Optional[SharedMetricsDir] = None
+
+
+def get_shared_metrics() -> Optional[SharedMetricsDir]:
+    return _SHARED
+
+
+def set_shared_metrics(shared: Optional[SharedMetricsDir]) -> None:
+    global _SHARED
+    _SHARED = shared
+
+
+def configure_shared_metrics(path: str) -> Optional[SharedMetricsDir]:
+    if not path:
+        set_shared_metrics(None)
+        return None
+    shared = SharedMetricsDir(path)
+    set_shared_metrics(shared)
+    logger.info("Metrics shared across workers through %s (pid %d)", path, shared.pid)
+    return shared
+
+
+async def render_metrics(registry: MetricsRegistry) -> str:
+    shared = _SHARED
+    if shared is None:
+        return registry.render()
+    registries = await asyncio.to_thread(shared.collect, registry.snapshot())
+    return render_registries(registries)
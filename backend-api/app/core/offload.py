@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class OffloadRejected(Exception):
+    pass
+
+
+class OffloadWorkerLost(Exception):
+    pass
+
+
+def _warm_up() -> None:
+    pass
+
+
+def _init_worker(nice: int, initializer: Optional[Callable], initargs: tuple) -> None:
+    # A niced worker only gets the CPU the server processes leave idle, so on a busy or
+    # small host a heavy job waits for the event loop instead of taking turns with it.
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class OffloadPool:
+    # Accounting happens on the event loop thread only (submit and completion both resume
+    # there), so the counters need no locking.
+    def __init__(
+        self,
+        workers: int,
+        queue_depth: int,
+        retry_after_seconds: int,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+        nice: int = 0,
+    ):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.retry_after_seconds = retry_after_seconds
+        self.nice = nice
+        self._initializer = initializer
+        self._initargs = initargs
+        self.executor = self._new_executor()
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the server process already runs threads (the threadpool), and
+        # forking those can deadlock the children.
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.nice, self._initializer, self._initargs),
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_depth
+
+    async def run(self, func: Callable, *args):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise OffloadRejected()
+        self.in_flight += 1
+        return await self._execute(func, *args)
+
+    async def run_admitted(self, func: Callable, *args):
+        # For work already admitted through run: the later chunks of a stream, which cannot
+        # answer 503 once their response has started. They wait for a free slot instead, so
+        # the pool still never holds more than workers + queue_depth jobs.
+        if self.in_flight < self.capacity:
+            self.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                raise
+        return await self._execute(func, *args)
+
+    async def _execute(self, func: Callable, *args):
+        executor = self.executor
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            self.failed += 1
+            self._replace(executor)
+            raise OffloadWorkerLost() from None
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self._release()
+        self.completed += 1
+        return result
+
+    def _release(self) -> None:
+        # A freed slot goes straight to the oldest waiting chunk, so new requests cannot
+        # take it in between and starve streams already under way.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _replace(self, broken: ProcessPoolExecutor) -> None:
+        # A worker died (killed, out of memory): every job on that executor fails with it,
+        # and only the first of them swaps in a new one.
+        if self.executor is not broken:
+            return
+        self.restarts += 1
+        self.executor = self._new_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Offload pool worker died; started a new pool (restart %d)", self.restarts)
+
+    async def warm_up(self) -> None:
+        # Starts every worker (each pays the app import once) before real jobs arrive.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self.executor, _warm_up) for _ in range(self.workers))
+        )
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "nice": self.nice,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_POOL: Optional[OffloadPool] = None
+
+
+def get_offload_pool() -> Optional[OffloadPool]:
+    return _POOL
+
+
+def set_offload_pool(pool: Optional[OffloadPool]) -> None:
+    global _POOL
+    _POOL = pool
+
+
+def configure_offload_pool(
+    workers: int,
+    queue_depth: int,
+    retry_after_seconds: int,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
+    nice: int = 0,
+) -> Optional[OffloadPool]:
+    if workers <= 0:
+        set_offload_pool(None)
+        return None
+    pool = OffloadPool(workers, queue_depth, retry_after_seconds, initializer, initargs, nice)
+    set_offload_pool(pool)
+    logger.info(
+        "Offload pool ready: %d worker process(es), queue depth %d, Retry-After %d s, nice %d",
+        workers,
+        queue_depth,
+        retry_after_seconds,
+        nice,
+    )
+    return pool
@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import json
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional: bodies are served gzip/identity only without it
+    brotli = None
+
+from app.core.etag import etag_matches, make_etag
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def content_version(data) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class PrecompressedBody:
+    # Encoded once, served many times: the per-request work is picking one of these buffers.
+    __slots__ = ("version", "etags", "identity", "gzip", "br")
+
+    def __init__(self, version: str, identity: bytes):
+        self.version = version
+        self.identity = identity
+        # mtime=0 keeps the gzip bytes identical across workers and restarts.
+        self.gzip = gzip.compress(identity, compresslevel=GZIP_LEVEL, mtime=0)
+        self.br = brotli.compress(identity, quality=BROTLI_QUALITY) if brotli else None
+        # Strong validators differ between content-codings (RFC 9110, 8.8.3), so a cache
+        # never mixes up the identity and compressed representations.
+        self.etags: dict[Optional[str], str] = {
+            None: make_etag(version),
+            "gzip": make_etag(f"{version}-gzip"),
+        }
+        if self.br is not None:
+            self.etags["br"] = make_etag(f"{version}-br")
+
+    @classmethod
+    def from_data(cls, data, **envelope) -> "PrecompressedBody":
+        version = content_version(data)
+        document = {"version": version, **envelope, "data": data}
+        body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        return cls(version, body)
+
+    def encoded(self, accept_encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+        encoding = preferred_encoding(accept_encoding, self.br is not None)
+        if encoding == "br":
+            return self.br, "br"
+        if encoding == "gzip":
+            return self.gzip, "gzip"
+        return self.identity, None
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        # Any representation the client holds is current: they all encode this version.
+        return any(etag_matches(if_none_match, etag) for etag in self.etags.values())
+
+    def sizes(self) -> dict:
+        sizes = {"identity": len(self.identity), "gzip": len(self.gzip)}
+        if self.br is not None:
+            sizes["br"] = len(self.br)
+        return sizes
+
+
+def preferred_encoding(accept_encoding: Optional[str], brotli_available: bool) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    wildcard = weights.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli_available else ["gzip"]
+    best = None
+    best_quality = 0.0
+    # Ties go to the first candidate, so brotli wins over gzip at equal weight.
+    for name in candidates:
+        quality = weights.get(name, wildcard)
+        if quality > best_quality:
+            best = name
+            best_quality = quality
+    return best
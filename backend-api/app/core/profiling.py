@@ -0,0 +1,182 @@
+import cProfile
+import logging
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional, Union
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.security import internal_token_is_valid
+
+logger = logging.getLogger("uvicorn.error")
+
+PROFILE_HEADER = b"x-ptp-profile"
+
+
+class RemoteProfile:
+    # Stats a worker process collected with cProfile (offloaded jobs), with the two methods
+    # pstats.Stats and ProfileSampler.record use on a profiler.
+    def __init__(self, stats: dict):
+        self._stats = stats
+        self.stats: dict = {}
+
+    def create_stats(self) -> None:
+        self.stats = dict(self._stats)
+
+    def dump_stats(self, file: str) -> None:
+        self.create_stats()
+        with open(file, "wb") as handle:
+            marshal.dump(self.stats, handle)
+
+
+class RequestProfile:
+    __slots__ = ("path", "profiler")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.profiler: Optional[Union[cProfile.Profile, RemoteProfile]] = None
+
+
+# Set by the middleware for sampled requests only; handlers profile themselves when they
+# find one, because sync handlers run in a threadpool thread cProfile cannot see from the loop.
+_ACTIVE: ContextVar[Optional[RequestProfile]] = ContextVar("ptp_request_profile", default=None)
+
+
+def run_profiled(func: Callable, *args):
+    request_profile = _ACTIVE.get()
+    if request_profile is None:
+        return func(*args)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        request_profile.profiler = profiler
+
+
+def profile_requested() -> bool:
+    return _ACTIVE.get() is not None
+
+
+def run_collecting_stats(func: Callable, *args) -> tuple:
+    # The worker side of an offloaded, sampled request: the stats travel back pickled.
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args)
+    profiler.create_stats()
+    return result, profiler.stats
+
+
+def attach_remote_stats(stats: dict) -> None:
+    request_profile = _ACTIVE.get()
+    if request_profile is not None:
+        request_profile.profiler = RemoteProfile(stats)
+
+
+class ProfileSampler:
+    def __init__(
+        self,
+        sample_rate: float,
+        header_enabled: bool,
+        output_dir: Optional[str] = None,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.sample_rate = sample_rate
+        self.header_enabled = header_enabled
+        self.output_dir = output_dir
+        self._rng = rng
+        self.samples = 0
+        self._stats: Optional[pstats.Stats] = None
+        # record() runs in threadpool threads, and so does the summary route.
+        self._lock = threading.Lock()
+
+    def should_profile(self, headers: list[tuple[bytes, bytes]]) -> bool:
+        if self.header_enabled:
+            requested = False
+            x_key = authorization = None
+            for name, value in headers:
+                if name == PROFILE_HEADER:
+                    requested = value == b"1"
+                elif name == b"x-ptp-internal-key":
+                    x_key = value.decode("latin-1")
+                elif name == b"authorization":
+                    authorization = value.decode("latin-1")
+            if requested and internal_token_is_valid(x_key, authorization):
+                return True
+        return self.sample_rate > 0 and self._rng() < self.sample_rate
+
+    def record(self, request_profile: RequestProfile) -> Optional[str]:
+        profiler = request_profile.profiler
+        if profiler is None:
+            return None
+        with self._lock:
+            self.samples += 1
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+        if not self.output_dir:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        route = request_profile.path.strip("/").replace("/", "_") or "root"
+        filename = f"{route}-{time.time_ns()}-{os.getpid()}.prof"
+        profiler.dump_stats(os.path.join(self.output_dir, filename))
+        return filename
+
+    def summary(self, limit: int = 25, sort: str = "cumulative") -> dict:
+        with self._lock:
+            if self._stats is None:
+                return {"samples": 0, "functions": []}
+            samples = self.samples
+            key_index = 3 if sort == "cumulative" else 2
+            ranked = sorted(
+                self._stats.stats.items(), key=lambda item: item[1][key_index], reverse=True
+            )
+        functions = []
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in ranked[:limit]:
+            functions.append(
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "ncalls": ncalls,
+                    "tottime_ms": round(tottime * 1000.0, 3),
+                    "cumtime_ms": round(cumtime * 1000.0, 3),
+                    "cumtime_per_sample_ms": round(cumtime * 1000.0 / samples, 3),
+                }
+            )
+        return {"samples": samples, "sort": sort, "functions": functions}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples = 0
+            self._stats = None
+
+
+class ProfilingMiddleware:
+    # Only installed when profiling is enabled, so the disabled path costs nothing.
+    def __init__(self, app, sampler: ProfileSampler):
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.sampler.should_profile(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        request_profile = RequestProfile(scope["path"])
+        token = _ACTIVE.set(request_profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _ACTIVE.reset(token)
+        # Merging the stats and writing the .prof file take milliseconds: off the event loop.
+        # The response is already sent, so only this ASGI call waits for them.
+        try:
+            filename = await run_in_threadpool(self.sampler.record, request_profile)
+        except OSError:
+            logger.exception("Could not store request profile")
+            return
+        if filename:
+            logger.info("Stored request profile %s", filename)
@@ -0,0 +1,43 @@
+import logging
+import os
+import time
+from typing import Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def process_age_seconds() -> Optional[float]:
+    # Linux only: the kernel records the process start in clock ticks since boot (10 ms
+    # resolution), which covers interpreter and server startup before any app code runs.
+    try:
+        with open("/proc/self/stat", "rb") as handle:
+            fields = handle.read().rsplit(b")", 1)[1].split()
+        start_seconds = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_seconds
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupReport:
+    def __init__(self, include_process: bool = True):
+        self.phases: list[tuple[str, float]] = []
+        age = process_age_seconds() if include_process else None
+        if age is not None:
+            self.phases.append(("interpreter and server", age))
+        self._last = time.perf_counter()
+
+    def phase(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.phases)
+
+    def log(self, title: str) -> None:
+        logger.info(
+            "Startup report (%s): %s; %.1f ms total",
+            title,
+            ", ".join(f"{name} {seconds * 1000.0:.1f} ms" for name, seconds in self.phases),
+            self.total_seconds() * 1000.0,
+        )
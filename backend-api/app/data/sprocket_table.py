@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import sys
+import time
+from array import array
+from typing import Optional
+
+from app.calculators import sprocket as sprocket_solver
+from app.calculators.sprocket import CHAIN_PITCH_MM, calculate_center_distance_mm
+
+logger = logging.getLogger("uvicorn.error")
+
+SPROCKET_TEETH = (10, 20)
+CROWN_TEETH = (30, 60)
+CHAIN_LINKS = (90, 140)
+
+
+def solver_version() -> str:
+    # Fingerprint of the solver source: a table written by other solver code is never served.
+    with open(sprocket_solver.__file__, "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()[:16]
+
+
+class TableVersionMismatch(ValueError):
+    pass
+
+
+class SprocketTable:
+    def __init__(
+        self,
+        sprocket_teeth: tuple[int, int],
+        crown_teeth: tuple[int, int],
+        chain_links: tuple[int, int],
+        center_distances: dict[float, array],
+        solver_version: str,
+    ):
+        self.solver_version = solver_version
+        self.sprocket_teeth = sprocket_teeth
+        self.crown_teeth = crown_teeth
+        self.chain_links = chain_links
+        self.center_distances = center_distances
+        self._crown_count = crown_teeth[1] - crown_teeth[0] + 1
+        self._links_count = (chain_links[1] - chain_links[0]) // 2 + 1
+        self.build_seconds = 0.0
+
+    @classmethod
+    def build(
+        cls,
+        sprocket_teeth: tuple[int, int] = SPROCKET_TEETH,
+        crown_teeth: tuple[int, int] = CROWN_TEETH,
+        chain_links: tuple[int, int] = CHAIN_LINKS,
+    ) -> "SprocketTable":
+        started = time.perf_counter()
+        center_distances = {}
+        for pitch_mm in sorted(set(CHAIN_PITCH_MM.values())):
+            center_distances[pitch_mm] = array(
+                "d",
+                (
+                    calculate_center_distance_mm(sprocket, crown, pitch_mm, links)
+                    for sprocket in range(sprocket_teeth[0], sprocket_teeth[1] + 1)
+                    for crown in range(crown_teeth[0], crown_teeth[1] + 1)
+                    for links in range(chain_links[0], chain_links[1] + 1, 2)
+                ),
+            )
+        table = cls(sprocket_teeth, crown_teeth, chain_links, center_distances, solver_version())
+        table.build_seconds = time.perf_counter() - started
+        return table
+
+    @classmethod
+    def load(cls, path: str) -> "SprocketTable":
+        started = time.perf_counter()
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        expected = solver_version()
+        if data.get("solver_version") != expected:
+            raise TableVersionMismatch(
+                f"{path} was built by solver {data.get('solver_version')}, running {expected}"
+            )
+        table = cls(
+            tuple(data["sprocket_teeth"]),
+            tuple(data["crown_teeth"]),
+            tuple(data["chain_links"]),
+            {float(pitch): array("d", values) for pitch, values in data["center_distances"].items()},
+            expected,
+        )
+        table.build_seconds = time.perf_counter() - started
+        return table
+
+    def dump(self, path: str) -> None:
+        data = {
+            "solver_version": self.solver_version,
+            "sprocket_teeth": list(self.sprocket_teeth),
+            "crown_teeth": list(self.crown_teeth),
+            "chain_links": list(self.chain_links),
+            "center_distances": {
+                str(pitch): values.tolist() for pitch, values in self.center_distances.items()
+            },
+        }
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+
+    @property
+    def entries(self) -> int:
+        return sum(len(values) for values in self.center_distances.values())
+
+    @property
+    def memory_bytes(self) -> int:
+        return sys.getsizeof(self.center_distances) + sum(
+            sys.getsizeof(values) for values in self.center_distances.values()
+        )
+
+    def center_distance_mm(
+        self,
+        sprocket_teeth: int,
+        crown_teeth: int,
+        pitch_mm: float,
+        chain_links: int,
+    ) -> Optional[float]:
+        values = self.center_distances.get(pitch_mm)
+        if values is None:
+            return None
+        if not self.sprocket_teeth[0] <= sprocket_teeth <= self.sprocket_teeth[1]:
+            return None
+        if not self.crown_teeth[0] <= crown_teeth <= self.crown_teeth[1]:
+            return None
+        links_offset = chain_links - self.chain_links[0]
+        if links_offset < 0 or links_offset % 2 or chain_links > self.chain_links[1]:
+            return None
+        index = (
+            (sprocket_teeth - self.sprocket_teeth[0]) * self._crown_count
+            + (crown_teeth - self.crown_teeth[0])
+        ) * self._links_count + links_offset // 2
+        return values[index]
+
+
+_TABLE: Optional[SprocketTable] = None
+
+
+def get_sprocket_table() -> Optional[SprocketTable]:
+    return _TABLE
+
+
+def set_sprocket_table(table: Optional[SprocketTable]) -> None:
+    global _TABLE
+    _TABLE = table
+
+
+def sprocket_table_version() -> str:
+    table = _TABLE
+    return "" if table is None else table.solver_version
+
+
+def configure_sprocket_table(setting: Optional[str]) -> Optional[SprocketTable]:
+    if not setting:
+        set_sprocket_table(None)
+        return None
+    if setting == "build":
+        table = SprocketTable.build()
+    else:
+        try:
+            table = SprocketTable.load(setting)
+        except TableVersionMismatch as exc:
+            logger.warning("Sprocket table is stale (%s); rebuilding it in memory", exc)
+            table = SprocketTable.build()
+    set_sprocket_table(table)
+    logger.info(
+        "Sprocket table ready: solver %s, %d entries in %.1f ms, %.1f KiB",
+        table.solver_version,
+        table.entries,
+        table.build_seconds * 1000.0,
+        table.memory_bytes / 1024.0,
+    )
+    return table
+
+
+def lookup_center_distance_mm(
+    sprocket_teeth: int,
+    crown_teeth: int,
+    pitch_mm: float,
+    chain_links: int,
+    wear_factor: float = 1.0,
+) -> float:
+    # The table holds the default wear factor; a damped (0.98) setup is computed live.
+    table = _TABLE
+    if table is not None and wear_factor == 1.0:
+        center_distance_mm = table.center_distance_mm(
+            sprocket_teeth, crown_teeth, pitch_mm, chain_links
+        )
+        if center_distance_mm is not None:
+            return center_distance_mm
+    return calculate_center_distance_mm(
+        sprocket_teeth, crown_teeth, pitch_mm, chain_links, wear_factor
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m app.data.sprocket_table <output.json>")
+    built = SprocketTable.build()
+    built.dump(sys.argv[1])
+    print(f"wrote {built.entries} entries to {sys.argv[1]} in {built.build_seconds * 1000.0:.1f} ms")
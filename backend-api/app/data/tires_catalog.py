@@ -0,0 +1,415 @@
+import csv
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+from app.calculators.tires import flotation_dimensions_mm
+from app.core.precompressed import content_version
+from app.data.tires_db import (
+    TIRES_DB,
+    IndexedTireCatalog,
+    TireCatalog,
+    TireSize,
+    build_tire_index,
+    builtin_tire_catalog,
+    set_tire_catalog,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+MAGIC = b"PTPTIRE1"
+HEADER_LENGTH = struct.Struct("<I")
+ALIGNMENT = 8
+RECORD_FIELDS = ("vehicle_type", "rim_in", "width_mm", "aspect_percent", "flotation")
+_NO_ID = -1
+
+
+def _number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _label(value) -> str:
+    return str(_number(value))
+
+
+def db_from_records(records) -> dict:
+    # One record per aspect or flotation of a size; a record with neither only declares
+    # the width. Output has the same shape (and ordering) as TIRES_DB.
+    nested: dict[str, dict[float, dict[float, tuple[set, set]]]] = {}
+    for record in records:
+        widths = nested.setdefault(record["vehicle_type"], {}).setdefault(
+            float(record["rim_in"]), {}
+        )
+        aspects, flotations = widths.setdefault(float(record["width_mm"]), (set(), set()))
+        if record.get("aspect_percent") not in (None, ""):
+            aspects.add(_number(record["aspect_percent"]))
+        if record.get("flotation"):
+            flotations.add(record["flotation"])
+
+    db = {}
+    for vehicle_type, rims in nested.items():
+        vehicle_db: dict = {"rims": [_number(rim) for rim in sorted(rims)]}
+        for rim in sorted(rims):
+            widths = rims[rim]
+            rim_db: dict = {"widths": [_label(width) for width in sorted(widths)]}
+            for width in sorted(widths):
+                aspects, flotations = widths[width]
+                width_db: dict = {"aspects": sorted(aspects)}
+                if flotations:
+                    width_db["flotation"] = sorted(flotations)
+                rim_db[_label(width)] = width_db
+            vehicle_db[_label(rim)] = rim_db
+        db[vehicle_type] = vehicle_db
+    return db
+
+
+def load_dataset(path: str) -> dict:
+    # CSV with RECORD_FIELDS columns, or JSON holding either TIRES_DB's nested shape or a
+    # list of records.
+    if path == "builtin":
+        return TIRES_DB
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as handle:
+            return db_from_records(csv.DictReader(handle))
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return db_from_records(data) if isinstance(data, list) else data
+
+
+def compile_catalog(db: dict, path: str) -> dict:
+    # Sizes are laid out as sorted columns, nested vehicle -> rim -> width through offset
+    # arrays (entry i owns [starts[i], starts[i + 1]) of the next level), so every lookup is
+    # a bisect over mapped memory and nothing has to be rebuilt when a worker opens the file.
+    index = build_tire_index(db)
+    vehicles = list(db)
+    flotation_names = sorted(
+        {
+            flotation
+            for vehicle_db in db.values()
+            for rim, rim_db in vehicle_db.items()
+            if rim != "rims"
+            for width in rim_db["widths"]
+            for flotation in rim_db[width].get("flotation", [])
+        }
+    )
+    flotation_ids = {name: number for number, name in enumerate(flotation_names)}
+
+    columns = {
+        "vehicle_rims": array("I", [0]),
+        "rims": array("d"),
+        "rim_widths": array("I", [0]),
+        "widths": array("d"),
+        "width_aspects": array("I", [0]),
+        "aspects": array("d"),
+        "width_flotations": array("I", [0]),
+        "flotations": array("i"),
+    }
+    locations = []
+    for vehicle_id, vehicle_type in enumerate(vehicles):
+        vehicle_db = db[vehicle_type]
+        for rim in sorted((key for key in vehicle_db if key != "rims"), key=float):
+            rim_db = vehicle_db[rim]
+            columns["rims"].append(float(rim))
+            for width in sorted(rim_db["widths"], key=float):
+                width_db = rim_db.get(width, {})
+                columns["widths"].append(float(width))
+                columns["aspects"].extend(sorted(map(float, width_db.get("aspects", []))))
+                columns["width_aspects"].append(len(columns["aspects"]))
+                for flotation in width_db.get("flotation", []):
+                    columns["flotations"].append(flotation_ids[flotation])
+                    key = vehicle_id << 32 | flotation_ids[flotation]
+                    locations.append((key, float(rim), float(width)))
+                columns["width_flotations"].append(len(columns["flotations"]))
+            columns["rim_widths"].append(len(columns["widths"]))
+        columns["vehicle_rims"].append(len(columns["rims"]))
+
+    locations.sort(key=lambda location: location[0])
+    columns["location_keys"] = array("q", [location[0] for location in locations])
+    columns["location_rims"] = array("d", [location[1] for location in locations])
+    columns["location_widths"] = array("d", [location[2] for location in locations])
+
+    vehicle_ids = {vehicle_type: number for number, vehicle_type in enumerate(vehicles)}
+    dimensions = sorted(
+        (vehicle_ids[vehicle_type] << 32 | flotation_ids[flotation], found)
+        for (vehicle_type, flotation), found in index.flotation_dimensions.items()
+    )
+    columns["dimension_keys"] = array("q", [key for key, _ in dimensions])
+    columns["dimension_diameters"] = array(
+        "d", [math.nan if found is None else found[0] for _, found in dimensions]
+    )
+    columns["dimension_widths"] = array(
+        "d", [math.nan if found is None else found[1] for _, found in dimensions]
+    )
+
+    sizes = index.sizes
+    columns["size_diameters"] = array("d", index.diameters)
+    columns["size_vehicles"] = array("H", [vehicle_ids[size.vehicle_type] for size in sizes])
+    columns["size_rims"] = array("d", [size.rim_in for size in sizes])
+    columns["size_widths"] = array(
+        "d", [math.nan if size.width_mm is None else size.width_mm for size in sizes]
+    )
+    columns["size_aspects"] = array(
+        "d", [math.nan if size.aspect_percent is None else size.aspect_percent for size in sizes]
+    )
+    columns["size_flotations"] = array(
+        "i", [_NO_ID if size.flotation is None else flotation_ids[size.flotation] for size in sizes]
+    )
+
+    sections = {}
+    offset = 0
+    for name, values in columns.items():
+        sections[name] = [offset, values.typecode, len(values)]
+        offset += -(-len(values) * values.itemsize // ALIGNMENT) * ALIGNMENT
+    header = {
+        "version": content_version(db),
+        "vehicles": vehicles,
+        "flotations": flotation_names,
+        "sizes": len(sizes),
+        "sections": sections,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = len(MAGIC) + HEADER_LENGTH.size + len(header_bytes)
+    padding = -data_start % ALIGNMENT
+    # Written next to the target and renamed over it: workers still mapping the old file keep
+    # reading its (now unlinked) pages, and a reload never sees a half-written catalog.
+    partial_path = f"{path}.partial"
+    with open(partial_path, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(HEADER_LENGTH.pack(len(header_bytes) + padding))
+        handle.write(header_bytes + b" " * padding)
+        for name, values in columns.items():
+            data = values.tobytes()
+            handle.write(data + b"\0" * (-len(data) % ALIGNMENT))
+    os.replace(partial_path, path)
+    return header
+
+
+class MappedTireCatalog:
+    # Opened with mmap, so every worker on the host shares the same page-cache pages and
+    # opening only parses the header: vehicle and flotation names are the only Python objects.
+    def __init__(self, path: str):
+        started = time.perf_counter()
+        self.path = path
+        self.source = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not a compiled tire catalog")
+        (header_length,) = HEADER_LENGTH.unpack_from(self._map, len(MAGIC))
+        data_start = len(MAGIC) + HEADER_LENGTH.size
+        header = json.loads(self._map[data_start : data_start + header_length])
+        data_start += header_length
+        self.version = header["version"]
+        self.vehicles = tuple(header["vehicles"])
+        self.flotation_names = tuple(header["flotations"])
+        self.size_count = header["sizes"]
+        self._vehicle_ids = {name: number for number, name in enumerate(self.vehicles)}
+        self._flotation_ids = {name: number for number, name in enumerate(self.flotation_names)}
+
+        view = memoryview(self._map)
+        columns = {}
+        for name, (offset, typecode, count) in header["sections"].items():
+            start = data_start + offset
+            size = count * array(typecode).itemsize
+            columns[name] = view[start : start + size].cast(typecode)
+        self._vehicle_rims = columns["vehicle_rims"]
+        self._rims = columns["rims"]
+        self._rim_widths = columns["rim_widths"]
+        self._widths = columns["widths"]
+        self._width_aspects = columns["width_aspects"]
+        self._aspects = columns["aspects"]
+        self._width_flotations = columns["width_flotations"]
+        self._flotations = columns["flotations"]
+        self._location_keys = columns["location_keys"]
+        self._location_rims = columns["location_rims"]
+        self._location_widths = columns["location_widths"]
+        self._dimension_keys = columns["dimension_keys"]
+        self._dimension_diameters = columns["dimension_diameters"]
+        self._dimension_widths = columns["dimension_widths"]
+        self._size_diameters = columns["size_diameters"]
+        self._size_vehicles = columns["size_vehicles"]
+        self._size_rims = columns["size_rims"]
+        self._size_widths = columns["size_widths"]
+        self._size_aspects = columns["size_aspects"]
+        self._size_flotations = columns["size_flotations"]
+        self.size_bytes = len(self._map)
+        self.open_seconds = time.perf_counter() - started
+
+    def _rim_index(self, vehicle_type: str, rim_in: float) -> int:
+        vehicle_id = self._vehicle_ids.get(vehicle_type)
+        if vehicle_id is None:
+            return _NO_ID
+        low = self._vehicle_rims[vehicle_id]
+        high = self._vehicle_rims[vehicle_id + 1]
+        found = bisect_left(self._rims, rim_in, low, high)
+        return found if found < high and self._rims[found] == rim_in else _NO_ID
+
+    def _width_index(self, vehicle_type: str, rim_in: float, width_mm: float) -> int:
+        rim_index = self._rim_index(vehicle_type, rim_in)
+        if rim_index == _NO_ID:
+            return _NO_ID
+        low = self._rim_widths[rim_index]
+        high = self._rim_widths[rim_index + 1]
+        found = bisect_left(self._widths, width_mm, low, high)
+        return found if found < high and self._widths[found] == width_mm else _NO_ID
+
+    def _key_range(self, keys: memoryview, vehicle_type: str, flotation: str) -> range:
+        vehicle_id = self._vehicle_ids.get(vehicle_type)
+        flotation_id = self._flotation_ids.get(flotation)
+        if vehicle_id is None or flotation_id is None:
+            return range(0)
+        key = vehicle_id << 32 | flotation_id
+        return range(bisect_left(keys, key), bisect_right(keys, key))
+
+    def has_vehicle(self, vehicle_type: str) -> bool:
+        return vehicle_type in self._vehicle_ids
+
+    def has_rim(self, vehicle_type: str, rim_in: float) -> bool:
+        return self._rim_index(vehicle_type, rim_in) != _NO_ID
+
+    def has_width(self, vehicle_type: str, rim_in: float, width_mm: float) -> bool:
+        return self._width_index(vehicle_type, rim_in, width_mm) != _NO_ID
+
+    def aspects_for(self, vehicle_type: str, rim_in: float, width_mm: float) -> frozenset[float]:
+        width_index = self._width_index(vehicle_type, rim_in, width_mm)
+        if width_index == _NO_ID:
+            return frozenset()
+        return frozenset(
+            self._aspects[self._width_aspects[width_index] : self._width_aspects[width_index + 1]]
+        )
+
+    def flotations_for(self, vehicle_type: str, rim_in: float) -> frozenset[str]:
+        rim_index = self._rim_index(vehicle_type, rim_in)
+        if rim_index == _NO_ID:
+            return frozenset()
+        # A rim's widths are contiguous, so their flotations are one slice.
+        low = self._width_flotations[self._rim_widths[rim_index]]
+        high = self._width_flotations[self._rim_widths[rim_index + 1]]
+        names = self.flotation_names
+        return frozenset(names[flotation_id] for flotation_id in self._flotations[low:high])
+
+    def flotation_locations(
+        self, vehicle_type: str, flotation: str
+    ) -> tuple[tuple[float, float], ...]:
+        found = self._key_range(self._location_keys, vehicle_type, flotation)
+        return tuple((self._location_rims[i], self._location_widths[i]) for i in found)
+
+    def sizes_within(self, diameter_mm: float, tolerance_percent: float) -> tuple[TireSize, ...]:
+        delta = abs(diameter_mm) * tolerance_percent / 100.0
+        low = bisect_left(self._size_diameters, diameter_mm - delta)
+        high = bisect_right(self._size_diameters, diameter_mm + delta)
+        vehicles = self.vehicles
+        names = self.flotation_names
+        # Whole column slices are copied out with tolist() and NaN / -1 mean "not set".
+        columns = zip(
+            self._size_diameters[low:high].tolist(),
+            [vehicles[i] for i in self._size_vehicles[low:high].tolist()],
+            self._size_rims[low:high].tolist(),
+            [None if value != value else value for value in self._size_widths[low:high].tolist()],
+            [None if value != value else value for value in self._size_aspects[low:high].tolist()],
+            [None if i == _NO_ID else names[i] for i in self._size_flotations[low:high].tolist()],
+        )
+        return tuple(map(TireSize._make, columns))
+
+    def flotation_dimensions(
+        self, vehicle_type: str, flotation: str
+    ) -> Optional[tuple[float, float]]:
+        found = self._key_range(self._dimension_keys, vehicle_type, flotation)
+        if not found:
+            return flotation_dimensions_mm(vehicle_type, flotation)
+        diameter_mm = self._dimension_diameters[found.start]
+        if math.isnan(diameter_mm):
+            return None
+        return diameter_mm, self._dimension_widths[found.start]
+
+    def to_db(self) -> dict:
+        db = {}
+        for vehicle_id, vehicle_type in enumerate(self.vehicles):
+            rim_range = range(self._vehicle_rims[vehicle_id], self._vehicle_rims[vehicle_id + 1])
+            vehicle_db: dict = {"rims": [_number(self._rims[i]) for i in rim_range]}
+            for rim_index in rim_range:
+                width_range = range(self._rim_widths[rim_index], self._rim_widths[rim_index + 1])
+                rim_db: dict = {"widths": [_label(self._widths[i]) for i in width_range]}
+                for i in width_range:
+                    aspects = self._aspects[self._width_aspects[i] : self._width_aspects[i + 1]]
+                    flotations = self._flotations[
+                        self._width_flotations[i] : self._width_flotations[i + 1]
+                    ]
+                    width_db: dict = {"aspects": [_number(aspect) for aspect in aspects]}
+                    if len(flotations):
+                        width_db["flotation"] = [self.flotation_names[j] for j in flotations]
+                    rim_db[_label(self._widths[i])] = width_db
+                vehicle_db[_label(self._rims[rim_index])] = rim_db
+            db[vehicle_type] = vehicle_db
+        return db
+
+
+def open_tire_catalog(path: Optional[str]) -> TireCatalog:
+    # Empty means the builtin literal; a compiled file is mapped, and a CSV/JSON dataset is
+    # indexed in memory the way the literal is.
+    started = time.perf_counter()
+    if not path:
+        catalog = builtin_tire_catalog()
+    else:
+        with open(path, "rb") as handle:
+            compiled = handle.read(len(MAGIC)) == MAGIC
+        if compiled:
+            catalog = MappedTireCatalog(path)
+        else:
+            catalog = IndexedTireCatalog(load_dataset(path), source=path)
+    logger.info(
+        "Tire catalog loaded: %s, version %s, %d sizes in %.1f ms",
+        catalog.source,
+        catalog.version,
+        catalog.size_count,
+        (time.perf_counter() - started) * 1000.0,
+    )
+    return catalog
+
+
+class TireCatalogMismatch(RuntimeError):
+    pass
+
+
+def open_tire_catalog_version(path: Optional[str], version: str) -> TireCatalog:
+    # For processes that must compute on one exact release (offload pool workers): the file
+    # may have been replaced again since that release was read from it.
+    catalog = open_tire_catalog(path)
+    if catalog.version != version:
+        raise TireCatalogMismatch(
+            f"{catalog.source}: found version {catalog.version}, expected {version}"
+        )
+    return catalog
+
+
+def configure_tire_catalog(path: Optional[str]) -> TireCatalog:
+    catalog = open_tire_catalog(path)
+    set_tire_catalog(catalog)
+    return catalog
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: python -m app.data.tires_catalog <dataset.csv|dataset.json|builtin> <out>")
+        return 2
+    started = time.perf_counter()
+    header = compile_catalog(load_dataset(argv[0]), argv[1])
+    print(
+        f"{argv[1]}: {header['sizes']} sizes, {len(header['vehicles'])} vehicles, "
+        f"version {header['version']}, {(time.perf_counter() - started) * 1000.0:.1f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
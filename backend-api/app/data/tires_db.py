@@ -1,3 +1,13 @@
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Iterator, Mapping, NamedTuple, Optional, Protocol
+
+from app.calculators.tires import calculate_diameter_mm, flotation_dimensions_mm
+from app.core.precompressed import content_version
+
 TIRES_DB = {
     "Car": {
         "rims": [12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24],
@@ -282,3 +292,248 @@ TIRES_DB = {
         },
     },
 }
+
+
+class TireSize(NamedTuple):
+    diameter_mm: float
+    vehicle_type: str
+    rim_in: float
+    width_mm: Optional[float]
+    aspect_percent: Optional[float]
+    flotation: Optional[str]
+
+
+class TireIndex(NamedTuple):
+    rims: Mapping[str, frozenset[float]]
+    widths: Mapping[tuple[str, float], frozenset[float]]
+    aspects: Mapping[tuple[str, float, float], frozenset[float]]
+    flotations: Mapping[tuple[str, float], frozenset[str]]
+    flotation_locations: Mapping[str, Mapping[str, tuple[tuple[float, float], ...]]]
+    flotation_dimensions: Mapping[tuple[str, str], Optional[tuple[float, float]]]
+    sizes: tuple[TireSize, ...]
+    diameters: tuple[float, ...]
+
+
+def build_tire_index(db: dict) -> TireIndex:
+    # Sizes are keyed as floats so lookups take request values as-is (hash(16) == hash(16.0)).
+    rims: dict[str, frozenset[float]] = {}
+    widths: dict[tuple[str, float], frozenset[float]] = {}
+    aspects: dict[tuple[str, float, float], frozenset[float]] = {}
+    flotations: dict[tuple[str, float], frozenset[str]] = {}
+    flotation_locations: dict[str, Mapping[str, tuple[tuple[float, float], ...]]] = {}
+    flotation_dimensions: dict[tuple[str, str], Optional[tuple[float, float]]] = {}
+    sizes: list[TireSize] = []
+
+    for vehicle_type, vehicle_db in db.items():
+        rim_keys = [key for key in vehicle_db if key != "rims"]
+        rims[vehicle_type] = frozenset(float(rim) for rim in rim_keys)
+        locations: dict[str, list[tuple[float, float]]] = {}
+        for rim in rim_keys:
+            rim_db = vehicle_db[rim]
+            rim_in = float(rim)
+            widths[(vehicle_type, rim_in)] = frozenset(float(width) for width in rim_db["widths"])
+            rim_flotations: list[str] = []
+            for width in rim_db["widths"]:
+                width_db = rim_db.get(width, {})
+                width_mm = float(width)
+                aspects[(vehicle_type, rim_in, width_mm)] = frozenset(width_db.get("aspects", []))
+                for aspect in width_db.get("aspects", []):
+                    diameter_mm = calculate_diameter_mm(rim_in, width_mm, aspect)
+                    sizes.append(
+                        TireSize(diameter_mm, vehicle_type, rim_in, width_mm, float(aspect), None)
+                    )
+                for flotation in width_db.get("flotation", []):
+                    rim_flotations.append(flotation)
+                    locations.setdefault(flotation, []).append((rim_in, width_mm))
+            flotations[(vehicle_type, rim_in)] = frozenset(rim_flotations)
+            for flotation in sorted(set(rim_flotations)):
+                dimensions = flotation_dimensions_mm(vehicle_type, flotation)
+                flotation_dimensions[(vehicle_type, flotation)] = dimensions
+                if dimensions is not None:
+                    diameter_mm = dimensions[0]
+                    sizes.append(
+                        TireSize(diameter_mm, vehicle_type, rim_in, None, None, flotation)
+                    )
+        flotation_locations[vehicle_type] = MappingProxyType(
+            {flotation: tuple(found) for flotation, found in locations.items()}
+        )
+
+    ordered = sorted(sizes, key=lambda size: size.diameter_mm)
+    return TireIndex(
+        rims=MappingProxyType(rims),
+        widths=MappingProxyType(widths),
+        aspects=MappingProxyType(aspects),
+        flotations=MappingProxyType(flotations),
+        flotation_locations=MappingProxyType(flotation_locations),
+        flotation_dimensions=MappingProxyType(flotation_dimensions),
+        sizes=tuple(ordered),
+        diameters=tuple(size.diameter_mm for size in ordered),
+    )
+
+
+_EMPTY: frozenset = frozenset()
+_UNPARSED = object()
+
+
+class TireCatalog(Protocol):
+    source: str
+    version: str
+    size_count: int
+
+    def has_vehicle(self, vehicle_type: str) -> bool: ...
+
+    def has_rim(self, vehicle_type: str, rim_in: float) -> bool: ...
+
+    def has_width(self, vehicle_type: str, rim_in: float, width_mm: float) -> bool: ...
+
+    def aspects_for(
+        self, vehicle_type: str, rim_in: float, width_mm: float
+    ) -> frozenset[float]: ...
+
+    def flotations_for(self, vehicle_type: str, rim_in: float) -> frozenset[str]: ...
+
+    def flotation_locations(
+        self, vehicle_type: str, flotation: str
+    ) -> tuple[tuple[float, float], ...]: ...
+
+    def sizes_within(
+        self, diameter_mm: float, tolerance_percent: float
+    ) -> tuple[TireSize, ...]: ...
+
+    def flotation_dimensions(
+        self, vehicle_type: str, flotation: str
+    ) -> Optional[tuple[float, float]]: ...
+
+    def to_db(self) -> dict: ...
+
+
+class IndexedTireCatalog:
+    # The dataset held as Python objects, answered from the dict indexes above.
+    def __init__(self, db: dict, index: Optional[TireIndex] = None, source: str = "builtin"):
+        self.db = db
+        self.index = build_tire_index(db) if index is None else index
+        self.source = source
+        self.version = content_version(db)
+        self.size_count = len(self.index.sizes)
+
+    def has_vehicle(self, vehicle_type: str) -> bool:
+        return vehicle_type in self.index.rims
+
+    def has_rim(self, vehicle_type: str, rim_in: float) -> bool:
+        return rim_in in self.index.rims.get(vehicle_type, _EMPTY)
+
+    def has_width(self, vehicle_type: str, rim_in: float, width_mm: float) -> bool:
+        return width_mm in self.index.widths.get((vehicle_type, rim_in), _EMPTY)
+
+    def aspects_for(self, vehicle_type: str, rim_in: float, width_mm: float) -> frozenset[float]:
+        return self.index.aspects.get((vehicle_type, rim_in, width_mm), _EMPTY)
+
+    def flotations_for(self, vehicle_type: str, rim_in: float) -> frozenset[str]:
+        return self.index.flotations.get((vehicle_type, rim_in), _EMPTY)
+
+    def flotation_locations(
+        self, vehicle_type: str, flotation: str
+    ) -> tuple[tuple[float, float], ...]:
+        return self.index.flotation_locations.get(vehicle_type, {}).get(flotation, ())
+
+    def sizes_within(self, diameter_mm: float, tolerance_percent: float) -> tuple[TireSize, ...]:
+        delta = abs(diameter_mm) * tolerance_percent / 100.0
+        low = bisect_left(self.index.diameters, diameter_mm - delta)
+        high = bisect_right(self.index.diameters, diameter_mm + delta)
+        return self.index.sizes[low:high]
+
+    def flotation_dimensions(
+        self, vehicle_type: str, flotation: str
+    ) -> Optional[tuple[float, float]]:
+        # Database flotations are precomputed, so the hot path is one dict hit; anything else
+        # goes through the memoized parsers.
+        dimensions = self.index.flotation_dimensions.get((vehicle_type, flotation), _UNPARSED)
+        if dimensions is _UNPARSED:
+            return flotation_dimensions_mm(vehicle_type, flotation)
+        return dimensions
+
+    def to_db(self) -> dict:
+        return self.db
+
+
+# The builtin literal is indexed on first use (or by the startup warm-up), not at import.
+_BUILTIN: Optional[IndexedTireCatalog] = None
+_BUILTIN_LOCK = threading.Lock()
+# None until a catalog is published: requests then read the builtin one.
+_CATALOG: Optional[TireCatalog] = None
+
+
+def builtin_tire_catalog() -> IndexedTireCatalog:
+    global _BUILTIN
+    catalog = _BUILTIN
+    if catalog is None:
+        with _BUILTIN_LOCK:
+            if _BUILTIN is None:
+                _BUILTIN = IndexedTireCatalog(TIRES_DB)
+            catalog = _BUILTIN
+    return catalog
+
+
+def __getattr__(name: str):
+    if name == "TIRE_INDEX":
+        return builtin_tire_catalog().index
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Set for the length of a request that keyed its cache entry and ETag on one catalog
+# release, so its calculation reads that same release whatever is published meanwhile.
+_PINNED: ContextVar[Optional[TireCatalog]] = ContextVar("ptp_pinned_tire_catalog", default=None)
+
+
+def get_tire_catalog() -> TireCatalog:
+    pinned = _PINNED.get()
+    if pinned is not None:
+        return pinned
+    catalog = _CATALOG
+    return builtin_tire_catalog() if catalog is None else catalog
+
+
+@contextmanager
+def pinned_tire_catalog(catalog: TireCatalog) -> Iterator[TireCatalog]:
+    token = _PINNED.set(catalog)
+    try:
+        yield catalog
+    finally:
+        _PINNED.reset(token)
+
+
+def set_tire_catalog(catalog: Optional[TireCatalog]) -> None:
+    global _CATALOG
+    _CATALOG = catalog
+
+
+def has_vehicle(vehicle_type: str) -> bool:
+    return get_tire_catalog().has_vehicle(vehicle_type)
+
+
+def has_rim(vehicle_type: str, rim_in: float) -> bool:
+    return get_tire_catalog().has_rim(vehicle_type, rim_in)
+
+
+def has_width(vehicle_type: str, rim_in: float, width_mm: float) -> bool:
+    return get_tire_catalog().has_width(vehicle_type, rim_in, width_mm)
+
+
+def aspects_for(vehicle_type: str, rim_in: float, width_mm: float) -> frozenset[float]:
+    return get_tire_catalog().aspects_for(vehicle_type, rim_in, width_mm)
+
+
+def flotations_for(vehicle_type: str, rim_in: float) -> frozenset[str]:
+    return get_tire_catalog().flotations_for(vehicle_type, rim_in)
+
+
+def flotation_locations(vehicle_type: str, flotation: str) -> tuple[tuple[float, float], ...]:
+    return get_tire_catalog().flotation_locations(vehicle_type, flotation)
+
+
+def sizes_within(diameter_mm: float, tolerance_percent: float) -> tuple[TireSize, ...]:
+    return get_tire_catalog().sizes_within(diameter_mm, tolerance_percent)
+
+
+def flotation_dimensions(vehicle_type: str, flotation: str) -> Optional[tuple[float, float]]:
+    return get_tire_catalog().flotation_dimensions(vehicle_type, flotation)
@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from app.core.precompressed import PrecompressedBody
+from app.data.tires_db import TireCatalog, get_tire_catalog
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class TirePayloads:
+    def __init__(
+        self,
+        catalog: TireCatalog,
+        full: PrecompressedBody,
+        vehicles: Mapping[str, PrecompressedBody],
+    ):
+        self.catalog = catalog
+        self.full = full
+        self.vehicles = vehicles
+        self.build_seconds = 0.0
+
+    @classmethod
+    def build(cls, catalog: TireCatalog) -> "TirePayloads":
+        started = time.perf_counter()
+        db = catalog.to_db()
+        full = PrecompressedBody.from_data(db)
+        vehicles = {
+            vehicle_type: PrecompressedBody.from_data(vehicle_db, vehicle_type=vehicle_type)
+            for vehicle_type, vehicle_db in db.items()
+        }
+        payloads = cls(catalog, full, MappingProxyType(vehicles))
+        payloads.build_seconds = time.perf_counter() - started
+        return payloads
+
+
+_PAYLOADS: Optional[TirePayloads] = None
+_PAYLOADS_LOCK = threading.Lock()
+
+
+def current_tire_payloads() -> Optional[TirePayloads]:
+    # Cheap enough for the event loop: payloads only exist once a catalog does, and a reload
+    # makes them stale by publishing another catalog object.
+    payloads = _PAYLOADS
+    if payloads is None or payloads.catalog is not get_tire_catalog():
+        return None
+    return payloads
+
+
+def get_tire_payloads() -> TirePayloads:
+    # Compressing the bodies takes long (gzip 9, brotli 11): call this off the event loop.
+    payloads = current_tire_payloads()
+    if payloads is None:
+        with _PAYLOADS_LOCK:
+            payloads = current_tire_payloads()
+            if payloads is None:
+                payloads = configure_tire_payloads(get_tire_catalog())
+    return payloads
+
+
+def tire_payloads_built() -> bool:
+    return _PAYLOADS is not None
+
+
+def set_tire_payloads(payloads: Optional[TirePayloads]) -> None:
+    global _PAYLOADS
+    _PAYLOADS = payloads
+
+
+def configure_tire_payloads(catalog: TireCatalog) -> TirePayloads:
+    payloads = TirePayloads.build(catalog)
+    set_tire_payloads(payloads)
+    logger.info(
+        "Tire payloads ready: version %s, %d vehicles, %s in %.1f ms",
+        payloads.full.version,
+        len(payloads.vehicles),
+        ", ".join(f"{name} {size} B" for name, size in payloads.full.sizes().items()),
+        payloads.build_seconds * 1000.0,
+    )
+    return payloads
@@ -1,6 +1,26 @@
+import asyncio
+import logging
+import math
+import os
+import signal
+import threading
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Literal, NamedTuple, Optional
+
+from app.core.startup import StartupReport
+
+# Created before the framework imports so the report can time them.
+STARTUP_REPORT = StartupReport()
+
 from fastapi import Depends, FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+STARTUP_REPORT.phase("framework imports")
 
 from app.calculators.common import percent_diff
 from app.calculators.compression import (
@@ -18,19 +38,72 @@ from app.calculators.rl import (
     classify_smoothness,
 )
 from app.calculators.sprocket import (
-    calculate_center_distance_mm,
+    CENTER_DISTANCE_MAX_MM,
+    CENTER_DISTANCE_MIN_MM,
     calculate_chain_length_mm,
     calculate_ratio,
     chain_pitch_to_mm,
+    search_gearing,
+    solve_center_distance,
+)
+from app.calculators.tires import calculate_assembly_width_mm, calculate_diameter_mm
+from app.data.sprocket_table import (
+    configure_sprocket_table,
+    lookup_center_distance_mm,
+    sprocket_table_version,
+)
+from app.data.tires_catalog import (
+    TireCatalogMismatch,
+    open_tire_catalog,
+    open_tire_catalog_version,
+)
+from app.data.tires_payloads import (
+    current_tire_payloads,
+    get_tire_payloads,
+    tire_payloads_built,
+)
+from app.data.tires_db import (
+    TireCatalog,
+    get_tire_catalog,
+    pinned_tire_catalog,
+    set_tire_catalog,
+)
+from app.core.cache import (
+    ResultCache,
+    cache_key,
+    configure_result_cache,
+    get_result_cache,
 )
-from app.calculators.tires import (
-    calculate_assembly_width_mm,
-    calculate_diameter_mm,
-    parse_flotation,
-    parse_motorcycle_flotation,
+from app.core.etag import calculator_version, etag_matches, make_etag
+from app.core.metrics import (
+    REGISTRY,
+    MetricsMiddleware,
+    configure_shared_metrics,
+    mark_compute_finished,
+    mark_handler_started,
+    publish_metrics,
+    record_error_code,
+    render_metrics,
+    set_shared_metrics,
 )
-from app.data.tires_db import TIRES_DB
-from app.core.security import require_internal_key
+from app.core.offload import (
+    OffloadPool,
+    OffloadRejected,
+    OffloadWorkerLost,
+    configure_offload_pool,
+    get_offload_pool,
+    set_offload_pool,
+)
+from app.core.precompressed import PrecompressedBody
+from app.core.profiling import (
+    ProfileSampler,
+    ProfilingMiddleware,
+    attach_remote_stats,
+    profile_requested,
+    run_collecting_stats,
+    run_profiled,
+)
+from app.core.security import reload_internal_keys, require_internal_key
 from app.core.units import (
     cc_to_cuin,
     cc_to_liters,
@@ -39,24 +112,309 @@ from app.core.units import (
     resolve_unit_system,
     cuin_to_cc,
 )
-from app.schemas.common import ErrorResponse
+from app.schemas.common import BatchRequest, ErrorResponse, SchemaModel
 from app.schemas.displacement import (
+    DisplacementBatchResponse,
+    DisplacementInputs,
     DisplacementRequest,
     DisplacementResponse,
     DisplacementNormalizedInputs,
     DisplacementResults,
+    DisplacementSweepAxes,
+    DisplacementSweepColumns,
+    DisplacementSweepInputs,
+    DisplacementSweepPoint,
+    DisplacementSweepRequest,
+    DisplacementSweepResponse,
+    SweepRange,
+)
+from app.schemas.compression import (
+    CompressionInputs,
+    CompressionNormalizedInputs,
+    CompressionResults,
+)
+from app.schemas.rl import (
+    RLBatchResponse,
+    RLInputs,
+    RLRequest,
+    RLResponse,
+    RLNormalizedInputs,
+    RLResults,
 )
-from app.schemas.compression import CompressionNormalizedInputs, CompressionResults
-from app.schemas.rl import RLRequest, RLResponse, RLNormalizedInputs, RLResults
 from app.schemas.sprocket import (
+    CenterDistanceDiagnostics,
+    SprocketBatchResponse,
+    SprocketDiagnostics,
+    SprocketInputs,
     SprocketRequest,
     SprocketResponse,
     SprocketNormalizedInputs,
+    SprocketOptimizeInputs,
+    SprocketOptimizeCandidate,
+    SprocketOptimizeRequest,
+    SprocketOptimizeResponse,
     SprocketResults,
 )
-from app.schemas.tires import TiresRequest, TiresResponse, TiresNormalizedInputs, TiresResults
+from app.schemas.tires import (
+    TiresBatchResponse,
+    TiresEquivalent,
+    TiresEquivalentsInputs,
+    TiresEquivalentsRequest,
+    TiresEquivalentsResponse,
+    TiresInputs,
+    TiresRequest,
+    TiresResponse,
+    TiresNormalizedInputs,
+    TiresResults,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+STARTUP_REPORT.phase("app imports")
+
+BATCH_MAX_ITEMS = int(os.getenv("PTP_BATCH_MAX_ITEMS", "100"))
+SWEEP_MAX_POINTS = int(os.getenv("PTP_SWEEP_MAX_POINTS", "100000"))
+FAST_JSON = os.getenv("PTP_FAST_JSON", "").lower() in ("1", "true", "yes")
+CACHE_MAX_ENTRIES = int(os.getenv("PTP_CACHE_MAX_ENTRIES", "0"))
+CACHE_MAX_BYTES = int(os.getenv("PTP_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("PTP_CACHE_TTL_SECONDS", "300"))
+CACHE_BACKEND = os.getenv("PTP_CACHE_BACKEND", "memory")
+CACHE_SQLITE_PATH = os.getenv("PTP_CACHE_SQLITE_PATH", "/tmp/ptp-result-cache.sqlite3")
+ETAG_ENABLED = os.getenv("PTP_ETAG", "").lower() in ("1", "true", "yes")
+CACHE_CONTROL = os.getenv("PTP_CACHE_CONTROL", "no-cache")
+TIRES_CATALOG_PATH = os.getenv("PTP_TIRES_CATALOG", "")
+TIRES_WATCH_SECONDS = float(os.getenv("PTP_TIRES_WATCH_SECONDS", "0"))
+DATA_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+METRICS_ENABLED = os.getenv("PTP_METRICS", "1").lower() in ("1", "true", "yes")
+METRICS_DIR = os.getenv("PTP_METRICS_DIR", "")
+METRICS_PUBLISH_SECONDS = float(os.getenv("PTP_METRICS_PUBLISH_SECONDS", "1"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PTP_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_HEADER_ENABLED = os.getenv("PTP_PROFILE_HEADER", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PTP_PROFILE_DIR")
+PROFILING_ENABLED = PROFILE_SAMPLE_RATE > 0 or PROFILE_HEADER_ENABLED
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SWEEP_AXES = ("bore", "stroke", "deck_height", "gasket_thickness", "chamber_volume")
+SWEEP_STREAM_CHUNK_POINTS = 1024
+BATCH_STREAM_CHUNK_ITEMS = 16
+OFFLOAD_WORKERS = int(os.getenv("PTP_OFFLOAD_WORKERS", "0"))
+OFFLOAD_QUEUE_DEPTH = int(os.getenv("PTP_OFFLOAD_QUEUE_DEPTH", "8"))
+OFFLOAD_RETRY_AFTER_SECONDS = int(os.getenv("PTP_OFFLOAD_RETRY_AFTER_SECONDS", "1"))
+OFFLOAD_NICE = int(os.getenv("PTP_OFFLOAD_NICE", "19"))
+OFFLOAD_BATCH_MIN_ITEMS = int(os.getenv("PTP_OFFLOAD_BATCH_MIN_ITEMS", "50"))
+OFFLOAD_SWEEP_MIN_POINTS = int(os.getenv("PTP_OFFLOAD_SWEEP_MIN_POINTS", "5000"))
+OFFLOAD_OPTIMIZE_MIN_COMBINATIONS = int(
+    os.getenv("PTP_OFFLOAD_OPTIMIZE_MIN_COMBINATIONS", "50000")
+)
+STARTUP_REPORT_ENABLED = os.getenv("PTP_STARTUP_REPORT", "").lower() in ("1", "true", "yes")
+WARM_UP_DELAY_SECONDS = float(os.getenv("PTP_WARM_UP_DELAY_SECONDS", "1"))
+FLOTATION_VEHICLE_TYPES = {"LightTruck", "Kart", "Kartcross", "Motorcycle"}
 
-app = FastAPI(title="PowerTunePro Calculators - Backend")
+logger = logging.getLogger("uvicorn.error")
+_TIRES_RELOAD_LOCK = asyncio.Lock()
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+_TIRE_RELEASE: Optional["_TireRelease"] = None
+_TIRE_RELEASE_LOCK = threading.RLock()
+
+
+class _TireRelease(NamedTuple):
+    catalog: TireCatalog
+    calculator_version: str
+
+
+def _prepare_tire_release(catalog: TireCatalog) -> _TireRelease:
+    # Everything a calc request reads is built here, before it is published. The
+    # /v1/data/tires bodies are not: only those routes need them (get_tire_payloads).
+    return _TireRelease(
+        catalog,
+        calculator_version(catalog.version, sprocket_table_version=sprocket_table_version()),
+    )
+
+
+def _publish_tire_release(release: Optional[_TireRelease]) -> None:
+    global _TIRE_RELEASE
+    # Requests read the release through one reference, so the catalog they compute on and
+    # the version in their cache key and ETag always come from the same release. None
+    # leaves the release to be built on first use from the current catalog.
+    with _TIRE_RELEASE_LOCK:
+        if release is not None:
+            set_tire_catalog(release.catalog)
+        _TIRE_RELEASE = release
+
+
+def _tire_release() -> _TireRelease:
+    release = _TIRE_RELEASE
+    if release is None:
+        # Built by the warm-up or the first request that needs it, not at startup; the lock
+        # keeps a reload published meanwhile from being overwritten by this older release.
+        with _TIRE_RELEASE_LOCK:
+            release = _TIRE_RELEASE
+            if release is None:
+                release = _prepare_tire_release(get_tire_catalog())
+                _publish_tire_release(release)
+    return release
+
+
+async def reload_tire_catalog(reason: str) -> tuple[TireCatalog, bool]:
+    async with _TIRES_RELOAD_LOCK:
+        started = time.perf_counter()
+        catalog = await asyncio.to_thread(open_tire_catalog, TIRES_CATALOG_PATH)
+        changed = catalog.version != get_tire_catalog().version
+        if changed:
+            _publish_tire_release(await asyncio.to_thread(_prepare_tire_release, catalog))
+            if tire_payloads_built():
+                # Rebuilt now rather than by the next /v1/data/tires request.
+                await asyncio.to_thread(get_tire_payloads)
+        logger.info(
+            "Tire catalog reload (%s): version %s, %s in %.1f ms",
+            reason,
+            catalog.version,
+            "published" if changed else "unchanged",
+            (time.perf_counter() - started) * 1000.0,
+        )
+        return catalog, changed
+
+
+async def _reload_tire_catalog_logged(reason: str) -> None:
+    try:
+        await reload_tire_catalog(reason)
+    except Exception:
+        logger.exception("Tire catalog reload (%s) failed; keeping the current catalog", reason)
+
+
+def _file_signature(path: str) -> Optional[tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+async def watch_tire_catalog(path: str, interval_seconds: float) -> None:
+    # Polling keeps this dependency-free; replace the file by renaming a new one over it.
+    last = _file_signature(path)
+    while True:
+        await asyncio.sleep(interval_seconds)
+        signature = _file_signature(path)
+        if signature is not None and signature != last:
+            last = signature
+            await _reload_tire_catalog_logged("file change")
+
+
+def _spawn(coroutine) -> None:
+    # The loop only keeps weak references to tasks; this set keeps them alive until done.
+    task = asyncio.get_running_loop().create_task(coroutine)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+def _warm_up(report: StartupReport) -> None:
+    # Work kept off the startup path: the tire index, the calculator version (which hashes
+    # the app's code) and the precompressed /v1/data/tires bodies, numpy with the vectorized calculators (sweeps) and the schema
+    # validators, whose build is deferred at import. The OpenAPI schema is not warmed;
+    # FastAPI builds it on the first /openapi.json request.
+    get_tire_catalog()
+    report.phase("tire index")
+    _tire_release()
+    report.phase("calculator version")
+    get_tire_payloads()
+    report.phase("tire payloads")
+    from app.calculators import vectorized  # noqa: F401
+
+    report.phase("numpy")
+    pending = [SchemaModel]
+    while pending:
+        model = pending.pop()
+        model.model_rebuild()
+        pending.extend(model.__subclasses__())
+    report.phase("schemas")
+
+
+async def warm_up(delay_seconds: float) -> None:
+    # Delayed so the request that woke the instance is not slowed down: the warm-up thread
+    # holds the GIL for most of its run.
+    await asyncio.sleep(delay_seconds)
+    report = StartupReport(include_process=False)
+    try:
+        await asyncio.to_thread(_warm_up, report)
+    except Exception:
+        logger.exception("Startup warm-up failed; the rest loads on first use")
+        return
+    if STARTUP_REPORT_ENABLED:
+        report.log("warm-up")
+
+
+def _on_sighup() -> None:
+    reload_internal_keys()
+    _spawn(_reload_tire_catalog_logged("SIGHUP"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    STARTUP_REPORT.phase("server setup")
+    reload_internal_keys()
+    if hasattr(signal, "SIGHUP"):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, _on_sighup)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Only the main thread can own signal handlers (not the case under TestClient).
+            pass
+    configure_sprocket_table(os.getenv("PTP_SPROCKET_TABLE"))
+    configure_result_cache(
+        CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS, CACHE_BACKEND, CACHE_SQLITE_PATH
+    )
+    # A configured catalog file is opened now so a bad path fails startup; the builtin
+    # catalog and the release are built by the warm-up or on first use.
+    set_tire_catalog(open_tire_catalog(TIRES_CATALOG_PATH) if TIRES_CATALOG_PATH else None)
+    _publish_tire_release(None)
+    watcher = None
+    if TIRES_CATALOG_PATH and TIRES_WATCH_SECONDS > 0:
+        watcher = asyncio.create_task(watch_tire_catalog(TIRES_CATALOG_PATH, TIRES_WATCH_SECONDS))
+    pool = configure_offload_pool(
+        OFFLOAD_WORKERS,
+        OFFLOAD_QUEUE_DEPTH,
+        OFFLOAD_RETRY_AFTER_SECONDS,
+        _init_offload_worker,
+        nice=OFFLOAD_NICE,
+    )
+    if pool is not None:
+        _spawn(pool.warm_up())
+    shared_metrics = configure_shared_metrics(METRICS_DIR if METRICS_ENABLED else "")
+    publisher = None
+    if shared_metrics is not None:
+        publisher = asyncio.create_task(
+            publish_metrics(shared_metrics, REGISTRY, METRICS_PUBLISH_SECONDS)
+        )
+    STARTUP_REPORT.phase("lifespan")
+    if STARTUP_REPORT_ENABLED:
+        STARTUP_REPORT.log("ready to serve")
+    warming = None
+    if WARM_UP_DELAY_SECONDS >= 0:
+        warming = asyncio.create_task(warm_up(WARM_UP_DELAY_SECONDS))
+    yield
+    if warming is not None:
+        warming.cancel()
+    if watcher is not None:
+        watcher.cancel()
+    if publisher is not None:
+        publisher.cancel()
+        set_shared_metrics(None)
+        shared_metrics.remove()
+    if pool is not None:
+        set_offload_pool(None)
+        pool.shutdown()
+
+
+app = FastAPI(title="PowerTunePro Calculators - Backend", lifespan=lifespan)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=REGISTRY)
+PROFILE_SAMPLER = (
+    ProfileSampler(PROFILE_SAMPLE_RATE, PROFILE_HEADER_ENABLED, PROFILE_DIR)
+    if PROFILING_ENABLED
+    else None
+)
+if PROFILE_SAMPLER is not None:
+    app.add_middleware(ProfilingMiddleware, sampler=PROFILE_SAMPLER)
 
 
 @app.get("/health")
@@ -64,23 +422,449 @@ def health():
     return {"status": "ok"}
 
 
-@app.exception_handler(RequestValidationError)
-def validation_exception_handler(request: Request, exc: RequestValidationError):
+@app.get("/metrics", dependencies=[Depends(require_internal_key)])
+async def metrics():
+    return PlainTextResponse(
+        await render_metrics(REGISTRY), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/v1/debug/profiles", dependencies=[Depends(require_internal_key)])
+def profile_summary(limit: int = 25, sort: Literal["cumulative", "tottime"] = "cumulative"):
+    if PROFILE_SAMPLER is None:
+        return {"enabled": False}
+    return {"enabled": True, **PROFILE_SAMPLER.summary(limit, sort)}
+
+
+@app.post("/v1/admin/tires/reload", dependencies=[Depends(require_internal_key)])
+async def admin_tires_reload():
+    try:
+        catalog, changed = await reload_tire_catalog("admin")
+    except Exception:
+        logger.exception("Tire catalog reload (admin) failed; keeping the current catalog")
+        record_error_code("server_error")
+        error = ErrorResponse(
+            error_code="server_error",
+            message="Tire catalog reload failed; the current catalog is still served.",
+            field_errors=[],
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=error.model_dump()
+        )
+    return {
+        "changed": changed,
+        "version": catalog.version,
+        "source": catalog.source,
+        "sizes": catalog.size_count,
+    }
+
+
+@app.get("/v1/cache/stats", dependencies=[Depends(require_internal_key)])
+def cache_stats():
+    cache = get_result_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def _data_response(request: Request, payload: PrecompressedBody, version: Optional[str]):
+    # A URL pinned to the current version never changes, so it can be cached for good;
+    # anything else revalidates with the ETag.
+    pinned = version == payload.version
+    body, encoding = payload.encoded(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": payload.etags[encoding],
+        "Cache-Control": DATA_IMMUTABLE_CACHE_CONTROL if pinned else "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if payload.not_modified(request.headers.get("if-none-match")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _tire_payloads():
+    payloads = current_tire_payloads()
+    if payloads is None:
+        payloads = await run_in_threadpool(get_tire_payloads)
+    return payloads
+
+
+@app.get("/v1/data/tires", dependencies=[Depends(require_internal_key)])
+async def data_tires(request: Request, version: Optional[str] = None):
+    return _data_response(request, (await _tire_payloads()).full, version)
+
+
+@app.get("/v1/data/tires/{vehicle_type}", dependencies=[Depends(require_internal_key)])
+async def data_tires_vehicle(vehicle_type: str, request: Request, version: Optional[str] = None):
+    payload = (await _tire_payloads()).vehicles.get(vehicle_type)
+    if payload is None:
+        record_error_code("not_found")
+        error = ErrorResponse(
+            error_code="not_found",
+            message="Unknown vehicle type.",
+            field_errors=[{"field": "vehicle_type", "reason": "invalid vehicle type"}],
+        )
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content=error.model_dump())
+    return _data_response(request, payload, version)
+
+
+def _field_errors(errors: list[dict], loc_prefix: tuple = ()) -> list[dict]:
     field_errors = []
-    for error in exc.errors():
-        loc = ".".join(str(item) for item in error.get("loc", []) if item != "body")
+    for error in errors:
+        loc_items = (*loc_prefix, *error.get("loc", []))
+        loc = ".".join(str(item) for item in loc_items if item != "body")
         field_errors.append(
             {
-                "field": loc.replace("inputs.", "inputs."),
+                "field": loc,
                 "reason": error.get("msg", "invalid value"),
             }
         )
-    response = ErrorResponse(
+    return field_errors
+
+
+def _validation_error(field_errors: list[dict]) -> ErrorResponse:
+    return ErrorResponse(
         error_code="validation_error",
         message="Invalid request payload.",
         field_errors=field_errors,
     )
-    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump())
+
+
+def _respond(result):
+    if isinstance(result, ErrorResponse):
+        record_error_code(result.error_code)
+        if FAST_JSON:
+            return Response(
+                content=result.model_dump_json(),
+                status_code=status.HTTP_400_BAD_REQUEST,
+                media_type="application/json",
+            )
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=result.model_dump())
+    if FAST_JSON:
+        # Already a validated response model: serialize directly and skip FastAPI's
+        # response_model revalidation and jsonable_encoder pass.
+        return Response(content=result.model_dump_json(), media_type="application/json")
+    return result
+
+
+async def _respond_cached(request: Request, calculator: str, payload, compute):
+    cache = get_result_cache()
+    if cache is not None and cache.blocking:
+        # A disk-backed cache can wait on its file lock (SQLite busy timeout): run the whole
+        # lookup, compute and store in the threadpool, as the sync handlers used to.
+        return await run_in_threadpool(_respond_cached_sync, request, calculator, payload, compute)
+    return _respond_cached_sync(request, calculator, payload, compute)
+
+
+def _respond_cached_sync(request: Request, calculator: str, payload, compute):
+    if PROFILING_ENABLED:
+        return run_profiled(_cached_response, request, calculator, payload, compute)
+    return _cached_response(request, calculator, payload, compute)
+
+
+async def _cache_get(cache: Optional[ResultCache], key: str) -> Optional[bytes]:
+    if cache is None:
+        return None
+    if cache.blocking:
+        return await run_in_threadpool(cache.get, key)
+    return cache.get(key)
+
+
+async def _cache_put(cache: ResultCache, key: str, body: bytes) -> None:
+    if cache.blocking:
+        await run_in_threadpool(cache.put, key, body)
+    else:
+        cache.put(key, body)
+
+
+def _conditional_headers(request: Request, key: str) -> tuple[dict, bool]:
+    headers = {}
+    if not ETAG_ENABLED:
+        return headers, False
+    headers["ETag"] = make_etag(key)
+    if CACHE_CONTROL:
+        headers["Cache-Control"] = CACHE_CONTROL
+    return headers, etag_matches(request.headers.get("if-none-match"), headers["ETag"])
+
+
+def _cached_response(request: Request, calculator: str, payload, compute):
+    mark_handler_started()
+    cache = get_result_cache()
+    if cache is None and not ETAG_ENABLED:
+        result = compute()
+        mark_compute_finished()
+        return _respond(result)
+    release = _tire_release()
+    key = cache_key(calculator, payload, release.calculator_version)
+
+    headers, not_modified = _conditional_headers(request, key)
+    if not_modified:
+        mark_compute_finished()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = cache.get(key) if cache is not None else None
+    if body is None:
+        with pinned_tire_catalog(release.catalog):
+            result = compute()
+        mark_compute_finished()
+        if isinstance(result, ErrorResponse):
+            return _respond(result)
+        body = result.model_dump_json().encode("utf-8")
+        if cache is not None:
+            cache.put(key, body)
+    else:
+        mark_compute_finished()
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _init_offload_worker() -> None:
+    configure_sprocket_table(os.getenv("PTP_SPROCKET_TABLE"))
+
+
+def _offloaded_body(
+    catalog_path: str, catalog_version: str, profiled: bool, func, *args
+) -> tuple[Optional[str], bytes, Optional[dict]]:
+    # Runs in a pool process, serialization included, so the event loop only moves bytes.
+    _follow_tire_catalog(catalog_path, catalog_version)
+    if profiled:
+        (error_code, body), stats = run_collecting_stats(_serialized_result, func, *args)
+        return error_code, body, stats
+    return (*_serialized_result(func, *args), None)
+
+
+def _offloaded_chunk(
+    catalog_path: str, catalog_version: str, func, *args
+) -> tuple[Optional[str], bytes]:
+    # One chunk of an NDJSON stream, run in a pool process like _offloaded_body.
+    _follow_tire_catalog(catalog_path, catalog_version)
+    return func(*args)
+
+
+def _follow_tire_catalog(catalog_path: str, catalog_version: str) -> None:
+    # Workers follow the parent's tire catalog across hot reloads, to the exact release the
+    # request pinned; TireCatalogMismatch sends the job back to the parent.
+    if get_tire_catalog().version != catalog_version:
+        set_tire_catalog(open_tire_catalog_version(catalog_path, catalog_version))
+
+
+def _run_pinned(catalog: TireCatalog, func, *args):
+    with pinned_tire_catalog(catalog):
+        return func(*args)
+
+
+async def _run_here(catalog: TireCatalog, func, *args):
+    logger.warning(
+        "Offload worker could not load tire catalog version %s; computing in process",
+        catalog.version,
+    )
+    return await run_in_threadpool(_run_pinned, catalog, func, *args)
+
+
+def _serialized_result(func, *args) -> tuple[Optional[str], bytes]:
+    result = func(*args)
+    error_code = result.error_code if isinstance(result, ErrorResponse) else None
+    return error_code, result.model_dump_json().encode("utf-8")
+
+
+def _overloaded(pool: OffloadPool) -> Response:
+    return _unavailable(pool, "overloaded", "Too many heavy calculations in progress; retry later.")
+
+
+def _worker_lost(pool: OffloadPool) -> Response:
+    return _unavailable(pool, "worker_lost", "The calculation worker stopped; retry later.")
+
+
+def _unavailable(pool: OffloadPool, error_code: str, message: str) -> Response:
+    record_error_code(error_code)
+    error = ErrorResponse(error_code=error_code, message=message, field_errors=[])
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=error.model_dump(),
+        headers={"Retry-After": str(pool.retry_after_seconds)},
+    )
+
+
+async def _offloaded_response(
+    request: Request, calculator: str, payload, pool: OffloadPool, func, args: tuple
+):
+    mark_handler_started()
+    cache = get_result_cache()
+    release = _tire_release()
+    key = cache_key(calculator, payload, release.calculator_version)
+    headers, not_modified = _conditional_headers(request, key)
+    if not_modified:
+        mark_compute_finished()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = await _cache_get(cache, key)
+    if body is None:
+        try:
+            error_code, body, stats = await pool.run(
+                _offloaded_body,
+                TIRES_CATALOG_PATH,
+                release.catalog.version,
+                PROFILING_ENABLED and profile_requested(),
+                func,
+                *args,
+            )
+        except OffloadRejected:
+            return _overloaded(pool)
+        except OffloadWorkerLost:
+            return _worker_lost(pool)
+        except TireCatalogMismatch:
+            error_code, body = await _run_here(release.catalog, _serialized_result, func, *args)
+            stats = None
+        mark_compute_finished()
+        if stats is not None:
+            attach_remote_stats(stats)
+        if error_code is not None:
+            record_error_code(error_code)
+            return Response(
+                content=body,
+                status_code=status.HTTP_400_BAD_REQUEST,
+                media_type="application/json",
+            )
+        if cache is not None:
+            await _cache_put(cache, key, body)
+    else:
+        mark_compute_finished()
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _respond_heavy(
+    request: Request, calculator: str, payload, work_size: int, threshold: int, func, *args
+):
+    # Small jobs run inline like single calculations. Large ones go to the process pool, or
+    # to the threadpool (the old sync-handler behavior) when no pool is configured.
+    compute = partial(func, *args)
+    if work_size < threshold:
+        return await _respond_cached(request, calculator, payload, compute)
+    pool = get_offload_pool()
+    if pool is None:
+        return await run_in_threadpool(
+            _respond_cached_sync, request, calculator, payload, compute
+        )
+    return await _offloaded_response(request, calculator, payload, pool, func, args)
+
+
+def _batch_too_large(payload: BatchRequest) -> ErrorResponse | None:
+    if len(payload.inputs) > BATCH_MAX_ITEMS:
+        return _validation_error(
+            [{"field": "inputs", "reason": f"at most {BATCH_MAX_ITEMS} items allowed"}]
+        )
+    return None
+
+
+def _batch_item(unit_system: str, raw_inputs, inputs_model, compute):
+    try:
+        inputs = inputs_model.model_validate(raw_inputs)
+    except ValidationError as exc:
+        return _validation_error(_field_errors(exc.errors(), loc_prefix=("inputs",)))
+    return compute(unit_system, inputs)
+
+
+def _run_batch(calculator: str, payload: BatchRequest, inputs_model, compute, response_model):
+    too_large = _batch_too_large(payload)
+    if too_large is not None:
+        return too_large
+
+    resolved_unit_system, warnings = resolve_unit_system(payload.unit_system)
+    items = [
+        _batch_item(payload.unit_system, raw_inputs, inputs_model, compute)
+        for raw_inputs in payload.inputs
+    ]
+
+    return response_model(
+        calculator=calculator,
+        unit_system="imperial" if resolved_unit_system == "imperial" else "metric",
+        items=items,
+        warnings=warnings,
+    )
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def _stream_batch(payload: BatchRequest, inputs_model, compute):
+    # One line per item; per-item failures are inline ErrorResponse lines, so only a
+    # request-level error can still change the status.
+    too_large = _batch_too_large(payload)
+    if too_large is not None:
+        return _respond(too_large)
+    # One catalog release for the whole stream, whatever is published meanwhile.
+    catalog = get_tire_catalog()
+    pool = get_offload_pool()
+    if pool is None or len(payload.inputs) < OFFLOAD_BATCH_MIN_ITEMS:
+
+        def lines():
+            # StreamingResponse iterates sync generators in the threadpool, an item at a time.
+            for raw_inputs in payload.inputs:
+                with pinned_tire_catalog(catalog):
+                    item = _batch_item(payload.unit_system, raw_inputs, inputs_model, compute)
+                yield item.model_dump_json().encode("utf-8") + b"\n"
+
+        return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+    chunks = [
+        (
+            _batch_lines,
+            payload.unit_system,
+            payload.inputs[start : start + BATCH_STREAM_CHUNK_ITEMS],
+            inputs_model,
+            compute,
+        )
+        for start in range(0, len(payload.inputs), BATCH_STREAM_CHUNK_ITEMS)
+    ]
+    return await _offloaded_stream(pool, catalog, chunks)
+
+
+def _batch_lines(
+    unit_system: str, raw_items: list, inputs_model, compute
+) -> tuple[Optional[str], bytes]:
+    items = (
+        _batch_item(unit_system, raw_inputs, inputs_model, compute) for raw_inputs in raw_items
+    )
+    return None, b"".join(item.model_dump_json().encode("utf-8") + b"\n" for item in items)
+
+
+async def _offloaded_stream(pool: OffloadPool, catalog: TireCatalog, chunks: list[tuple]):
+    # The first chunk is computed before the response starts: a full pool still answers 503
+    # and a request-level error 400. The rest follow one at a time, admitted with it: each
+    # waits for a free pool slot rather than answering 503 mid-stream, so a stream holds at
+    # most one slot and memory stays flat in its size.
+    async def compute(run, chunk: tuple) -> tuple[Optional[str], bytes]:
+        try:
+            return await run(_offloaded_chunk, TIRES_CATALOG_PATH, catalog.version, *chunk)
+        except TireCatalogMismatch:
+            return await _run_here(catalog, *chunk)
+
+    try:
+        error_code, body = await compute(pool.run, chunks[0])
+    except OffloadRejected:
+        return _overloaded(pool)
+    except OffloadWorkerLost:
+        return _worker_lost(pool)
+    if error_code is not None:
+        record_error_code(error_code)
+        return Response(
+            content=body, status_code=status.HTTP_400_BAD_REQUEST, media_type="application/json"
+        )
+
+    async def lines():
+        yield body
+        for chunk in chunks[1:]:
+            _, chunk_body = await compute(pool.run_admitted, chunk)
+            yield chunk_body
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@app.exception_handler(RequestValidationError)
+def validation_exception_handler(request: Request, exc: RequestValidationError):
+    return _respond(_validation_error(_field_errors(exc.errors())))
 
 
 @app.post(
@@ -88,32 +872,367 @@ def validation_exception_handler(request: Request, exc: RequestValidationError):
     response_model=DisplacementResponse,
     dependencies=[Depends(require_internal_key)],
 )
-def calc_displacement(payload: DisplacementRequest):
-    resolved_unit_system, warnings = resolve_unit_system(payload.unit_system)
+async def calc_displacement(payload: DisplacementRequest, request: Request):
+    return await _respond_cached(
+        request, "displacement", payload, lambda: _displacement(payload.unit_system, payload.inputs)
+    )
+
+
+@app.post(
+    "/v1/calc/displacement/batch",
+    response_model=DisplacementBatchResponse,
+    dependencies=[Depends(require_internal_key)],
+)
+async def calc_displacement_batch(payload: BatchRequest, request: Request):
+    if _wants_ndjson(request):
+        return await _stream_batch(payload, DisplacementInputs, _displacement)
+    return await _respond_heavy(
+        request,
+        "displacement/batch",
+        payload,
+        len(payload.inputs),
+        OFFLOAD_BATCH_MIN_ITEMS,
+        _run_batch,
+        "displacement",
+        payload,
+        DisplacementInputs,
+        _displacement,
+        DisplacementBatchResponse,
+    )
+
+
+@app.post(
+    "/v1/calc/displacement/sweep",
+    response_model=DisplacementSweepResponse,
+    dependencies=[Depends(require_internal_key)],
+)
+async def calc_displacement_sweep(payload: DisplacementSweepRequest, request: Request):
+    if _wants_ndjson(request):
+        return await _stream_sweep(payload.unit_system, payload.inputs)
+    shape = _sweep_shape(payload.inputs)
+    if isinstance(shape, ErrorResponse):
+        return _respond(shape)
+    return await _respond_heavy(
+        request,
+        "displacement/sweep",
+        payload,
+        math.prod(shape),
+        OFFLOAD_SWEEP_MIN_POINTS,
+        _displacement_sweep,
+        payload.unit_system,
+        payload.inputs,
+        payload.layout,
+    )
+
+
+def _sweep_count(sweep_range: SweepRange | None) -> int | None:
+    if sweep_range is None or sweep_range.stop is None or sweep_range.stop == sweep_range.start:
+        return 1
+    # A tiny step can make the quotient infinite (None); past the grid limit any count over
+    # it will do, so huge quotients never reach int().
+    steps = (sweep_range.stop - sweep_range.start) / sweep_range.step
+    if not math.isfinite(steps):
+        return None
+    if steps >= SWEEP_MAX_POINTS:
+        return SWEEP_MAX_POINTS + 1
+    return int(math.floor(steps + 1e-9)) + 1
+
+
+def _sweep_ranges(inputs: DisplacementSweepInputs) -> list[SweepRange | None]:
+    return [
+        inputs.bore,
+        inputs.stroke,
+        inputs.deck_height,
+        inputs.gasket_thickness,
+        inputs.chamber_volume,
+    ]
+
+
+def _sweep_shape(inputs: DisplacementSweepInputs) -> list[int] | ErrorResponse:
+    shape = []
+    for field, sweep_range in zip(SWEEP_AXES, _sweep_ranges(inputs)):
+        count = _sweep_count(sweep_range)
+        if count is None:
+            return _validation_error(
+                [{"field": f"inputs.{field}", "reason": "range has too many steps"}]
+            )
+        shape.append(count)
+    if math.prod(shape) > SWEEP_MAX_POINTS:
+        return _validation_error(
+            [{"field": "inputs", "reason": f"sweep grid exceeds {SWEEP_MAX_POINTS} points"}]
+        )
+    return shape
+
+
+def _sweep_axis(sweep_range: SweepRange | None, count: int) -> "np.ndarray":
+    # numpy is only needed by sweeps, so it is imported on first use (or by the startup
+    # warm-up) instead of at startup.
+    import numpy as np
+
+    if sweep_range is None:
+        return np.zeros(1)
+    if count == 1:
+        return np.array([sweep_range.start], dtype=np.float64)
+    return np.round(sweep_range.start + sweep_range.step * np.arange(count), 9)
+
+
+def _round_values(values: "np.ndarray") -> list[float]:
+    return [round(value, 2) for value in values.ravel().tolist()]
+
+
+class _SweepGrid(NamedTuple):
+    resolved_unit_system: str
+    warnings: list[str]
+    shape: list[int]
+    points_count: int
+    bore_mm: "np.ndarray"
+    stroke_mm: "np.ndarray"
+    deck_height_mm: "np.ndarray"
+    gasket_thickness_mm: "np.ndarray"
+    chamber_cc: "np.ndarray"
+    gasket_bore_mm: Optional[float]
+    piston_volume_cc: float
+    displacement_cc: "np.ndarray"
+    ratio: "np.ndarray"
+
 
-    bore = payload.inputs.bore
-    stroke = payload.inputs.stroke
-    cylinders = payload.inputs.cylinders
-    baseline_cc = payload.inputs.baseline_cc
+def _sweep_grid(unit_system: str, inputs: DisplacementSweepInputs) -> _SweepGrid | ErrorResponse:
+    from app.calculators import vectorized
+
+    resolved_unit_system, warnings = resolve_unit_system(unit_system)
+
+    shape = _sweep_shape(inputs)
+    if isinstance(shape, ErrorResponse):
+        return shape
+    points_count = math.prod(shape)
+
+    bore_mm, stroke_mm, deck_height_mm, gasket_thickness_mm, chamber_cc = (
+        _sweep_axis(sweep_range, count)
+        for sweep_range, count in zip(_sweep_ranges(inputs), shape)
+    )
+    gasket_bore_mm = inputs.gasket_bore
+    piston_volume_cc = inputs.piston_volume or 0.0
 
     if resolved_unit_system == "imperial":
-        bore_mm = inches_to_mm(bore)
-        stroke_mm = inches_to_mm(stroke)
+        bore_mm = inches_to_mm(bore_mm)
+        stroke_mm = inches_to_mm(stroke_mm)
+        deck_height_mm = inches_to_mm(deck_height_mm)
+        gasket_thickness_mm = inches_to_mm(gasket_thickness_mm)
+        chamber_cc = cuin_to_cc(chamber_cc)
+        piston_volume_cc = cuin_to_cc(piston_volume_cc)
+        if gasket_bore_mm is not None:
+            gasket_bore_mm = inches_to_mm(gasket_bore_mm)
+
+    errors = []
+    if (bore_mm <= 0).any():
+        errors.append({"field": "inputs.bore", "reason": "must be greater than zero"})
+    if (stroke_mm <= 0).any():
+        errors.append({"field": "inputs.stroke", "reason": "must be greater than zero"})
+    if (chamber_cc <= 0).any():
+        errors.append({"field": "inputs.chamber_volume", "reason": "must be greater than zero"})
+    if (gasket_thickness_mm < 0).any():
+        errors.append({"field": "inputs.gasket_thickness", "reason": "must not be negative"})
+    if errors:
+        return _validation_error(errors)
+
+    bore_grid = bore_mm.reshape(-1, 1, 1, 1, 1)
+    stroke_grid = stroke_mm.reshape(1, -1, 1, 1, 1)
+    deck_grid = deck_height_mm.reshape(1, 1, -1, 1, 1)
+    gasket_grid = gasket_thickness_mm.reshape(1, 1, 1, -1, 1)
+    chamber_grid = chamber_cc.reshape(1, 1, 1, 1, -1)
+
+    displacement_cc = vectorized.calculate_displacement_cc(bore_grid, stroke_grid, inputs.cylinders)
+    swept_cc = vectorized.swept_volume_cc(bore_grid, stroke_grid)
+    gasket_cc = vectorized.gasket_volume_cc(
+        bore_grid if gasket_bore_mm is None else gasket_bore_mm, gasket_grid
+    )
+    deck_cc = vectorized.deck_volume_cc(bore_grid, deck_grid)
+    clearance_cc = vectorized.clearance_volume_cc(
+        chamber_grid, gasket_cc, deck_cc, piston_volume_cc
+    )
+    if (clearance_cc <= 0).any():
+        return _validation_error(
+            [{"field": "inputs", "reason": "clearance volume must be positive"}]
+        )
+    ratio = vectorized.compression_ratio(swept_cc, clearance_cc)
+
+    return _SweepGrid(
+        resolved_unit_system,
+        warnings,
+        shape,
+        points_count,
+        bore_mm,
+        stroke_mm,
+        deck_height_mm,
+        gasket_thickness_mm,
+        chamber_cc,
+        gasket_bore_mm,
+        piston_volume_cc,
+        displacement_cc,
+        ratio,
+    )
+
+
+def _displacement_sweep(
+    unit_system: str, inputs: DisplacementSweepInputs, layout: str
+) -> DisplacementSweepResponse | ErrorResponse:
+    import numpy as np
+
+    grid = _sweep_grid(unit_system, inputs)
+    if isinstance(grid, ErrorResponse):
+        return grid
+
+    displacement_values = _round_values(np.broadcast_to(grid.displacement_cc, grid.shape))
+    ratio_values = _round_values(np.broadcast_to(grid.ratio, grid.shape))
+
+    axes = DisplacementSweepAxes(
+        bore_mm=grid.bore_mm.tolist(),
+        stroke_mm=grid.stroke_mm.tolist(),
+        deck_height_mm=grid.deck_height_mm.tolist(),
+        gasket_thickness_mm=grid.gasket_thickness_mm.tolist(),
+        chamber_volume_cc=grid.chamber_cc.tolist(),
+    )
+
+    columns = None
+    points = None
+    if layout == "records":
+        mesh = np.meshgrid(
+            grid.bore_mm,
+            grid.stroke_mm,
+            grid.deck_height_mm,
+            grid.gasket_thickness_mm,
+            grid.chamber_cc,
+            indexing="ij",
+        )
+        points = [
+            DisplacementSweepPoint(
+                bore_mm=bore,
+                stroke_mm=stroke,
+                deck_height_mm=deck,
+                gasket_thickness_mm=gasket,
+                chamber_volume_cc=chamber,
+                displacement_cc=displacement,
+                compression_ratio=compression,
+            )
+            for bore, stroke, deck, gasket, chamber, displacement, compression in zip(
+                *(axis.ravel().tolist() for axis in mesh), displacement_values, ratio_values
+            )
+        ]
     else:
-        bore_mm = bore
-        stroke_mm = stroke
+        columns = DisplacementSweepColumns(
+            displacement_cc=displacement_values,
+            compression_ratio=ratio_values,
+        )
 
-    displacement_cc_raw = calculate_displacement_cc(bore_mm, stroke_mm, cylinders)
-    geometry = classify_geometry(bore_mm, stroke_mm)
+    return DisplacementSweepResponse(
+        calculator="displacement",
+        unit_system="imperial" if grid.resolved_unit_system == "imperial" else "metric",
+        layout=layout,
+        cylinders=inputs.cylinders,
+        gasket_bore_mm=grid.gasket_bore_mm,
+        piston_volume_cc=grid.piston_volume_cc,
+        axes=axes,
+        shape=grid.shape,
+        points_count=grid.points_count,
+        columns=columns,
+        points=points,
+        warnings=grid.warnings,
+    )
 
-    diff_percent = None
-    if baseline_cc is not None:
-        diff_percent = percent_diff(displacement_cc_raw, baseline_cc)
 
-    compression_results = None
-    if payload.inputs.compression:
-        compression = payload.inputs.compression
-        mode = compression.mode
+async def _stream_sweep(unit_system: str, inputs: DisplacementSweepInputs):
+    shape = _sweep_shape(inputs)
+    if isinstance(shape, ErrorResponse):
+        return _respond(shape)
+    points_count = math.prod(shape)
+    pool = get_offload_pool()
+    if pool is not None and points_count >= OFFLOAD_SWEEP_MIN_POINTS:
+        inputs_json = inputs.model_dump_json()
+        chunks = [
+            (
+                _sweep_stream_chunk,
+                unit_system,
+                inputs_json,
+                start,
+                min(start + SWEEP_STREAM_CHUNK_POINTS, points_count),
+            )
+            for start in range(0, points_count, SWEEP_STREAM_CHUNK_POINTS)
+        ]
+        return await _offloaded_stream(pool, get_tire_catalog(), chunks)
+
+    if points_count >= OFFLOAD_SWEEP_MIN_POINTS:
+        grid = await run_in_threadpool(_sweep_grid, unit_system, inputs)
+    else:
+        grid = _sweep_grid(unit_system, inputs)
+    if isinstance(grid, ErrorResponse):
+        return _respond(grid)
+
+    def lines():
+        # StreamingResponse iterates sync generators in the threadpool; each chunk is only
+        # whole lines, in records order, so memory stays flat in the grid size.
+        for start in range(0, grid.points_count, SWEEP_STREAM_CHUNK_POINTS):
+            stop = min(start + SWEEP_STREAM_CHUNK_POINTS, grid.points_count)
+            yield _sweep_lines(grid, start, stop)
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@lru_cache(maxsize=2)
+def _pooled_sweep_grid(unit_system: str, inputs_json: str) -> _SweepGrid | ErrorResponse:
+    # Pool processes keep the last grids, so the chunks of one stream build theirs once.
+    return _sweep_grid(unit_system, DisplacementSweepInputs.model_validate_json(inputs_json))
+
+
+def _sweep_stream_chunk(
+    unit_system: str, inputs_json: str, start: int, stop: int
+) -> tuple[Optional[str], bytes]:
+    grid = _pooled_sweep_grid(unit_system, inputs_json)
+    if isinstance(grid, ErrorResponse):
+        return grid.error_code, grid.model_dump_json().encode("utf-8")
+    return None, _sweep_lines(grid, start, stop)
+
+
+def _sweep_lines(grid: _SweepGrid, start: int, stop: int) -> bytes:
+    import numpy as np
+
+    axes = (
+        grid.bore_mm,
+        grid.stroke_mm,
+        grid.deck_height_mm,
+        grid.gasket_thickness_mm,
+        grid.chamber_cc,
+    )
+    index = np.unravel_index(np.arange(start, stop), grid.shape)
+    values = [axis[axis_index].tolist() for axis, axis_index in zip(axes, index)]
+    displacement_values = _round_values(np.broadcast_to(grid.displacement_cc, grid.shape)[index])
+    ratio_values = _round_values(np.broadcast_to(grid.ratio, grid.shape)[index])
+    return b"".join(
+        DisplacementSweepPoint(
+            bore_mm=bore,
+            stroke_mm=stroke,
+            deck_height_mm=deck,
+            gasket_thickness_mm=gasket,
+            chamber_volume_cc=chamber,
+            displacement_cc=displacement,
+            compression_ratio=compression,
+        )
+        .model_dump_json()
+        .encode("utf-8")
+        + b"\n"
+        for bore, stroke, deck, gasket, chamber, displacement, compression in zip(
+            *values, displacement_values, ratio_values
+        )
+    )
+
+
+def _compression_stage(
+    resolved_unit_system: str,
+    compression: CompressionInputs,
+    bore_mm: float,
+    stroke_mm: float,
+) -> tuple[CompressionResults, CompressionNormalizedInputs] | ErrorResponse:
+    mode = compression.mode
+    if mode is None:
         has_advanced_fields = any(
             value is not None
             for value in [
@@ -123,152 +1242,165 @@ def calc_displacement(payload: DisplacementRequest):
                 compression.piston_volume,
             ]
         )
-        if mode is None:
-            mode = "advanced" if has_advanced_fields else "simple"
-        chamber_cc = compression.chamber_volume
-        gasket_thickness_mm = compression.gasket_thickness
-        gasket_bore_mm = compression.gasket_bore
-        deck_height_mm = compression.deck_height
-        piston_volume_cc = compression.piston_volume
-        exhaust_height_mm = compression.exhaust_port_height
-        transfer_height_mm = compression.transfer_port_height
-        crankcase_volume_cc = compression.crankcase_volume
+        mode = "advanced" if has_advanced_fields else "simple"
+    chamber_cc = compression.chamber_volume
+    gasket_thickness_mm = compression.gasket_thickness
+    gasket_bore_mm = compression.gasket_bore
+    deck_height_mm = compression.deck_height
+    piston_volume_cc = compression.piston_volume
+    exhaust_height_mm = compression.exhaust_port_height
+    transfer_height_mm = compression.transfer_port_height
+    crankcase_volume_cc = compression.crankcase_volume
 
-        if resolved_unit_system == "imperial":
-            chamber_cc = cuin_to_cc(chamber_cc)
-            if piston_volume_cc is not None:
-                piston_volume_cc = cuin_to_cc(piston_volume_cc)
-            if mode == "advanced":
-                if gasket_thickness_mm is not None:
-                    gasket_thickness_mm = inches_to_mm(gasket_thickness_mm)
-                if gasket_bore_mm is not None:
-                    gasket_bore_mm = inches_to_mm(gasket_bore_mm)
-                if deck_height_mm is not None:
-                    deck_height_mm = inches_to_mm(deck_height_mm)
-            if exhaust_height_mm is not None:
-                exhaust_height_mm = inches_to_mm(exhaust_height_mm)
-            if transfer_height_mm is not None:
-                transfer_height_mm = inches_to_mm(transfer_height_mm)
-            if crankcase_volume_cc is not None:
-                crankcase_volume_cc = cuin_to_cc(crankcase_volume_cc)
-
-        if mode == "simple":
-            gasket_thickness_mm = 0.0
-            gasket_bore_mm = bore_mm
-            deck_height_mm = 0.0
-            piston_volume_cc = 0.0
-
-        if chamber_cc <= 0:
-            response = ErrorResponse(
-                error_code="validation_error",
-                message="Invalid request payload.",
-                field_errors=[
-                    {"field": "inputs.compression", "reason": "invalid compression inputs"}
-                ],
+    if resolved_unit_system == "imperial":
+        chamber_cc = cuin_to_cc(chamber_cc)
+        if piston_volume_cc is not None:
+            piston_volume_cc = cuin_to_cc(piston_volume_cc)
+        if mode == "advanced":
+            if gasket_thickness_mm is not None:
+                gasket_thickness_mm = inches_to_mm(gasket_thickness_mm)
+            if gasket_bore_mm is not None:
+                gasket_bore_mm = inches_to_mm(gasket_bore_mm)
+            if deck_height_mm is not None:
+                deck_height_mm = inches_to_mm(deck_height_mm)
+        if exhaust_height_mm is not None:
+            exhaust_height_mm = inches_to_mm(exhaust_height_mm)
+        if transfer_height_mm is not None:
+            transfer_height_mm = inches_to_mm(transfer_height_mm)
+        if crankcase_volume_cc is not None:
+            crankcase_volume_cc = cuin_to_cc(crankcase_volume_cc)
+
+    if mode == "simple":
+        gasket_thickness_mm = 0.0
+        gasket_bore_mm = bore_mm
+        deck_height_mm = 0.0
+        piston_volume_cc = 0.0
+
+    if chamber_cc <= 0:
+        return _validation_error(
+            [{"field": "inputs.compression", "reason": "invalid compression inputs"}]
+        )
+
+    if mode == "advanced":
+        if (
+            gasket_thickness_mm is None
+            or gasket_bore_mm is None
+            or deck_height_mm is None
+            or piston_volume_cc is None
+        ):
+            return _validation_error(
+                [{"field": "inputs.compression", "reason": "missing advanced inputs"}]
+            )
+        if gasket_thickness_mm <= 0 or gasket_bore_mm <= 0:
+            return _validation_error(
+                [{"field": "inputs.compression", "reason": "invalid compression inputs"}]
             )
-            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump())
 
-        if mode == "advanced":
-            if (
-                gasket_thickness_mm is None
-                or gasket_bore_mm is None
-                or deck_height_mm is None
-                or piston_volume_cc is None
-            ):
-                response = ErrorResponse(
-                    error_code="validation_error",
-                    message="Invalid request payload.",
-                    field_errors=[
-                        {"field": "inputs.compression", "reason": "missing advanced inputs"}
-                    ],
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump()
-                )
-            if gasket_thickness_mm <= 0 or gasket_bore_mm <= 0:
-                response = ErrorResponse(
-                    error_code="validation_error",
-                    message="Invalid request payload.",
-                    field_errors=[
-                        {
-                            "field": "inputs.compression",
-                            "reason": "invalid compression inputs",
-                        }
-                    ],
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump()
-                )
+    gasket_thickness_mm = gasket_thickness_mm or 0.0
+    gasket_bore_mm = gasket_bore_mm or bore_mm
+    deck_height_mm = deck_height_mm or 0.0
+    piston_volume_cc = piston_volume_cc or 0.0
+
+    normalized = CompressionNormalizedInputs(
+        mode=mode,
+        chamber_volume=chamber_cc,
+        gasket_thickness=gasket_thickness_mm,
+        gasket_bore=gasket_bore_mm,
+        deck_height=deck_height_mm,
+        piston_volume=piston_volume_cc,
+        exhaust_port_height=exhaust_height_mm,
+        transfer_port_height=transfer_height_mm,
+        crankcase_volume=crankcase_volume_cc,
+    )
 
-        gasket_thickness_mm = gasket_thickness_mm or 0.0
-        gasket_bore_mm = gasket_bore_mm or bore_mm
-        deck_height_mm = deck_height_mm or 0.0
-        piston_volume_cc = piston_volume_cc or 0.0
+    gasket_cc = gasket_volume_cc(gasket_bore_mm, gasket_thickness_mm)
+    deck_cc = deck_volume_cc(bore_mm, deck_height_mm)
+    clearance_cc = clearance_volume_cc(chamber_cc, gasket_cc, deck_cc, piston_volume_cc)
+    if clearance_cc <= 0:
+        return _validation_error(
+            [{"field": "inputs.compression", "reason": "clearance volume must be positive"}]
+        )
 
-        gasket_cc = gasket_volume_cc(gasket_bore_mm, gasket_thickness_mm)
-        deck_cc = deck_volume_cc(bore_mm, deck_height_mm)
-        clearance_cc = clearance_volume_cc(chamber_cc, gasket_cc, deck_cc, piston_volume_cc)
-        if clearance_cc <= 0:
-            response = ErrorResponse(
-                error_code="validation_error",
-                message="Invalid request payload.",
-                field_errors=[
-                    {"field": "inputs.compression", "reason": "clearance volume must be positive"}
-                ],
+    swept_cc = swept_volume_cc(bore_mm, stroke_mm)
+    compression_mode = "four_stroke"
+    trapped_cc = None
+
+    port_heights = [value for value in [exhaust_height_mm, transfer_height_mm] if value]
+    if port_heights:
+        port_height_mm = min(port_heights)
+        if port_height_mm <= 0 or port_height_mm >= stroke_mm:
+            return _validation_error(
+                [
+                    {
+                        "field": "inputs.compression",
+                        "reason": "invalid port height for 2T compression",
+                    }
+                ]
             )
-            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump())
-
-        swept_cc = swept_volume_cc(bore_mm, stroke_mm)
-        compression_mode = "four_stroke"
-        trapped_cc = None
-
-        port_heights = [value for value in [exhaust_height_mm, transfer_height_mm] if value]
-        if port_heights:
-            port_height_mm = min(port_heights)
-            if port_height_mm <= 0 or port_height_mm >= stroke_mm:
-                response = ErrorResponse(
-                    error_code="validation_error",
-                    message="Invalid request payload.",
-                    field_errors=[
-                        {
-                            "field": "inputs.compression",
-                            "reason": "invalid port height for 2T compression",
-                        }
-                    ],
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump()
-                )
-            compression_mode = "two_stroke"
-            trapped_cc = trapped_swept_volume_cc(bore_mm, stroke_mm, port_height_mm)
-            swept_for_ratio = trapped_cc
-        else:
-            swept_for_ratio = swept_cc
+        compression_mode = "two_stroke"
+        trapped_cc = trapped_swept_volume_cc(bore_mm, stroke_mm, port_height_mm)
+        swept_for_ratio = trapped_cc
+    else:
+        swept_for_ratio = swept_cc
 
-        ratio = compression_ratio(swept_for_ratio, clearance_cc)
-        crankcase_ratio = None
-        if compression_mode == "two_stroke" and crankcase_volume_cc:
-            crankcase_ratio = compression_ratio(swept_cc, crankcase_volume_cc)
+    ratio = compression_ratio(swept_for_ratio, clearance_cc)
+    crankcase_ratio = None
+    if compression_mode == "two_stroke" and crankcase_volume_cc:
+        crankcase_ratio = compression_ratio(swept_cc, crankcase_volume_cc)
 
-        if resolved_unit_system == "imperial":
-            swept_out = cc_to_cuin(swept_cc)
-            clearance_out = cc_to_cuin(clearance_cc)
-            trapped_out = cc_to_cuin(trapped_cc) if trapped_cc is not None else None
-        else:
-            swept_out = swept_cc
-            clearance_out = clearance_cc
-            trapped_out = trapped_cc
-
-        compression_results = CompressionResults(
-            compression_ratio=round(ratio, 2),
-            clearance_volume=round(clearance_out, 2),
-            swept_volume=round(swept_out, 2),
-            trapped_volume=round(trapped_out, 2) if trapped_out is not None else None,
-            crankcase_compression_ratio=round(crankcase_ratio, 2)
-            if crankcase_ratio is not None
-            else None,
-            compression_mode=compression_mode,
-        )
+    if resolved_unit_system == "imperial":
+        swept_out = cc_to_cuin(swept_cc)
+        clearance_out = cc_to_cuin(clearance_cc)
+        trapped_out = cc_to_cuin(trapped_cc) if trapped_cc is not None else None
+    else:
+        swept_out = swept_cc
+        clearance_out = clearance_cc
+        trapped_out = trapped_cc
+
+    results = CompressionResults(
+        compression_ratio=round(ratio, 2),
+        clearance_volume=round(clearance_out, 2),
+        swept_volume=round(swept_out, 2),
+        trapped_volume=round(trapped_out, 2) if trapped_out is not None else None,
+        crankcase_compression_ratio=round(crankcase_ratio, 2)
+        if crankcase_ratio is not None
+        else None,
+        compression_mode=compression_mode,
+    )
+    return results, normalized
+
+
+def _displacement(
+    unit_system: str, inputs: DisplacementInputs
+) -> DisplacementResponse | ErrorResponse:
+    resolved_unit_system, warnings = resolve_unit_system(unit_system)
+
+    bore = inputs.bore
+    stroke = inputs.stroke
+    cylinders = inputs.cylinders
+    baseline_cc = inputs.baseline_cc
+
+    if resolved_unit_system == "imperial":
+        bore_mm = inches_to_mm(bore)
+        stroke_mm = inches_to_mm(stroke)
+    else:
+        bore_mm = bore
+        stroke_mm = stroke
+
+    displacement_cc_raw = calculate_displacement_cc(bore_mm, stroke_mm, cylinders)
+    geometry = classify_geometry(bore_mm, stroke_mm)
+
+    diff_percent = None
+    if baseline_cc is not None:
+        diff_percent = percent_diff(displacement_cc_raw, baseline_cc)
+
+    compression_results = None
+    compression_normalized = None
+    if inputs.compression:
+        stage = _compression_stage(resolved_unit_system, inputs.compression, bore_mm, stroke_mm)
+        if isinstance(stage, ErrorResponse):
+            return stage
+        compression_results, compression_normalized = stage
 
     results = DisplacementResults(
         displacement_cc=round(displacement_cc_raw, 2),
@@ -279,66 +1411,6 @@ def calc_displacement(payload: DisplacementRequest):
         compression=compression_results,
     )
 
-    compression_normalized = None
-    if payload.inputs.compression:
-        compression = payload.inputs.compression
-        mode = compression.mode
-        has_advanced_fields = any(
-            value is not None
-            for value in [
-                compression.gasket_thickness,
-                compression.gasket_bore,
-                compression.deck_height,
-                compression.piston_volume,
-            ]
-        )
-        if mode is None:
-            mode = "advanced" if has_advanced_fields else "simple"
-        chamber_cc = compression.chamber_volume
-        gasket_thickness_mm = compression.gasket_thickness
-        gasket_bore_mm = compression.gasket_bore
-        deck_height_mm = compression.deck_height
-        piston_volume_cc = compression.piston_volume
-        exhaust_height_mm = compression.exhaust_port_height
-        transfer_height_mm = compression.transfer_port_height
-        crankcase_volume_cc = compression.crankcase_volume
-
-        if resolved_unit_system == "imperial":
-            chamber_cc = cuin_to_cc(chamber_cc)
-            if piston_volume_cc is not None:
-                piston_volume_cc = cuin_to_cc(piston_volume_cc)
-            if mode == "advanced":
-                if gasket_thickness_mm is not None:
-                    gasket_thickness_mm = inches_to_mm(gasket_thickness_mm)
-                if gasket_bore_mm is not None:
-                    gasket_bore_mm = inches_to_mm(gasket_bore_mm)
-                if deck_height_mm is not None:
-                    deck_height_mm = inches_to_mm(deck_height_mm)
-            if exhaust_height_mm is not None:
-                exhaust_height_mm = inches_to_mm(exhaust_height_mm)
-            if transfer_height_mm is not None:
-                transfer_height_mm = inches_to_mm(transfer_height_mm)
-            if crankcase_volume_cc is not None:
-                crankcase_volume_cc = cuin_to_cc(crankcase_volume_cc)
-
-        if mode == "simple":
-            gasket_thickness_mm = 0.0
-            gasket_bore_mm = bore_mm
-            deck_height_mm = 0.0
-            piston_volume_cc = 0.0
-
-        compression_normalized = CompressionNormalizedInputs(
-            mode=mode,
-            chamber_volume=chamber_cc,
-            gasket_thickness=gasket_thickness_mm or 0.0,
-            gasket_bore=gasket_bore_mm or bore_mm,
-            deck_height=deck_height_mm or 0.0,
-            piston_volume=piston_volume_cc or 0.0,
-            exhaust_port_height=exhaust_height_mm,
-            transfer_port_height=transfer_height_mm,
-            crankcase_volume=crankcase_volume_cc,
-        )
-
     normalized_inputs = DisplacementNormalizedInputs(
         bore_mm=bore_mm,
         stroke_mm=stroke_mm,
@@ -361,13 +1433,42 @@ def calc_displacement(payload: DisplacementRequest):
     response_model=RLResponse,
     dependencies=[Depends(require_internal_key)],
 )
-def calc_rl(payload: RLRequest):
-    resolved_unit_system, warnings = resolve_unit_system(payload.unit_system)
+async def calc_rl(payload: RLRequest, request: Request):
+    return await _respond_cached(
+        request, "rl", payload, lambda: _rl(payload.unit_system, payload.inputs)
+    )
+
 
-    stroke = payload.inputs.stroke
-    rod_length = payload.inputs.rod_length
-    bore = payload.inputs.bore
-    baseline = payload.inputs.baseline
+@app.post(
+    "/v1/calc/rl/batch",
+    response_model=RLBatchResponse,
+    dependencies=[Depends(require_internal_key)],
+)
+async def calc_rl_batch(payload: BatchRequest, request: Request):
+    if _wants_ndjson(request):
+        return await _stream_batch(payload, RLInputs, _rl)
+    return await _respond_heavy(
+        request,
+        "rl/batch",
+        payload,
+        len(payload.inputs),
+        OFFLOAD_BATCH_MIN_ITEMS,
+        _run_batch,
+        "rl",
+        payload,
+        RLInputs,
+        _rl,
+        RLBatchResponse,
+    )
+
+
+def _rl(unit_system: str, inputs: RLInputs) -> RLResponse | ErrorResponse:
+    resolved_unit_system, warnings = resolve_unit_system(unit_system)
+
+    stroke = inputs.stroke
+    rod_length = inputs.rod_length
+    bore = inputs.bore
+    baseline = inputs.baseline
 
     if resolved_unit_system == "imperial":
         stroke_mm = inches_to_mm(stroke)
@@ -412,164 +1513,12 @@ def calc_rl(payload: RLRequest):
         )
 
     compression_results = None
-    if payload.inputs.compression:
-        compression = payload.inputs.compression
-        mode = compression.mode
-        has_advanced_fields = any(
-            value is not None
-            for value in [
-                compression.gasket_thickness,
-                compression.gasket_bore,
-                compression.deck_height,
-                compression.piston_volume,
-            ]
-        )
-        if mode is None:
-            mode = "advanced" if has_advanced_fields else "simple"
-        chamber_cc = compression.chamber_volume
-        gasket_thickness_mm = compression.gasket_thickness
-        gasket_bore_mm = compression.gasket_bore
-        deck_height_mm = compression.deck_height
-        piston_volume_cc = compression.piston_volume
-        exhaust_height_mm = compression.exhaust_port_height
-        transfer_height_mm = compression.transfer_port_height
-        crankcase_volume_cc = compression.crankcase_volume
-
-        if resolved_unit_system == "imperial":
-            chamber_cc = cuin_to_cc(chamber_cc)
-            if piston_volume_cc is not None:
-                piston_volume_cc = cuin_to_cc(piston_volume_cc)
-            if mode == "advanced":
-                if gasket_thickness_mm is not None:
-                    gasket_thickness_mm = inches_to_mm(gasket_thickness_mm)
-                if gasket_bore_mm is not None:
-                    gasket_bore_mm = inches_to_mm(gasket_bore_mm)
-                if deck_height_mm is not None:
-                    deck_height_mm = inches_to_mm(deck_height_mm)
-            if exhaust_height_mm is not None:
-                exhaust_height_mm = inches_to_mm(exhaust_height_mm)
-            if transfer_height_mm is not None:
-                transfer_height_mm = inches_to_mm(transfer_height_mm)
-            if crankcase_volume_cc is not None:
-                crankcase_volume_cc = cuin_to_cc(crankcase_volume_cc)
-
-        if mode == "simple":
-            gasket_thickness_mm = 0.0
-            gasket_bore_mm = bore_mm
-            deck_height_mm = 0.0
-            piston_volume_cc = 0.0
-
-        if chamber_cc <= 0:
-            response = ErrorResponse(
-                error_code="validation_error",
-                message="Invalid request payload.",
-                field_errors=[
-                    {"field": "inputs.compression", "reason": "invalid compression inputs"}
-                ],
-            )
-            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump())
-
-        if mode == "advanced":
-            if (
-                gasket_thickness_mm is None
-                or gasket_bore_mm is None
-                or deck_height_mm is None
-                or piston_volume_cc is None
-            ):
-                response = ErrorResponse(
-                    error_code="validation_error",
-                    message="Invalid request payload.",
-                    field_errors=[
-                        {"field": "inputs.compression", "reason": "missing advanced inputs"}
-                    ],
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump()
-                )
-            if gasket_thickness_mm <= 0 or gasket_bore_mm <= 0:
-                response = ErrorResponse(
-                    error_code="validation_error",
-                    message="Invalid request payload.",
-                    field_errors=[
-                        {
-                            "field": "inputs.compression",
-                            "reason": "invalid compression inputs",
-                        }
-                    ],
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump()
-                )
-
-        gasket_thickness_mm = gasket_thickness_mm or 0.0
-        gasket_bore_mm = gasket_bore_mm or bore_mm
-        deck_height_mm = deck_height_mm or 0.0
-        piston_volume_cc = piston_volume_cc or 0.0
-
-        gasket_cc = gasket_volume_cc(gasket_bore_mm, gasket_thickness_mm)
-        deck_cc = deck_volume_cc(bore_mm, deck_height_mm)
-        clearance_cc = clearance_volume_cc(chamber_cc, gasket_cc, deck_cc, piston_volume_cc)
-        if clearance_cc <= 0:
-            response = ErrorResponse(
-                error_code="validation_error",
-                message="Invalid request payload.",
-                field_errors=[
-                    {"field": "inputs.compression", "reason": "clearance volume must be positive"}
-                ],
-            )
-            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump())
-
-        swept_cc = swept_volume_cc(bore_mm, stroke_mm)
-        compression_mode = "four_stroke"
-        trapped_cc = None
-
-        port_heights = [value for value in [exhaust_height_mm, transfer_height_mm] if value]
-        if port_heights:
-            port_height_mm = min(port_heights)
-            if port_height_mm <= 0 or port_height_mm >= stroke_mm:
-                response = ErrorResponse(
-                    error_code="validation_error",
-                    message="Invalid request payload.",
-                    field_errors=[
-                        {
-                            "field": "inputs.compression",
-                            "reason": "invalid port height for 2T compression",
-                        }
-                    ],
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump()
-                )
-            compression_mode = "two_stroke"
-            trapped_cc = trapped_swept_volume_cc(bore_mm, stroke_mm, port_height_mm)
-            swept_for_ratio = trapped_cc
-        else:
-            swept_for_ratio = swept_cc
-
-        ratio = compression_ratio(swept_for_ratio, clearance_cc)
-        crankcase_ratio = None
-        if compression_mode == "two_stroke" and crankcase_volume_cc:
-            crankcase_ratio = compression_ratio(swept_cc, crankcase_volume_cc)
-
-        if resolved_unit_system == "imperial":
-            swept_out = cc_to_cuin(swept_cc)
-            clearance_out = cc_to_cuin(clearance_cc)
-            trapped_out = cc_to_cuin(trapped_cc) if trapped_cc is not None else None
-        else:
-            swept_out = swept_cc
-            clearance_out = clearance_cc
-            trapped_out = trapped_cc
-
-        compression_results = CompressionResults(
-            compression_ratio=round(ratio, 2),
-            clearance_volume=round(clearance_out, 2),
-            swept_volume=round(swept_out, 2),
-            trapped_volume=round(trapped_out, 2) if trapped_out is not None else None,
-            crankcase_compression_ratio=round(crankcase_ratio, 2)
-            if crankcase_ratio is not None
-            else None,
-            compression_mode=compression_mode,
-        )
+    compression_normalized = None
+    if inputs.compression:
+        stage = _compression_stage(resolved_unit_system, inputs.compression, bore_mm, stroke_mm)
+        if isinstance(stage, ErrorResponse):
+            return stage
+        compression_results, compression_normalized = stage
 
     results = RLResults(
         rl_ratio=round(rl_ratio, 2),
@@ -584,66 +1533,6 @@ def calc_rl(payload: RLRequest):
         compression=compression_results,
     )
 
-    compression_normalized = None
-    if payload.inputs.compression:
-        compression = payload.inputs.compression
-        mode = compression.mode
-        has_advanced_fields = any(
-            value is not None
-            for value in [
-                compression.gasket_thickness,
-                compression.gasket_bore,
-                compression.deck_height,
-                compression.piston_volume,
-            ]
-        )
-        if mode is None:
-            mode = "advanced" if has_advanced_fields else "simple"
-        chamber_cc = compression.chamber_volume
-        gasket_thickness_mm = compression.gasket_thickness
-        gasket_bore_mm = compression.gasket_bore
-        deck_height_mm = compression.deck_height
-        piston_volume_cc = compression.piston_volume
-        exhaust_height_mm = compression.exhaust_port_height
-        transfer_height_mm = compression.transfer_port_height
-        crankcase_volume_cc = compression.crankcase_volume
-
-        if resolved_unit_system == "imperial":
-            chamber_cc = cuin_to_cc(chamber_cc)
-            if piston_volume_cc is not None:
-                piston_volume_cc = cuin_to_cc(piston_volume_cc)
-            if mode == "advanced":
-                if gasket_thickness_mm is not None:
-                    gasket_thickness_mm = inches_to_mm(gasket_thickness_mm)
-                if gasket_bore_mm is not None:
-                    gasket_bore_mm = inches_to_mm(gasket_bore_mm)
-                if deck_height_mm is not None:
-                    deck_height_mm = inches_to_mm(deck_height_mm)
-            if exhaust_height_mm is not None:
-                exhaust_height_mm = inches_to_mm(exhaust_height_mm)
-            if transfer_height_mm is not None:
-                transfer_height_mm = inches_to_mm(transfer_height_mm)
-            if crankcase_volume_cc is not None:
-                crankcase_volume_cc = cuin_to_cc(crankcase_volume_cc)
-
-        if mode == "simple":
-            gasket_thickness_mm = 0.0
-            gasket_bore_mm = bore_mm
-            deck_height_mm = 0.0
-            piston_volume_cc = 0.0
-
-        compression_normalized = CompressionNormalizedInputs(
-            mode=mode,
-            chamber_volume=chamber_cc,
-            gasket_thickness=gasket_thickness_mm or 0.0,
-            gasket_bore=gasket_bore_mm or bore_mm,
-            deck_height=deck_height_mm or 0.0,
-            piston_volume=piston_volume_cc or 0.0,
-            exhaust_port_height=exhaust_height_mm,
-            transfer_port_height=transfer_height_mm,
-            crankcase_volume=crankcase_volume_cc,
-        )
-
     normalized_inputs = RLNormalizedInputs(
         bore_mm=bore_mm,
         stroke_mm=stroke_mm,
@@ -666,14 +1555,163 @@ def calc_rl(payload: RLRequest):
     response_model=SprocketResponse,
     dependencies=[Depends(require_internal_key)],
 )
-def calc_sprocket(payload: SprocketRequest):
-    resolved_unit_system, warnings = resolve_unit_system(payload.unit_system)
+async def calc_sprocket(payload: SprocketRequest, request: Request):
+    return await _respond_cached(
+        request,
+        "sprocket",
+        payload,
+        lambda: _sprocket(payload.unit_system, payload.inputs, payload.include_diagnostics),
+    )
 
-    sprocket_teeth = payload.inputs.sprocket_teeth
-    crown_teeth = payload.inputs.crown_teeth
-    chain_pitch = payload.inputs.chain_pitch
-    chain_links = payload.inputs.chain_links
-    baseline = payload.inputs.baseline
+
+@app.post(
+    "/v1/calc/sprocket/batch",
+    response_model=SprocketBatchResponse,
+    dependencies=[Depends(require_internal_key)],
+)
+async def calc_sprocket_batch(payload: BatchRequest, request: Request):
+    if _wants_ndjson(request):
+        return await _stream_batch(payload, SprocketInputs, _sprocket)
+    return await _respond_heavy(
+        request,
+        "sprocket/batch",
+        payload,
+        len(payload.inputs),
+        OFFLOAD_BATCH_MIN_ITEMS,
+        _run_batch,
+        "sprocket",
+        payload,
+        SprocketInputs,
+        _sprocket,
+        SprocketBatchResponse,
+    )
+
+
+@app.post(
+    "/v1/calc/sprocket/optimize",
+    response_model=SprocketOptimizeResponse,
+    dependencies=[Depends(require_internal_key)],
+)
+async def calc_sprocket_optimize(payload: SprocketOptimizeRequest, request: Request):
+    inputs = payload.inputs
+    combinations = (
+        (inputs.sprocket_teeth.max - inputs.sprocket_teeth.min + 1)
+        * (inputs.crown_teeth.max - inputs.crown_teeth.min + 1)
+        * ((inputs.chain_links.max - inputs.chain_links.min) // 2 + 1)
+    )
+    return await _respond_heavy(
+        request,
+        "sprocket/optimize",
+        payload,
+        combinations,
+        OFFLOAD_OPTIMIZE_MIN_COMBINATIONS,
+        _sprocket_optimize,
+        payload.unit_system,
+        inputs,
+    )
+
+
+def _sprocket_optimize(
+    unit_system: str, inputs: SprocketOptimizeInputs
+) -> SprocketOptimizeResponse | ErrorResponse:
+    resolved_unit_system, warnings = resolve_unit_system(unit_system)
+
+    errors = []
+    pitch_mm = chain_pitch_to_mm(inputs.chain_pitch)
+    if pitch_mm is None:
+        errors.append({"field": "inputs.chain_pitch", "reason": "invalid chain pitch"})
+    if not (
+        CENTER_DISTANCE_MIN_MM
+        <= inputs.center_distance_min_mm
+        <= inputs.center_distance_max_mm
+        <= CENTER_DISTANCE_MAX_MM
+    ):
+        errors.append(
+            {
+                "field": "inputs.center_distance_min_mm",
+                "reason": f"window must lie within {CENTER_DISTANCE_MIN_MM:.0f}-"
+                f"{CENTER_DISTANCE_MAX_MM:.0f} mm",
+            }
+        )
+    if errors:
+        return _validation_error(errors)
+
+    baseline_ratio = None
+    if inputs.baseline is not None:
+        baseline_ratio = calculate_ratio(
+            inputs.baseline.crown_teeth, inputs.baseline.sprocket_teeth
+        )
+    if inputs.target_ratio is not None:
+        target_ratio = inputs.target_ratio
+    else:
+        target_ratio = baseline_ratio * (1 + inputs.target_change_percent / 100.0)
+
+    max_ratio_error = None
+    if inputs.max_error_percent is not None:
+        max_ratio_error = target_ratio * inputs.max_error_percent / 100.0
+
+    candidates, pairs_evaluated = search_gearing(
+        target_ratio,
+        pitch_mm,
+        (inputs.sprocket_teeth.min, inputs.sprocket_teeth.max),
+        (inputs.crown_teeth.min, inputs.crown_teeth.max),
+        (inputs.chain_links.min, inputs.chain_links.max),
+        (inputs.center_distance_min_mm, inputs.center_distance_max_mm),
+        inputs.limit,
+        max_ratio_error,
+    )
+
+    results = []
+    for candidate in candidates:
+        chain_length_mm = calculate_chain_length_mm(candidate.chain_links, pitch_mm)
+        results.append(
+            SprocketOptimizeCandidate(
+                sprocket_teeth=candidate.sprocket_teeth,
+                crown_teeth=candidate.crown_teeth,
+                chain_links=candidate.chain_links,
+                ratio=round(candidate.ratio, 2),
+                ratio_error_percent=round(percent_diff(candidate.ratio, target_ratio), 2),
+                chain_length_mm=round(chain_length_mm, 2),
+                chain_length_in=round(mm_to_inches(chain_length_mm), 2),
+                center_distance_mm=round(candidate.center_distance_mm, 2),
+                center_distance_in=round(mm_to_inches(candidate.center_distance_mm), 2),
+                diff_ratio_percent=round(percent_diff(candidate.ratio, baseline_ratio), 2)
+                if baseline_ratio is not None
+                else None,
+            )
+        )
+
+    return SprocketOptimizeResponse(
+        calculator="sprocket",
+        unit_system="imperial" if resolved_unit_system == "imperial" else "metric",
+        target_ratio=round(target_ratio, 4),
+        pairs_evaluated=pairs_evaluated,
+        results=results,
+        warnings=warnings,
+    )
+
+
+def _center_distance_diagnostics(solution) -> CenterDistanceDiagnostics:
+    return CenterDistanceDiagnostics(
+        method="closed_form",
+        exact_mm=solution.center_distance_mm,
+        iterations=solution.iterations,
+        residual_links=solution.residual_links,
+        unclamped_mm=solution.unclamped_mm,
+        clamped=solution.center_distance_mm != solution.unclamped_mm,
+    )
+
+
+def _sprocket(
+    unit_system: str, inputs: SprocketInputs, include_diagnostics: bool = False
+) -> SprocketResponse | ErrorResponse:
+    resolved_unit_system, warnings = resolve_unit_system(unit_system)
+
+    sprocket_teeth = inputs.sprocket_teeth
+    crown_teeth = inputs.crown_teeth
+    chain_pitch = inputs.chain_pitch
+    chain_links = inputs.chain_links
+    baseline = inputs.baseline
 
     errors = []
     if chain_pitch is not None and chain_pitch_to_mm(chain_pitch) is None:
@@ -681,25 +1719,30 @@ def calc_sprocket(payload: SprocketRequest):
     if chain_links is not None and chain_links % 2 != 0:
         errors.append({"field": "inputs.chain_links", "reason": "must be an even integer"})
     if errors:
-        response = ErrorResponse(
+        return ErrorResponse(
             error_code="validation_error",
             message="Invalid request payload.",
             field_errors=errors,
         )
-        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump())
 
     ratio = calculate_ratio(crown_teeth, sprocket_teeth)
 
     chain_length_mm = None
     center_distance_mm = None
+    center_distance_solution = None
     if chain_pitch and chain_links:
         pitch_mm = chain_pitch_to_mm(chain_pitch)
         if pitch_mm:
             chain_length_mm = calculate_chain_length_mm(chain_links, pitch_mm)
+            # As in the legacy calculator, the compared ("new") setup is damped by 0.98.
             wear_factor = 0.98 if baseline else 1.0
-            center_distance_mm = calculate_center_distance_mm(
+            center_distance_mm = lookup_center_distance_mm(
                 sprocket_teeth, crown_teeth, pitch_mm, chain_links, wear_factor
             )
+            if include_diagnostics:
+                center_distance_solution = solve_center_distance(
+                    sprocket_teeth, crown_teeth, pitch_mm, chain_links
+                )
 
     diff_ratio_percent = None
     diff_ratio_absolute = None
@@ -708,6 +1751,7 @@ def calc_sprocket(payload: SprocketRequest):
     diff_center_distance_percent = None
     diff_center_distance_absolute = None
     baseline_normalized = None
+    baseline_solution = None
     if baseline is not None:
         baseline_ratio = calculate_ratio(baseline.crown_teeth, baseline.sprocket_teeth)
         diff_ratio_absolute = ratio - baseline_ratio
@@ -721,13 +1765,19 @@ def calc_sprocket(payload: SprocketRequest):
                 baseline_chain_length_mm = calculate_chain_length_mm(
                     baseline.chain_links, baseline_pitch_mm
                 )
-                baseline_center_distance_mm = calculate_center_distance_mm(
+                baseline_center_distance_mm = lookup_center_distance_mm(
                     baseline.sprocket_teeth,
                     baseline.crown_teeth,
                     baseline_pitch_mm,
                     baseline.chain_links,
-                    1.0,
                 )
+                if include_diagnostics:
+                    baseline_solution = solve_center_distance(
+                        baseline.sprocket_teeth,
+                        baseline.crown_teeth,
+                        baseline_pitch_mm,
+                        baseline.chain_links,
+                    )
 
         if chain_length_mm and baseline_chain_length_mm:
             diff_chain_length_absolute = chain_length_mm - baseline_chain_length_mm
@@ -786,106 +1836,145 @@ def calc_sprocket(payload: SprocketRequest):
         baseline=baseline_normalized,
     )
 
+    diagnostics = None
+    if include_diagnostics:
+        diagnostics = SprocketDiagnostics(
+            center_distance=_center_distance_diagnostics(center_distance_solution)
+            if center_distance_solution is not None
+            else None,
+            baseline_center_distance=_center_distance_diagnostics(baseline_solution)
+            if baseline_solution is not None
+            else None,
+        )
+
     return SprocketResponse(
         calculator="sprocket",
         unit_system="imperial" if resolved_unit_system == "imperial" else "metric",
         normalized_inputs=normalized_inputs,
         results=results,
         warnings=warnings,
+        diagnostics=diagnostics,
     )
 
 
+def validate_against_db(catalog: TireCatalog, source, prefix: str) -> list[dict]:
+    issues: list[dict] = []
+    if not catalog.has_vehicle(source.vehicle_type):
+        issues.append({"field": f"{prefix}vehicle_type", "reason": "invalid vehicle type"})
+        return issues
+
+    if not catalog.has_rim(source.vehicle_type, source.rim_in):
+        issues.append({"field": f"{prefix}rim_in", "reason": "invalid rim"})
+        return issues
+
+    if source.flotation:
+        if source.flotation not in catalog.flotations_for(source.vehicle_type, source.rim_in):
+            issues.append({"field": f"{prefix}flotation", "reason": "invalid flotation option"})
+        return issues
+
+    if not catalog.has_width(source.vehicle_type, source.rim_in, source.width_mm):
+        issues.append({"field": f"{prefix}width_mm", "reason": "invalid width"})
+        return issues
+
+    if source.aspect_percent not in catalog.aspects_for(
+        source.vehicle_type, source.rim_in, source.width_mm
+    ):
+        issues.append({"field": f"{prefix}aspect_percent", "reason": "invalid aspect"})
+    return issues
+
+
 @app.post(
     "/v1/calc/tires",
     response_model=TiresResponse,
     dependencies=[Depends(require_internal_key)],
 )
-def calc_tires(payload: TiresRequest):
-    resolved_unit_system, warnings = resolve_unit_system(payload.unit_system)
+async def calc_tires(payload: TiresRequest, request: Request):
+    return await _respond_cached(
+        request, "tires", payload, lambda: _tires(payload.unit_system, payload.inputs)
+    )
 
-    inputs = payload.inputs
-    errors = []
 
-    def rim_key(value: float) -> str:
-        return str(int(value)) if float(value).is_integer() else str(value)
-
-    def width_key(value: float) -> str:
-        return str(int(value)) if float(value).is_integer() else str(value)
-
-    def validate_against_db(source, prefix: str) -> list[dict]:
-        issues: list[dict] = []
-        vehicle_db = TIRES_DB.get(source.vehicle_type)
-        if not vehicle_db:
-            issues.append({"field": f"{prefix}vehicle_type", "reason": "invalid vehicle type"})
-            return issues
-
-        rim_str = rim_key(source.rim_in)
-        if rim_str not in vehicle_db:
-            issues.append({"field": f"{prefix}rim_in", "reason": "invalid rim"})
-            return issues
-
-        if source.flotation:
-            flotation_options: list[str] = []
-            for width in vehicle_db[rim_str]["widths"]:
-                flotation_options.extend(vehicle_db[rim_str].get(width, {}).get("flotation", []))
-            if source.flotation not in flotation_options:
-                issues.append({"field": f"{prefix}flotation", "reason": "invalid flotation option"})
-            return issues
-
-        width_str = width_key(source.width_mm)  # type: ignore[arg-type]
-        if width_str not in vehicle_db[rim_str]["widths"]:
-            issues.append({"field": f"{prefix}width_mm", "reason": "invalid width"})
-            return issues
-
-        aspects = vehicle_db[rim_str].get(width_str, {}).get("aspects", [])
-        if source.aspect_percent not in aspects:
-            issues.append({"field": f"{prefix}aspect_percent", "reason": "invalid aspect"})
-        return issues
+@app.post(
+    "/v1/calc/tires/batch",
+    response_model=TiresBatchResponse,
+    dependencies=[Depends(require_internal_key)],
+)
+async def calc_tires_batch(payload: BatchRequest, request: Request):
+    if _wants_ndjson(request):
+        return await _stream_batch(payload, TiresInputs, _tires)
+    return await _respond_heavy(
+        request,
+        "tires/batch",
+        payload,
+        len(payload.inputs),
+        OFFLOAD_BATCH_MIN_ITEMS,
+        _run_batch,
+        "tires",
+        payload,
+        TiresInputs,
+        _tires,
+        TiresBatchResponse,
+    )
 
-    if inputs.flotation and inputs.vehicle_type not in {"LightTruck", "Kart", "Kartcross", "Motorcycle"}:
-        errors.append(
-            {
-                "field": "inputs.flotation",
-                "reason": "flotation allowed only for LightTruck/Kart/Kartcross/Motorcycle",
-            }
-        )
 
-    if inputs.flotation:
-        if inputs.vehicle_type == "Motorcycle":
-            parsed = parse_motorcycle_flotation(inputs.flotation)
-            if not parsed:
-                errors.append({"field": "inputs.flotation", "reason": "invalid flotation format"})
-        else:
-            parsed = parse_flotation(inputs.flotation)
-            if not parsed:
-                errors.append({"field": "inputs.flotation", "reason": "invalid flotation format"})
+@app.post(
+    "/v1/calc/tires/equivalents",
+    response_model=TiresEquivalentsResponse,
+    dependencies=[Depends(require_internal_key)],
+)
+async def calc_tires_equivalents(payload: TiresEquivalentsRequest, request: Request):
+    return await _respond_cached(
+        request,
+        "tires/equivalents",
+        payload,
+        lambda: _tires_equivalents(payload.unit_system, payload.inputs),
+    )
+
+
+def _tire_stage(
+    catalog: TireCatalog, source, prefix: str
+) -> tuple[list[dict], Optional[tuple[float, float]]]:
+    # The flotation is resolved once here and its dimensions reused by the calculation.
+    errors = []
+    dimensions = None
+    if source.flotation:
+        if source.vehicle_type not in FLOTATION_VEHICLE_TYPES:
+            errors.append(
+                {
+                    "field": f"{prefix}flotation",
+                    "reason": "flotation allowed only for LightTruck/Kart/Kartcross/Motorcycle",
+                }
+            )
+        dimensions = catalog.flotation_dimensions(source.vehicle_type, source.flotation)
+        if dimensions is None:
+            errors.append({"field": f"{prefix}flotation", "reason": "invalid flotation format"})
+
+    errors.extend(validate_against_db(catalog, source, prefix))
+    if errors:
+        return errors, None
+    if dimensions is None:
+        diameter_mm = calculate_diameter_mm(source.rim_in, source.width_mm, source.aspect_percent)
+        dimensions = (diameter_mm, source.width_mm)
+    return errors, dimensions
 
-    errors.extend(validate_against_db(inputs, "inputs."))
 
+def _tires(unit_system: str, inputs: TiresInputs) -> TiresResponse | ErrorResponse:
+    resolved_unit_system, warnings = resolve_unit_system(unit_system)
+    # Read once, so a reload published mid-request cannot mix two catalogs in one response.
+    catalog = get_tire_catalog()
+
+    errors, dimensions = _tire_stage(catalog, inputs, "inputs.")
     if inputs.rim_width_in is not None and inputs.rim_width_in <= 0:
         errors.append({"field": "inputs.rim_width_in", "reason": "must be greater than zero"})
 
     if errors:
-        response = ErrorResponse(
+        return ErrorResponse(
             error_code="validation_error",
             message="Invalid request payload.",
             field_errors=errors,
         )
-        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump())
-
-    if inputs.flotation:
-        if inputs.vehicle_type == "Motorcycle":
-            width_in, rim_in = parse_motorcycle_flotation(inputs.flotation)  # type: ignore[misc]
-            width_mm = inches_to_mm(width_in)
-            diameter_mm = calculate_diameter_mm(rim_in, width_mm, 100.0)
-        else:
-            overall_in, width_in, _rim_in = parse_flotation(inputs.flotation)  # type: ignore[misc]
-            diameter_mm = inches_to_mm(overall_in)
-            width_mm = inches_to_mm(width_in)
-    else:
-        diameter_mm = calculate_diameter_mm(inputs.rim_in, inputs.width_mm, inputs.aspect_percent)  # type: ignore[arg-type]
-        width_mm = inputs.width_mm  # type: ignore[assignment]
 
+    diameter_mm, width_mm = dimensions
     assembly_width_mm = calculate_assembly_width_mm(width_mm, inputs.rim_width_in)
 
     diff_diameter = None
@@ -895,58 +1984,15 @@ def calc_tires(payload: TiresRequest):
     baseline_normalized = None
     if inputs.baseline:
         base_inputs = inputs.baseline
-        base_errors = []
-        if base_inputs.flotation and base_inputs.vehicle_type not in {
-            "LightTruck",
-            "Kart",
-            "Kartcross",
-            "Motorcycle",
-        }:
-            base_errors.append(
-                {
-                    "field": "inputs.baseline.flotation",
-                    "reason": "flotation allowed only for LightTruck/Kart/Kartcross/Motorcycle",
-                }
-            )
-        if base_inputs.flotation:
-            if base_inputs.vehicle_type == "Motorcycle":
-                base_parsed = parse_motorcycle_flotation(base_inputs.flotation)
-                if not base_parsed:
-                    base_errors.append(
-                        {"field": "inputs.baseline.flotation", "reason": "invalid flotation format"}
-                    )
-            else:
-                base_parsed = parse_flotation(base_inputs.flotation)
-                if not base_parsed:
-                    base_errors.append(
-                        {"field": "inputs.baseline.flotation", "reason": "invalid flotation format"}
-                    )
-
-        base_errors.extend(validate_against_db(base_inputs, "inputs.baseline."))
-
+        base_errors, base_dimensions = _tire_stage(catalog, base_inputs, "inputs.baseline.")
         if base_errors:
-            response = ErrorResponse(
+            return ErrorResponse(
                 error_code="validation_error",
                 message="Invalid request payload.",
                 field_errors=base_errors,
             )
-            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=response.model_dump())
-
-        if base_inputs.flotation:
-            if base_inputs.vehicle_type == "Motorcycle":
-                width_in, rim_in = parse_motorcycle_flotation(base_inputs.flotation)  # type: ignore[misc]
-                baseline_width_mm = inches_to_mm(width_in)
-                baseline_diameter_mm = calculate_diameter_mm(rim_in, baseline_width_mm, 100.0)
-            else:
-                overall_in, width_in, _rim_in = parse_flotation(base_inputs.flotation)  # type: ignore[misc]
-                baseline_diameter_mm = inches_to_mm(overall_in)
-                baseline_width_mm = inches_to_mm(width_in)
-        else:
-            baseline_diameter_mm = calculate_diameter_mm(
-                base_inputs.rim_in, base_inputs.width_mm, base_inputs.aspect_percent  # type: ignore[arg-type]
-            )
-            baseline_width_mm = base_inputs.width_mm  # type: ignore[assignment]
 
+        baseline_diameter_mm, baseline_width_mm = base_dimensions
         baseline_assembly_width_mm = calculate_assembly_width_mm(
             baseline_width_mm, base_inputs.rim_width_in
         )
@@ -1005,3 +2051,59 @@ def calc_tires(payload: TiresRequest):
         results=results,
         warnings=warnings,
     )
+
+
+def _tires_equivalents(
+    unit_system: str, inputs: TiresEquivalentsInputs
+) -> TiresEquivalentsResponse | ErrorResponse:
+    resolved_unit_system, warnings = resolve_unit_system(unit_system)
+    imperial = resolved_unit_system == "imperial"
+    catalog = get_tire_catalog()
+
+    if inputs.reference is not None:
+        errors, dimensions = _tire_stage(catalog, inputs.reference, "inputs.reference.")
+        if errors:
+            return _validation_error(errors)
+        reference_mm, _ = dimensions
+        vehicle_types = inputs.vehicle_types or [inputs.reference.vehicle_type]
+    else:
+        reference_mm = inches_to_mm(inputs.diameter) if imperial else inputs.diameter
+        vehicle_types = inputs.vehicle_types
+
+    matches = [
+        size
+        for size in catalog.sizes_within(reference_mm, inputs.tolerance_percent)
+        if (vehicle_types is None or size.vehicle_type in vehicle_types)
+        and (inputs.rims_in is None or size.rim_in in inputs.rims_in)
+    ]
+    matches.sort(key=lambda size: abs(size.diameter_mm - reference_mm))
+
+    convert = mm_to_inches if imperial else float
+    results = [
+        TiresEquivalent(
+            vehicle_type=size.vehicle_type,
+            rim_in=size.rim_in,
+            width_mm=size.width_mm,
+            aspect_percent=size.aspect_percent,
+            flotation=size.flotation,
+            diameter=round(convert(size.diameter_mm), 2),
+            diff_diameter=round(convert(size.diameter_mm - reference_mm), 2),
+            diff_diameter_percent=round(percent_diff(size.diameter_mm, reference_mm), 2),
+        )
+        for size in matches[inputs.offset : inputs.offset + inputs.limit]
+    ]
+
+    return TiresEquivalentsResponse(
+        calculator="tires",
+        unit_system="imperial" if imperial else "metric",
+        reference_diameter=round(convert(reference_mm), 2),
+        tolerance_percent=inputs.tolerance_percent,
+        total=len(matches),
+        offset=inputs.offset,
+        limit=inputs.limit,
+        results=results,
+        warnings=warnings,
+    )
+
+
+STARTUP_REPORT.phase("app and routes")
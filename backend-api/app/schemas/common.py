@@ -1,36 +1,48 @@
 from datetime import datetime, timezone
-from typing import Literal, Optional
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 UnitSystem = Literal["metric", "imperial", "auto"]
 ResolvedUnitSystem = Literal["metric", "imperial"]
 Language = Literal["pt_BR", "en_US", "es_ES"]
 
 
-class FieldError(BaseModel):
+class SchemaModel(BaseModel):
+    # Validators and serializers are built on first use (or by the startup warm-up) rather
+    # than at import, which keeps them off the cold-start path.
+    model_config = ConfigDict(defer_build=True)
+
+
+class FieldError(SchemaModel):
     field: str
     reason: str
 
 
-class ErrorResponse(BaseModel):
+class ErrorResponse(SchemaModel):
     error_code: str
     message: str
     field_errors: list[FieldError] = Field(default_factory=list)
 
 
-class Meta(BaseModel):
+class Meta(SchemaModel):
     version: str = "v1"
     timestamp: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     source: str = "legacy-compatible"
 
 
 class RequestBase(BaseModel):
+    # Not deferred: FastAPI wraps request bodies in an aliased field, and pydantic warns when
+    # a deferred model is first built inside one.
     unit_system: UnitSystem
     language: Optional[Language] = None
 
 
-class ResponseBase(BaseModel):
+class BatchRequest(RequestBase):
+    inputs: list[Any] = Field(min_length=1)
+
+
+class ResponseBase(SchemaModel):
     calculator: str
     unit_system: ResolvedUnitSystem
     warnings: list[str] = Field(default_factory=list)
@@ -1,9 +1,9 @@
 from typing import Optional, Literal
 
-from pydantic import BaseModel
+from app.schemas.common import SchemaModel
 
 
-class CompressionInputs(BaseModel):
+class CompressionInputs(SchemaModel):
     mode: Optional[Literal["simple", "advanced"]] = None
     chamber_volume: float
     gasket_thickness: Optional[float] = None
@@ -15,7 +15,7 @@ class CompressionInputs(BaseModel):
     crankcase_volume: Optional[float] = None
 
 
-class CompressionNormalizedInputs(BaseModel):
+class CompressionNormalizedInputs(SchemaModel):
     mode: Optional[Literal["simple", "advanced"]] = None
     chamber_volume: float
     gasket_thickness: float
@@ -27,7 +27,7 @@ class CompressionNormalizedInputs(BaseModel):
     crankcase_volume: Optional[float] = None
 
 
-class CompressionResults(BaseModel):
+class CompressionResults(SchemaModel):
     compression_ratio: float
     clearance_volume: float
     swept_volume: float
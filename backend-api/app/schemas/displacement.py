@@ -1,12 +1,12 @@
-from typing import Optional
+from typing import Literal, Optional, Union
 
-from pydantic import BaseModel, Field, conint, confloat
+from pydantic import Field, conint, confloat, model_validator
 
-from app.schemas.common import RequestBase, ResponseBase
+from app.schemas.common import ErrorResponse, RequestBase, ResponseBase, SchemaModel
 from app.schemas.compression import CompressionInputs, CompressionNormalizedInputs, CompressionResults
 
 
-class DisplacementInputs(BaseModel):
+class DisplacementInputs(SchemaModel):
     bore: confloat(gt=0)
     stroke: confloat(gt=0)
     cylinders: conint(gt=0)
@@ -18,7 +18,7 @@ class DisplacementRequest(RequestBase):
     inputs: DisplacementInputs
 
 
-class DisplacementNormalizedInputs(BaseModel):
+class DisplacementNormalizedInputs(SchemaModel):
     bore_mm: float
     stroke_mm: float
     cylinders: int
@@ -26,7 +26,7 @@ class DisplacementNormalizedInputs(BaseModel):
     compression: Optional[CompressionNormalizedInputs] = None
 
 
-class DisplacementResults(BaseModel):
+class DisplacementResults(SchemaModel):
     displacement_cc: float
     displacement_l: float
     displacement_ci: float
@@ -38,3 +38,73 @@ class DisplacementResults(BaseModel):
 class DisplacementResponse(ResponseBase):
     normalized_inputs: DisplacementNormalizedInputs
     results: DisplacementResults
+
+
+class DisplacementBatchResponse(ResponseBase):
+    items: list[Union[DisplacementResponse, ErrorResponse]]
+
+
+class SweepRange(SchemaModel):
+    start: float
+    stop: Optional[float] = None
+    step: Optional[confloat(gt=0)] = None
+
+    @model_validator(mode="after")
+    def validate_range(self):
+        if self.stop is not None and self.stop != self.start:
+            if self.stop < self.start:
+                raise ValueError("stop must be greater than or equal to start")
+            if self.step is None:
+                raise ValueError("step required when stop differs from start")
+        return self
+
+
+class DisplacementSweepInputs(SchemaModel):
+    bore: SweepRange
+    stroke: SweepRange
+    cylinders: conint(gt=0)
+    chamber_volume: SweepRange
+    deck_height: Optional[SweepRange] = None
+    gasket_thickness: Optional[SweepRange] = None
+    gasket_bore: Optional[confloat(gt=0)] = None
+    piston_volume: Optional[float] = None
+
+
+class DisplacementSweepRequest(RequestBase):
+    inputs: DisplacementSweepInputs
+    layout: Literal["columnar", "records"] = "columnar"
+
+
+class DisplacementSweepAxes(SchemaModel):
+    bore_mm: list[float]
+    stroke_mm: list[float]
+    deck_height_mm: list[float]
+    gasket_thickness_mm: list[float]
+    chamber_volume_cc: list[float]
+
+
+class DisplacementSweepColumns(SchemaModel):
+    displacement_cc: list[float]
+    compression_ratio: list[float]
+
+
+class DisplacementSweepPoint(SchemaModel):
+    bore_mm: float
+    stroke_mm: float
+    deck_height_mm: float
+    gasket_thickness_mm: float
+    chamber_volume_cc: float
+    displacement_cc: float
+    compression_ratio: float
+
+
+class DisplacementSweepResponse(ResponseBase):
+    layout: Literal["columnar", "records"]
+    cylinders: int
+    gasket_bore_mm: Optional[float] = None
+    piston_volume_cc: float
+    axes: DisplacementSweepAxes
+    shape: list[int]
+    points_count: int
+    columns: Optional[DisplacementSweepColumns] = None
+    points: Optional[list[DisplacementSweepPoint]] = None
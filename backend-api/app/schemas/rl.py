@@ -1,12 +1,12 @@
-from typing import Optional
+from typing import Optional, Union
 
-from pydantic import BaseModel, confloat
+from pydantic import confloat
 
-from app.schemas.common import RequestBase, ResponseBase
+from app.schemas.common import ErrorResponse, RequestBase, ResponseBase, SchemaModel
 from app.schemas.compression import CompressionInputs, CompressionNormalizedInputs, CompressionResults
 
 
-class RLInputs(BaseModel):
+class RLInputs(SchemaModel):
     bore: confloat(gt=0)
     stroke: confloat(gt=0)
     rod_length: confloat(gt=0)
@@ -14,7 +14,7 @@ class RLInputs(BaseModel):
     compression: Optional[CompressionInputs] = None
 
 
-class RLBaselineInputs(BaseModel):
+class RLBaselineInputs(SchemaModel):
     bore: confloat(gt=0)
     stroke: confloat(gt=0)
     rod_length: confloat(gt=0)
@@ -24,7 +24,7 @@ class RLRequest(RequestBase):
     inputs: RLInputs
 
 
-class RLNormalizedInputs(BaseModel):
+class RLNormalizedInputs(SchemaModel):
     bore_mm: float
     stroke_mm: float
     rod_length_mm: float
@@ -32,7 +32,7 @@ class RLNormalizedInputs(BaseModel):
     compression: Optional[CompressionNormalizedInputs] = None
 
 
-class RLResults(BaseModel):
+class RLResults(SchemaModel):
     rl_ratio: float
     rod_stroke_ratio: float
     displacement_cc: float
@@ -48,4 +48,8 @@ class RLResponse(ResponseBase):
     results: RLResults
 
 
+class RLBatchResponse(ResponseBase):
+    items: list[Union[RLResponse, ErrorResponse]]
+
+
 RLNormalizedInputs.model_rebuild()
@@ -1,18 +1,18 @@
-from typing import Optional
+from typing import Optional, Union
 
-from pydantic import BaseModel, conint
+from pydantic import confloat, conint, model_validator
 
-from app.schemas.common import RequestBase, ResponseBase
+from app.schemas.common import ErrorResponse, RequestBase, ResponseBase, SchemaModel
 
 
-class SprocketBaselineInputs(BaseModel):
+class SprocketBaselineInputs(SchemaModel):
     sprocket_teeth: conint(gt=0)
     crown_teeth: conint(gt=0)
     chain_pitch: Optional[str] = None
     chain_links: Optional[conint(gt=0)] = None
 
 
-class SprocketInputs(BaseModel):
+class SprocketInputs(SchemaModel):
     sprocket_teeth: conint(gt=0)
     crown_teeth: conint(gt=0)
     chain_pitch: Optional[str] = None
@@ -22,9 +22,10 @@ class SprocketInputs(BaseModel):
 
 class SprocketRequest(RequestBase):
     inputs: SprocketInputs
+    include_diagnostics: bool = False
 
 
-class SprocketNormalizedInputs(BaseModel):
+class SprocketNormalizedInputs(SchemaModel):
     sprocket_teeth: int
     crown_teeth: int
     chain_pitch: Optional[str] = None
@@ -32,7 +33,7 @@ class SprocketNormalizedInputs(BaseModel):
     baseline: Optional["SprocketNormalizedInputs"] = None
 
 
-class SprocketResults(BaseModel):
+class SprocketResults(SchemaModel):
     ratio: float
     chain_length_mm: Optional[float] = None
     chain_length_in: Optional[float] = None
@@ -46,9 +47,97 @@ class SprocketResults(BaseModel):
     diff_center_distance_absolute: Optional[float] = None
 
 
+class CenterDistanceDiagnostics(SchemaModel):
+    method: str
+    exact_mm: float
+    iterations: int
+    residual_links: float
+    unclamped_mm: float
+    clamped: bool
+
+
+class SprocketDiagnostics(SchemaModel):
+    center_distance: Optional[CenterDistanceDiagnostics] = None
+    baseline_center_distance: Optional[CenterDistanceDiagnostics] = None
+
+
 class SprocketResponse(ResponseBase):
     normalized_inputs: SprocketNormalizedInputs
     results: SprocketResults
+    diagnostics: Optional[SprocketDiagnostics] = None
+
+
+class SprocketBatchResponse(ResponseBase):
+    items: list[Union[SprocketResponse, ErrorResponse]]
+
+
+class TeethRange(SchemaModel):
+    min: conint(gt=0, le=200)
+    max: conint(gt=0, le=200)
+
+    @model_validator(mode="after")
+    def validate_bounds(self):
+        if self.max < self.min:
+            raise ValueError("max must be greater than or equal to min")
+        return self
+
+
+class LinkRange(SchemaModel):
+    min: conint(ge=2, le=400)
+    max: conint(ge=2, le=400)
+
+    @model_validator(mode="after")
+    def validate_bounds(self):
+        if self.min % 2 or self.max % 2:
+            raise ValueError("chain links must be even")
+        if self.max < self.min:
+            raise ValueError("max must be greater than or equal to min")
+        return self
+
+
+class SprocketOptimizeInputs(SchemaModel):
+    target_ratio: Optional[confloat(gt=0)] = None
+    target_change_percent: Optional[confloat(gt=-100)] = None
+    baseline: Optional[SprocketBaselineInputs] = None
+    chain_pitch: str
+    sprocket_teeth: TeethRange = TeethRange(min=10, max=20)
+    crown_teeth: TeethRange = TeethRange(min=30, max=60)
+    chain_links: LinkRange = LinkRange(min=90, max=140)
+    center_distance_min_mm: float = 620.0
+    center_distance_max_mm: float = 680.0
+    max_error_percent: Optional[confloat(ge=0)] = None
+    limit: conint(gt=0, le=100) = 10
+
+    @model_validator(mode="after")
+    def validate_target(self):
+        if (self.target_ratio is None) == (self.target_change_percent is None):
+            raise ValueError("provide exactly one of target_ratio or target_change_percent")
+        if self.target_change_percent is not None and self.baseline is None:
+            raise ValueError("baseline required when target_change_percent is provided")
+        return self
+
+
+class SprocketOptimizeRequest(RequestBase):
+    inputs: SprocketOptimizeInputs
+
+
+class SprocketOptimizeCandidate(SchemaModel):
+    sprocket_teeth: int
+    crown_teeth: int
+    chain_links: int
+    ratio: float
+    ratio_error_percent: float
+    chain_length_mm: float
+    chain_length_in: float
+    center_distance_mm: float
+    center_distance_in: float
+    diff_ratio_percent: Optional[float] = None
+
+
+class SprocketOptimizeResponse(ResponseBase):
+    target_ratio: float
+    pairs_evaluated: int
+    results: list[SprocketOptimizeCandidate]
 
 
 SprocketNormalizedInputs.model_rebuild()
@@ -1,13 +1,13 @@
-from typing import Optional, Literal
+from typing import Optional, Literal, Union
 
-from pydantic import BaseModel, confloat, model_validator
+from pydantic import confloat, conint, model_validator
 
-from app.schemas.common import RequestBase, ResponseBase
+from app.schemas.common import ErrorResponse, RequestBase, ResponseBase, SchemaModel
 
 VehicleType = Literal["Car", "Motorcycle", "LightTruck", "TruckCommercial", "Kart", "Kartcross"]
 
 
-class TiresBaselineInputs(BaseModel):
+class TiresBaselineInputs(SchemaModel):
     vehicle_type: VehicleType
     rim_in: confloat(gt=0)
     width_mm: Optional[confloat(gt=0)] = None
@@ -25,7 +25,7 @@ class TiresBaselineInputs(BaseModel):
         return self
 
 
-class TiresInputs(BaseModel):
+class TiresInputs(SchemaModel):
     vehicle_type: VehicleType
     rim_in: confloat(gt=0)
     width_mm: Optional[confloat(gt=0)] = None
@@ -48,7 +48,7 @@ class TiresRequest(RequestBase):
     inputs: TiresInputs
 
 
-class TiresNormalizedInputs(BaseModel):
+class TiresNormalizedInputs(SchemaModel):
     vehicle_type: VehicleType
     rim_in: float
     width_mm: Optional[float] = None
@@ -58,7 +58,7 @@ class TiresNormalizedInputs(BaseModel):
     baseline: Optional["TiresNormalizedInputs"] = None
 
 
-class TiresResults(BaseModel):
+class TiresResults(SchemaModel):
     diameter: float
     width: float
     diff_diameter: Optional[float] = None
@@ -72,4 +72,48 @@ class TiresResponse(ResponseBase):
     results: TiresResults
 
 
+class TiresBatchResponse(ResponseBase):
+    items: list[Union[TiresResponse, ErrorResponse]]
+
+
+class TiresEquivalentsInputs(SchemaModel):
+    reference: Optional[TiresBaselineInputs] = None
+    diameter: Optional[confloat(gt=0)] = None
+    tolerance_percent: confloat(gt=0, le=20) = 3.0
+    vehicle_types: Optional[list[VehicleType]] = None
+    rims_in: Optional[list[confloat(gt=0)]] = None
+    offset: conint(ge=0) = 0
+    limit: conint(gt=0, le=200) = 50
+
+    @model_validator(mode="after")
+    def validate_reference(self):
+        if (self.reference is None) == (self.diameter is None):
+            raise ValueError("provide exactly one of reference or diameter")
+        return self
+
+
+class TiresEquivalentsRequest(RequestBase):
+    inputs: TiresEquivalentsInputs
+
+
+class TiresEquivalent(SchemaModel):
+    vehicle_type: VehicleType
+    rim_in: float
+    width_mm: Optional[float] = None
+    aspect_percent: Optional[float] = None
+    flotation: Optional[str] = None
+    diameter: float
+    diff_diameter: float
+    diff_diameter_percent: float
+
+
+class TiresEquivalentsResponse(ResponseBase):
+    reference_diameter: float
+    tolerance_percent: float
+    total: int
+    offset: int
+    limit: int
+    results: list[TiresEquivalent]
+
+
 TiresNormalizedInputs.model_rebuild()
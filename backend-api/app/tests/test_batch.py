@@ -0,0 +1,89 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import reload_internal_keys
+import app.main as main
+from app.main import app
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+def test_displacement_batch_mixed_items(client):
+    headers = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+    payload = {
+        "unit_system": "metric",
+        "inputs": [
+            {"bore": 58, "stroke": 50, "cylinders": 4},
+            {"bore": 0, "stroke": 50, "cylinders": 4},
+            {"bore": 100, "stroke": 100, "cylinders": 1, "compression": {"chamber_volume": 50}},
+        ],
+    }
+    response = client.post("/v1/calc/displacement/batch", json=payload, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["calculator"] == "displacement"
+    assert len(data["items"]) == 3
+    assert data["items"][0]["results"]["displacement_cc"] == 528.42
+    assert data["items"][1]["error_code"] == "validation_error"
+    assert data["items"][1]["field_errors"][0]["field"] == "inputs.bore"
+    assert data["items"][2]["results"]["compression"]["compression_ratio"] == 16.71
+
+
+def test_batch_matches_single_route(client):
+    headers = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+    inputs = {
+        "sprocket_teeth": 15,
+        "crown_teeth": 38,
+        "baseline": {"sprocket_teeth": 14, "crown_teeth": 38},
+    }
+    single = client.post(
+        "/v1/calc/sprocket", json={"unit_system": "metric", "inputs": inputs}, headers=headers
+    ).json()
+    batch = client.post(
+        "/v1/calc/sprocket/batch",
+        json={"unit_system": "metric", "inputs": [inputs]},
+        headers=headers,
+    ).json()
+    assert batch["items"][0]["results"] == single["results"]
+    assert batch["items"][0]["normalized_inputs"] == single["normalized_inputs"]
+
+
+def test_tires_batch_reports_item_errors_in_order(client):
+    headers = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+    payload = {
+        "unit_system": "metric",
+        "inputs": [
+            {"vehicle_type": "Car", "rim_in": 28, "width_mm": 205, "aspect_percent": 55},
+            {"vehicle_type": "Car", "rim_in": 16, "width_mm": 205, "aspect_percent": 55},
+            {"vehicle_type": "Car", "rim_in": 16},
+        ],
+    }
+    response = client.post("/v1/calc/tires/batch", json=payload, headers=headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert items[0]["field_errors"] == [{"field": "inputs.rim_in", "reason": "invalid rim"}]
+    assert items[1]["calculator"] == "tires"
+    assert items[2]["field_errors"][0]["field"] == "inputs"
+
+
+def test_batch_limit(client, monkeypatch):
+    monkeypatch.setattr(main, "BATCH_MAX_ITEMS", 2)
+    headers = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+    payload = {
+        "unit_system": "metric",
+        "inputs": [{"bore": 58, "stroke": 50, "rod_length": 100}] * 3,
+    }
+    response = client.post("/v1/calc/rl/batch", json=payload, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["field_errors"][0]["field"] == "inputs"
+
+
+def test_batch_requires_internal_key(client):
+    payload = {"unit_system": "metric", "inputs": [{"bore": 58, "stroke": 50, "cylinders": 4}]}
+    response = client.post("/v1/calc/displacement/batch", json=payload)
+    assert response.status_code == 401
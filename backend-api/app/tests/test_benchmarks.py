@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.security import reload_internal_keys
+from app.main import app
+from benchmarks.history import append_run, compare_runs, load_runs
+from benchmarks.loadtest import SCENARIOS_DIR, load_scenario, percentile, run_load
+from benchmarks.macro import asgi_post, load_corpus
+from benchmarks.micro import micro_cases
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+
+
+def test_micro_cases_run():
+    names = []
+    for name, func in micro_cases():
+        func()
+        names.append(name)
+    assert "main.validate_against_db[flotation]" in names
+    assert len(names) == len(set(names))
+
+
+@pytest.mark.parametrize(
+    "route,name",
+    [(route, name) for route, payloads in load_corpus().items() for name in payloads],
+)
+def test_macro_corpus_payloads_succeed(monkeypatch, route, name):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    call = asgi_post(app, route, load_corpus()[route][name], "test-key")
+    body = asyncio.run(call())
+    assert body.startswith(b"{")
+
+
+def test_compare_flags_regressions_beyond_threshold(tmp_path):
+    path = tmp_path / "history.jsonl"
+    append_run({"results": {"a": {"min_ns": 100.0}, "b": {"min_ns": 100.0}}}, path)
+    append_run(
+        {"results": {"a": {"min_ns": 115.0}, "b": {"min_ns": 105.0}, "c": {"min_ns": 1.0}}},
+        path,
+    )
+    base, head = load_runs(path)
+
+    rows = {row["name"]: row for row in compare_runs(base, head, 10.0)}
+
+    assert rows["a"]["status"] == "regression"
+    assert rows["a"]["change_percent"] == 15.0
+    assert rows["b"]["status"] == "ok"
+    assert rows["c"]["status"] == "new"
+
+
+@pytest.mark.parametrize("path", sorted(SCENARIOS_DIR.glob("*.json")), ids=lambda path: path.stem)
+def test_scenarios_resolve_against_corpus(path):
+    mix = load_scenario(path)
+    assert all(entry.weight > 0 and entry.body for entry in mix)
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_run_load_reports_routes_and_errors(monkeypatch, tmp_path):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    scenario = tmp_path / "scenario.json"
+    scenario.write_text(
+        json.dumps(
+            {
+                "mix": [
+                    {"route": "/v1/calc/rl", "payload": "metric", "weight": 3},
+                    {"route": "/v1/calc/tires", "label": "bad", "body": {"inputs": {}}},
+                ]
+            }
+        )
+    )
+    mix = load_scenario(scenario)
+
+    async def scenario_run():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            headers={"Content-Type": "application/json", **HEADERS},
+        ) as client:
+            return await run_load(client, mix, concurrency=2, duration_seconds=0.3, seed=1)
+
+    result = asyncio.run(scenario_run())
+
+    assert set(result["routes"]) == {"/v1/calc/rl", "/v1/calc/tires"}
+    assert result["routes"]["/v1/calc/rl"]["errors"] == 0
+    assert result["routes"]["/v1/calc/rl"]["p50_ms"] > 0
+    assert result["routes"]["/v1/calc/tires"]["error_rate"] == 1.0
+    assert result["total"]["requests"] > 0
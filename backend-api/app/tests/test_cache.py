@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.cache import (
+    MemoryCacheBackend,
+    ResultCache,
+    SQLiteCacheBackend,
+    cache_key,
+    set_result_cache,
+)
+from app.core.offload import set_offload_pool
+from app.core.security import reload_internal_keys
+from app.main import app
+from app.schemas.rl import RLRequest
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+RL_PAYLOAD = {
+    "unit_system": "metric",
+    "inputs": {"bore": 57.0, "stroke": 54.5, "rod_length": 110},
+}
+
+
+@pytest.fixture()
+def cache():
+    result_cache = ResultCache(MemoryCacheBackend(4, 1024 * 1024), ttl_seconds=60)
+    set_result_cache(result_cache)
+    yield result_cache
+    set_result_cache(None)
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+def test_cache_key_is_canonical():
+    first = RLRequest.model_validate(
+        {"unit_system": "metric", "inputs": {"rod_length": 110, "stroke": 54.5, "bore": 57}}
+    )
+    second = RLRequest.model_validate({**RL_PAYLOAD, "language": "en_US"})
+    assert cache_key("rl", first) == cache_key("rl", second)
+    assert cache_key("rl", first) != cache_key("displacement", first)
+    imperial = RLRequest.model_validate({**RL_PAYLOAD, "unit_system": "imperial"})
+    assert cache_key("rl", first) != cache_key("rl", imperial)
+
+
+def test_result_cache_counts_hits_and_misses():
+    cache = ResultCache(MemoryCacheBackend(2, 1024), ttl_seconds=10)
+    cache.put("a", b'{"meta":{"timestamp":"old"}}')
+    assert b'"timestamp":"old"' not in cache.get("a")
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert stats["backend"] == "memory"
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_cached_response_matches_and_refreshes_timestamp(client, cache, monkeypatch):
+    monkeypatch.setattr(main, "_rl", _counting(main._rl))
+    first = client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+    second = client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+
+    assert first.status_code == second.status_code == 200
+    assert main._rl.calls == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+    first_data, second_data = first.json(), second.json()
+    assert second_data["meta"]["timestamp"]
+    assert second_data["meta"]["timestamp"] != first_data["meta"]["timestamp"]
+    first_data["meta"].pop("timestamp")
+    second_data["meta"].pop("timestamp")
+    assert first_data == second_data
+
+
+def test_sqlite_backend_serves_routes(client, tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    set_result_cache(ResultCache(SQLiteCacheBackend(path, 10, 1024 * 1024), ttl_seconds=60))
+    try:
+        first = client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+        # a second process-local cache on the same file sees the first worker's entry
+        other = ResultCache(SQLiteCacheBackend(path, 10, 1024 * 1024), ttl_seconds=60)
+        set_result_cache(other)
+        second = client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+    finally:
+        set_result_cache(None)
+    assert other.hits == 1
+    assert first.json()["results"] == second.json()["results"]
+
+
+def test_batch_items_get_fresh_timestamps(client, cache):
+    payload = {"unit_system": "metric", "inputs": [RL_PAYLOAD["inputs"], {"bore": 57.0}]}
+    client.post("/v1/calc/rl/batch", json=payload, headers=HEADERS)
+    response = client.post("/v1/calc/rl/batch", json=payload, headers=HEADERS)
+    assert cache.hits == 1
+    data = response.json()
+    assert data["items"][0]["meta"]["timestamp"] == data["meta"]["timestamp"]
+    assert data["items"][1]["error_code"] == "validation_error"
+
+
+def test_errors_are_not_cached(client, cache):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {"sprocket_teeth": 14, "crown_teeth": 42, "chain_links": 107},
+    }
+    for _ in range(2):
+        response = client.post("/v1/calc/sprocket", json=payload, headers=HEADERS)
+        assert response.status_code == 400
+    assert cache.stats()["entries"] == 0
+
+
+def test_cache_stats_route(client, cache):
+    client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+    data = client.get("/v1/cache/stats", headers=HEADERS).json()
+    assert data["enabled"] is True
+    assert data["entries"] == 1
+    set_result_cache(None)
+    assert client.get("/v1/cache/stats", headers=HEADERS).json() == {"enabled": False}
+
+
+def _counting(func):
+    def wrapper(*args, **kwargs):
+        wrapper.calls += 1
+        return func(*args, **kwargs)
+
+    wrapper.calls = 0
+    return wrapper
+
+
+class _LoopCheckingBackend(SQLiteCacheBackend):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.calls = []
+
+    def get(self, key):
+        self.calls.append(("get", _on_event_loop()))
+        return super().get(key)
+
+    def set(self, key, value, ttl_seconds):
+        self.calls.append(("set", _on_event_loop()))
+        super().set(key, value, ttl_seconds)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _InlinePool:
+    retry_after_seconds = 1
+
+    async def run(self, func, *args):
+        return func(*args)
+
+
+def test_blocking_backend_stays_off_the_event_loop(client, tmp_path, monkeypatch):
+    backend = _LoopCheckingBackend(str(tmp_path / "cache.sqlite3"), 10, 1024 * 1024)
+    set_result_cache(ResultCache(backend, ttl_seconds=60))
+    monkeypatch.setattr(main, "OFFLOAD_BATCH_MIN_ITEMS", 2)
+    batch = {"unit_system": "metric", "inputs": [RL_PAYLOAD["inputs"]] * 2}
+    try:
+        for _ in range(2):
+            assert client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS).status_code == 200
+        set_offload_pool(_InlinePool())
+        for _ in range(2):
+            response = client.post("/v1/calc/rl/batch", json=batch, headers=HEADERS)
+            assert response.status_code == 200
+    finally:
+        set_offload_pool(None)
+        set_result_cache(None)
+        backend.close()
+    assert backend.calls == [("get", False), ("set", False), ("get", False)] * 2
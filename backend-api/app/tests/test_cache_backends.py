@@ -0,0 +1,159 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from app.core.cache import MemoryCacheBackend, SQLiteCacheBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    backends = []
+
+    def factory(max_entries, max_bytes, clock):
+        if request.param == "memory":
+            backend = MemoryCacheBackend(max_entries, max_bytes, clock=clock)
+        else:
+            backend = SQLiteCacheBackend(
+                str(tmp_path / "cache.sqlite3"), max_entries, max_bytes, clock=clock
+            )
+        backends.append(backend)
+        return backend
+
+    yield factory
+    for backend in backends:
+        if hasattr(backend, "close"):
+            backend.close()
+
+
+def test_backend_lru_eviction(make_backend):
+    clock = FakeClock()
+    backend = make_backend(2, 1024, clock)
+    backend.set("a", b"1", 10)
+    clock.now += 1
+    backend.set("b", b"2", 10)
+    clock.now += 1
+    assert backend.get("a") == b"1"
+    clock.now += 1
+    backend.set("c", b"3", 10)
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    assert backend.get("c") == b"3"
+    assert backend.stats()["evictions"] == 1
+
+
+def test_backend_ttl_and_size_limits(make_backend):
+    clock = FakeClock()
+    backend = make_backend(10, 64, clock)
+    backend.set("a", b"x" * 10, 5)
+    clock.now += 6
+    assert backend.get("a") is None
+    assert backend.stats()["expirations"] == 1
+
+    backend.set("big", b"x" * 100, 5)
+    assert backend.get("big") is None
+    for index in range(6):
+        backend.set(f"k{index}", b"x" * 10, 5)
+        clock.now += 1
+    stats = backend.stats()
+    assert stats["size_bytes"] <= 64
+    assert stats["entries"] == 5
+    assert backend.get("k0") is None
+    assert backend.get("k5") == b"x" * 10
+
+    backend.clear()
+    assert backend.stats()["entries"] == 0
+
+
+def _worker(path, key, value, done):
+    backend = SQLiteCacheBackend(path, 100, 1024 * 1024)
+    backend.set(key, value, 60)
+    done.put(backend.get("shared"))
+    backend.close()
+
+
+def test_sqlite_backend_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    parent = SQLiteCacheBackend(path, 100, 1024 * 1024)
+    parent.set("shared", b"from-parent", 60)
+
+    context = multiprocessing.get_context("spawn")
+    done = context.Queue()
+    workers = [
+        context.Process(target=_worker, args=(path, f"worker-{index}", b"%d" % index, done))
+        for index in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+    assert sorted(done.get(timeout=5) for _ in workers) == [b"from-parent"] * 3
+    for index in range(3):
+        assert parent.get(f"worker-{index}") == b"%d" % index
+    assert parent.stats()["entries"] == 4
+    parent.close()
+
+
+def test_sqlite_totals_track_the_table(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "totals.sqlite3")
+    backend = SQLiteCacheBackend(path, 4, 200, clock=clock)
+    for index in range(10):
+        backend.set(f"k{index % 6}", b"x" * (index * 7), 3)
+        clock.now += 1
+    backend.get("k5")
+    clock.now += 5
+    backend.get("k4")
+    backend.set("last", b"y" * 40, 3)
+    entries, size_bytes = backend._connection.execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+    ).fetchone()
+    stats = backend.stats()
+    assert (stats["entries"], stats["size_bytes"]) == (entries, size_bytes) == (1, 44)
+    backend.clear()
+    assert backend.stats()["entries"] == backend.stats()["size_bytes"] == 0
+    backend.close()
+
+
+def test_sqlite_counts_files_written_before_totals(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+        "size INTEGER NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+    )
+    connection.execute("INSERT INTO entries VALUES ('old', x'00', 4, 1e12, 0)")
+    connection.commit()
+    connection.close()
+    backend = SQLiteCacheBackend(path, 100, 1024)
+    backend.set("new", b"12", 60)
+    assert backend.stats()["entries"] == 2
+    assert backend.stats()["size_bytes"] == 9
+    backend.close()
+
+
+def test_sqlite_writes_use_indexes(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "plan.sqlite3"), 10, 1024)
+    plans = [
+        " ".join(
+            row[-1]
+            for row in backend._connection.execute("EXPLAIN QUERY PLAN " + query, (1,))
+        )
+        for query in (
+            "DELETE FROM entries WHERE expires_at <= ?",
+            "SELECT key FROM entries ORDER BY accessed_at LIMIT ?",
+        )
+    ]
+    backend.close()
+    assert "entries_expires_at" in plans[0]
+    assert "entries_accessed_at" in plans[1]
@@ -11,7 +11,10 @@ from app.calculators.compression import (
     swept_volume_cc,
     trapped_swept_volume_cc,
 )
-from app.main import app
+from app.core.security import reload_internal_keys
+from app.main import _compression_stage, app
+from app.schemas.common import ErrorResponse
+from app.schemas.compression import CompressionInputs
 
 
 def test_compression_helpers():
@@ -29,9 +32,29 @@ def test_compression_helpers():
     assert round(trapped, 2) == 471.24
 
 
+def test_compression_stage_single_pass():
+    compression = CompressionInputs(
+        chamber_volume=3.05, gasket_thickness=0.04, gasket_bore=4.1, deck_height=0.01, piston_volume=0
+    )
+    stage = _compression_stage("imperial", compression, 101.6, 88.9)
+    assert not isinstance(stage, ErrorResponse)
+    results, normalized = stage
+    assert normalized.mode == "advanced"
+    assert round(normalized.gasket_bore, 2) == 104.14
+    assert round(normalized.gasket_thickness, 3) == 1.016
+    assert round(normalized.chamber_volume, 2) == 49.98
+    assert results.compression_mode == "four_stroke"
+    assert results.compression_ratio > 1
+
+    invalid = _compression_stage("metric", CompressionInputs(chamber_volume=0), 100.0, 100.0)
+    assert isinstance(invalid, ErrorResponse)
+    assert invalid.field_errors[0].field == "inputs.compression"
+
+
 @pytest.fixture()
 def client(monkeypatch):
     monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
     return TestClient(app)
 
 
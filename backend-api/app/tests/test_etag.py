@@ -0,0 +1,104 @@
+import copy
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.etag import calculator_version, etag_matches
+from app.core.precompressed import content_version
+from app.core.security import reload_internal_keys
+from app.data.tires_db import TIRES_DB
+from app.main import app
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+URL = "/v1/calc/tires"
+PAYLOAD = {
+    "unit_system": "metric",
+    "inputs": {"vehicle_type": "Car", "rim_in": 16, "width_mm": 205, "aspect_percent": 55},
+}
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    monkeypatch.setattr(main, "ETAG_ENABLED", True)
+    return TestClient(app)
+
+
+def test_etag_and_not_modified(client, monkeypatch):
+    called = []
+    original = main._tires
+    monkeypatch.setattr(main, "_tires", lambda *args: called.append(1) or original(*args))
+
+    first = client.post(URL, json=PAYLOAD, headers=HEADERS)
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert etag.startswith('"') and etag.endswith('"')
+    assert first.headers["cache-control"] == "no-cache"
+
+    reordered = {"inputs": dict(reversed(PAYLOAD["inputs"].items())), "unit_system": "metric"}
+    assert client.post(URL, json=reordered, headers=HEADERS).headers["etag"] == etag
+
+    second = client.post(URL, json=PAYLOAD, headers={**HEADERS, "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert len(called) == 2
+
+    other = copy.deepcopy(PAYLOAD)
+    other["inputs"]["aspect_percent"] = 60
+    response = client.post(URL, json=other, headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_etag_depends_on_calculator_version(client, monkeypatch):
+    etag = client.post(URL, json=PAYLOAD, headers=HEADERS).headers["etag"]
+    changed = main._tire_release()._replace(calculator_version="changed")
+    monkeypatch.setattr(main, "_TIRE_RELEASE", changed)
+    response = client.post(URL, json=PAYLOAD, headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_calculator_version_tracks_tire_data_and_code(tmp_path):
+    version = calculator_version(content_version(TIRES_DB))
+    assert calculator_version(content_version(copy.deepcopy(TIRES_DB))) == version
+    changed = copy.deepcopy(TIRES_DB)
+    changed["Car"]["16"]["205"]["aspects"].append(65)
+    assert calculator_version(content_version(changed)) != version
+
+    (tmp_path / "calc.py").write_text("A = 1\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_calc.py").write_text("B = 1\n")
+    before = calculator_version("", tmp_path)
+    (tmp_path / "tests" / "test_calc.py").write_text("B = 2\n")
+    assert calculator_version("", tmp_path) == before
+    (tmp_path / "calc.py").write_text("A = 2\n")
+    assert calculator_version("", tmp_path) != before
+
+
+def test_cache_control_and_errors(client, monkeypatch):
+    monkeypatch.setattr(main, "CACHE_CONTROL", "public, max-age=60")
+    response = client.post(URL, json=PAYLOAD, headers=HEADERS)
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+    invalid = copy.deepcopy(PAYLOAD)
+    invalid["inputs"]["width_mm"] = 999
+    response = client.post(URL, json=invalid, headers=HEADERS)
+    assert response.status_code == 400
+    assert "etag" not in response.headers
+
+    monkeypatch.setattr(main, "ETAG_ENABLED", False)
+    response = client.post(URL, json=PAYLOAD, headers=HEADERS)
+    assert "etag" not in response.headers
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
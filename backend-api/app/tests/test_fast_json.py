@@ -0,0 +1,166 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.security import reload_internal_keys
+from app.main import app
+
+TIMESTAMP = re.compile(rb'"timestamp":"[^"]+"')
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+
+CASES = [
+    (
+        "/v1/calc/displacement",
+        {
+            "unit_system": "metric",
+            "inputs": {
+                "bore": 57.0,
+                "stroke": 54.5,
+                "cylinders": 1,
+                "baseline_cc": 125,
+                "compression": {"chamber_volume": 12.5, "exhaust_port_height": 28},
+            },
+        },
+    ),
+    (
+        "/v1/calc/rl",
+        {
+            "unit_system": "imperial",
+            "inputs": {"bore": 4.0, "stroke": 3.5, "rod_length": 6.0},
+        },
+    ),
+    (
+        "/v1/calc/sprocket",
+        {
+            "unit_system": "metric",
+            "include_diagnostics": True,
+            "inputs": {
+                "sprocket_teeth": 14,
+                "crown_teeth": 42,
+                "chain_pitch": "520",
+                "chain_links": 108,
+                "baseline": {"sprocket_teeth": 15, "crown_teeth": 42},
+            },
+        },
+    ),
+    (
+        "/v1/calc/tires",
+        {
+            "unit_system": "imperial",
+            "inputs": {
+                "vehicle_type": "Car",
+                "rim_in": 16,
+                "width_mm": 205,
+                "aspect_percent": 55,
+                "baseline": {
+                    "vehicle_type": "Car",
+                    "rim_in": 17,
+                    "width_mm": 215,
+                    "aspect_percent": 45,
+                },
+            },
+        },
+    ),
+    (
+        "/v1/calc/tires/batch",
+        {
+            "unit_system": "metric",
+            "inputs": [
+                {"vehicle_type": "Car", "rim_in": 16, "width_mm": 205, "aspect_percent": 55},
+                {"vehicle_type": "Car", "rim_in": 16, "width_mm": 999, "aspect_percent": 55},
+            ],
+        },
+    ),
+    (
+        "/v1/calc/displacement/sweep",
+        {
+            "unit_system": "metric",
+            "inputs": {
+                "bore": {"start": 56, "stop": 58, "step": 0.5},
+                "stroke": {"start": 54.5},
+                "cylinders": 1,
+                "chamber_volume": {"start": 11, "stop": 13, "step": 1},
+            },
+        },
+    ),
+    (
+        "/v1/calc/sprocket/optimize",
+        {"unit_system": "metric", "inputs": {"target_ratio": 3.1, "chain_pitch": "520"}},
+    ),
+    (
+        "/v1/calc/tires/equivalents",
+        {"unit_system": "metric", "inputs": {"diameter": 650, "limit": 5}},
+    ),
+    ("/v1/calc/rl", {"unit_system": "metric", "inputs": {"bore": 57.0}}),
+    (
+        "/v1/calc/sprocket",
+        {
+            "unit_system": "metric",
+            "inputs": {"sprocket_teeth": 14, "crown_teeth": 42, "chain_links": 107},
+        },
+    ),
+]
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("url,payload", CASES)
+def test_fast_json_matches_default_output(client, monkeypatch, url, payload):
+    monkeypatch.setattr(main, "ETAG_ENABLED", False)
+    monkeypatch.setattr(main, "FAST_JSON", False)
+    expected = client.post(url, json=payload, headers=HEADERS)
+    monkeypatch.setattr(main, "FAST_JSON", True)
+    fast = client.post(url, json=payload, headers=HEADERS)
+
+    assert fast.status_code == expected.status_code
+    assert fast.headers["content-type"] == expected.headers["content-type"]
+    assert TIMESTAMP.sub(b"", fast.content) == TIMESTAMP.sub(b"", expected.content)
+
+
+def test_fast_json_tiny_floats(client, monkeypatch):
+    # Echoed inputs can be tiny floats. Pydantic writes them in positional notation; the
+    # default path matches only on FastAPI releases that serialize through pydantic too
+    # (older ones render with json.dumps: 1e-05), so the values are compared parsed.
+    payload = {
+        "unit_system": "metric",
+        "inputs": {"bore": 0.00001, "stroke": 54.5, "rod_length": 110},
+    }
+    monkeypatch.setattr(main, "FAST_JSON", False)
+    expected = client.post("/v1/calc/rl", json=payload, headers=HEADERS)
+    monkeypatch.setattr(main, "FAST_JSON", True)
+    fast = client.post("/v1/calc/rl", json=payload, headers=HEADERS)
+
+    assert fast.status_code == expected.status_code == 200
+    assert b'"bore_mm":0.00001,' in fast.content
+    fast_body, expected_body = fast.json(), expected.json()
+    fast_body["meta"].pop("timestamp")
+    expected_body["meta"].pop("timestamp")
+    assert fast_body == expected_body
+
+
+def test_fast_json_snapshot(client, monkeypatch):
+    monkeypatch.setattr(main, "FAST_JSON", True)
+    response = client.post(
+        "/v1/calc/rl",
+        json={
+            "unit_system": "metric",
+            "inputs": {"bore": 57.0, "stroke": 54.5, "rod_length": 110},
+        },
+        headers=HEADERS,
+    )
+    assert response.status_code == 200
+    assert TIMESTAMP.sub(b'"timestamp":"T"', response.content) == (
+        b'{"calculator":"rl","unit_system":"metric","warnings":[],"meta":{"version":"v1",'
+        b'"timestamp":"T","source":"legacy-compatible"},"normalized_inputs":{"bore_mm":57.0,'
+        b'"stroke_mm":54.5,"rod_length_mm":110.0,"baseline":null,"compression":null},'
+        b'"results":{"rl_ratio":0.25,"rod_stroke_ratio":2.02,"displacement_cc":139.07,'
+        b'"geometry":"oversquare","smoothness":"smooth","diff_rl_percent":null,'
+        b'"diff_displacement_percent":null,"compression":null}}'
+    )
@@ -1,30 +1,102 @@
 import pytest
 from fastapi import HTTPException
+from fastapi.testclient import TestClient
 
-from app.core.security import require_internal_key
+from app.core.security import (
+    INVALID_TOKEN_DETAIL,
+    MISSING_TOKEN_DETAIL,
+    internal_token_is_valid,
+    load_internal_keys,
+    reload_internal_keys,
+    verify_internal_key,
+)
+from app.main import app
 
+RL_PAYLOAD = {"unit_system": "metric", "inputs": {"bore": 57.0, "stroke": 54.5, "rod_length": 110}}
 
-def test_internal_auth_accepts_custom_header(monkeypatch):
+
+@pytest.fixture()
+def secret(monkeypatch):
     monkeypatch.setenv("PTP_INTERNAL_KEY", "secret")
-    require_internal_key(x_ptp_internal_key="secret", authorization=None)
+    monkeypatch.delenv("PTP_INTERNAL_KEYS", raising=False)
+    monkeypatch.delenv("PTP_INTERNAL_KEYS_FILE", raising=False)
+    reload_internal_keys()
 
 
-def test_internal_auth_accepts_bearer_header(monkeypatch):
-    monkeypatch.setenv("PTP_INTERNAL_KEY", "secret")
-    require_internal_key(x_ptp_internal_key=None, authorization="Bearer secret")
+def test_internal_auth_accepts_custom_header(secret):
+    verify_internal_key(x_ptp_internal_key="secret", authorization=None)
 
 
-def test_internal_auth_missing_headers(monkeypatch):
-    monkeypatch.setenv("PTP_INTERNAL_KEY", "secret")
+def test_internal_auth_accepts_bearer_header(secret):
+    verify_internal_key(x_ptp_internal_key=None, authorization="Bearer secret")
+
+
+def test_internal_auth_missing_headers(secret):
     with pytest.raises(HTTPException) as excinfo:
-        require_internal_key(x_ptp_internal_key=None, authorization=None)
+        verify_internal_key(x_ptp_internal_key=None, authorization=None)
     assert excinfo.value.status_code == 401
     assert excinfo.value.detail["error_code"] == "unauthorized"
+    assert excinfo.value.detail is MISSING_TOKEN_DETAIL
 
 
-def test_internal_auth_rejects_invalid_token(monkeypatch):
-    monkeypatch.setenv("PTP_INTERNAL_KEY", "secret")
+def test_internal_auth_rejects_invalid_token(secret):
     with pytest.raises(HTTPException) as excinfo:
-        require_internal_key(x_ptp_internal_key="wrong", authorization=None)
+        verify_internal_key(x_ptp_internal_key="wrong", authorization=None)
     assert excinfo.value.status_code == 401
-    assert excinfo.value.detail["error_code"] == "unauthorized"
\ No newline at end of file
+    assert excinfo.value.detail["error_code"] == "unauthorized"
+    assert excinfo.value.detail is INVALID_TOKEN_DETAIL
+
+
+def test_internal_auth_key_is_cached_until_reload(secret, monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "rotated")
+    assert internal_token_is_valid("secret", None)
+    assert not internal_token_is_valid("rotated", None)
+
+    reload_internal_keys()
+
+    assert internal_token_is_valid("rotated", None)
+    assert not internal_token_is_valid("secret", None)
+
+
+def test_internal_auth_accepts_every_active_key(tmp_path):
+    keys_file = tmp_path / "keys"
+    keys_file.write_text("from-file\n\n")
+    keys = load_internal_keys(
+        {
+            "PTP_INTERNAL_KEY": "legacy",
+            "PTP_INTERNAL_KEYS": "old, new,,legacy",
+            "PTP_INTERNAL_KEYS_FILE": str(keys_file),
+        }
+    )
+    assert len(keys) == 4
+    assert load_internal_keys({}) == ()
+
+
+def test_internal_auth_without_keys_is_server_error(monkeypatch):
+    monkeypatch.delenv("PTP_INTERNAL_KEY", raising=False)
+    monkeypatch.delenv("PTP_INTERNAL_KEYS", raising=False)
+    monkeypatch.delenv("PTP_INTERNAL_KEYS_FILE", raising=False)
+    reload_internal_keys()
+    assert not internal_token_is_valid("", None)
+    with pytest.raises(HTTPException) as excinfo:
+        verify_internal_key(x_ptp_internal_key="anything", authorization=None)
+    assert excinfo.value.status_code == 500
+    assert excinfo.value.detail["error_code"] == "server_error"
+
+
+def test_internal_auth_dependency_reads_request_headers(secret):
+    client = TestClient(app)
+    assert client.post("/v1/calc/rl", json=RL_PAYLOAD).status_code == 401
+    response = client.post(
+        "/v1/calc/rl", json=RL_PAYLOAD, headers={"X-PTP-Internal-Key": "wrong"}
+    )
+    assert response.status_code == 401
+    assert response.json()["detail"] == INVALID_TOKEN_DETAIL
+    response = client.post(
+        "/v1/calc/rl", json=RL_PAYLOAD, headers={"X-PTP-Internal-Key": "secret"}
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/v1/calc/rl", json=RL_PAYLOAD, headers={"Authorization": "Bearer secret"}
+    )
+    assert response.status_code == 200
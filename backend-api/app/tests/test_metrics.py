@@ -0,0 +1,189 @@
+import asyncio
+import multiprocessing
+import os
+import re
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.metrics import (
+    MetricsMiddleware,
+    MetricsRegistry,
+    SharedMetricsDir,
+    render_registries,
+)
+from app.core.security import reload_internal_keys
+from app.main import app
+from benchmarks.loadtest import _free_port, start_server, stop_server
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+RL_PAYLOAD = {
+    "unit_system": "metric",
+    "inputs": {"bore": 57.0, "stroke": 54.5, "rod_length": 110},
+}
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+def _sample(text, name, **labels):
+    label_pattern = ".*".join(f'{key}="{re.escape(str(value))}"' for key, value in labels.items())
+    match = re.search(rf"^{name}\{{.*{label_pattern}.*\}} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_endpoint_counts_routes_errors_and_phases(client):
+    before = client.get("/metrics", headers=HEADERS).text
+    client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+    client.post("/v1/calc/rl", json={"unit_system": "metric", "inputs": {}}, headers=HEADERS)
+    client.post("/v1/calc/rl", json=RL_PAYLOAD)
+    client.get("/nowhere")
+
+    response = client.get("/metrics", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    route = "/v1/calc/rl"
+    pid = os.getpid()
+
+    def delta(name, **labels):
+        return _sample(text, name, **labels) - _sample(before, name, **labels)
+
+    assert delta("ptp_requests_total", route=route, status=200, pid=pid) == 1
+    assert delta("ptp_requests_total", route=route, status=400) == 1
+    assert delta("ptp_errors_total", route=route, error_code="validation_error") == 1
+    assert delta("ptp_errors_total", route=route, error_code="unauthorized") == 1
+    assert delta("ptp_errors_total", route="unmatched", error_code="http_404") == 1
+    assert delta("ptp_request_duration_seconds_count", route=route) == 3
+    for phase in ("validation", "compute", "serialization"):
+        assert delta("ptp_phase_duration_seconds_count", route=route, phase=phase) == 1
+        assert f'ptp_phase_duration_seconds_bucket{{route="{route}",phase="{phase}"' in text
+
+
+def test_metrics_requires_internal_key(client):
+    assert client.get("/metrics").status_code == 401
+
+
+def test_registry_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def noop(message):
+        return None
+
+    middleware = MetricsMiddleware(endpoint, registry)
+    for _ in range(3):
+        asyncio.run(middleware({"type": "http", "method": "GET"}, None, noop))
+
+    text = registry.render(pid=1)
+    assert 'ptp_requests_total{route="unmatched",method="GET",status="200",pid="1"} 3' in text
+    assert 'ptp_request_duration_seconds_bucket{route="unmatched",pid="1",le="+Inf"} 3' in text
+    assert 'ptp_request_duration_seconds_count{route="unmatched",pid="1"} 3' in text
+    assert "ptp_phase_duration_seconds_bucket" not in text
+
+
+def _served(registry, count):
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def noop(message):
+        return None
+
+    middleware = MetricsMiddleware(endpoint, registry)
+    for _ in range(count):
+        asyncio.run(middleware({"type": "http", "method": "GET"}, None, noop))
+
+
+def _shared_worker(path, count, published, release):
+    registry = MetricsRegistry()
+    _served(registry, count)
+    SharedMetricsDir(path).publish(registry.snapshot())
+    published.put(os.getpid())
+    release.wait(30)
+
+
+def test_shared_dir_renders_every_worker(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    published = context.Queue()
+    release = context.Event()
+    workers = [
+        context.Process(target=_shared_worker, args=(str(tmp_path), count, published, release))
+        for count in (2, 3)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        pids = sorted(published.get(timeout=30) for _ in workers)
+        registry = MetricsRegistry()
+        _served(registry, 1)
+        shared = SharedMetricsDir(str(tmp_path))
+        text = render_registries(shared.collect(registry.snapshot()))
+    finally:
+        release.set()
+        for worker in workers:
+            worker.join(timeout=30)
+
+    counts = {
+        pid: _sample(text, "ptp_requests_total", route="unmatched", pid=pid)
+        for pid in [*pids, os.getpid()]
+    }
+    assert sorted(counts.values()) == [1, 2, 3]
+    assert text.count("# TYPE ptp_requests_total counter") == 1
+
+    # Exited workers are dropped from the next scrape.
+    text = render_registries(shared.collect(registry.snapshot()))
+    assert sorted(os.listdir(tmp_path)) == [f"{os.getpid()}.json"]
+    assert f'pid="{pids[0]}"' not in text
+
+
+def test_any_worker_scrape_covers_all_workers(tmp_path):
+    port = _free_port()
+    env = {
+        "PTP_METRICS_DIR": str(tmp_path),
+        "PTP_METRICS_PUBLISH_SECONDS": "0.05",
+        "PTP_WARM_UP_DELAY_SECONDS": "-1",
+    }
+    server = start_server(2, port, "test-key", env)
+    try:
+        deadline = time.monotonic() + 30
+        while len(list(tmp_path.glob("*.json"))) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        worker_pids = {path.stem for path in tmp_path.glob("*.json")}
+        # A fresh connection per request lets the kernel hand them to either worker.
+        for _ in range(40):
+            assert httpx.get(f"http://127.0.0.1:{port}/nowhere").status_code == 404
+        time.sleep(0.3)
+        scrapes = [
+            httpx.get(f"http://127.0.0.1:{port}/metrics", headers=HEADERS).text
+            for _ in range(6)
+        ]
+    finally:
+        stop_server(server)
+
+    assert len(worker_pids) == 2
+    for text in scrapes:
+        served = {
+            pid: _sample(text, "ptp_requests_total", route="unmatched", pid=pid)
+            for pid in worker_pids
+        }
+        # Whichever worker answered the scrape, it reports what both of them served.
+        assert sum(served.values()) == 40
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_removed_dir_ignores_late_publish(tmp_path):
+    shared = SharedMetricsDir(str(tmp_path))
+    shared.publish(MetricsRegistry().snapshot())
+    shared.remove()
+    shared.publish(MetricsRegistry().snapshot())
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,428 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import pstats
+import signal
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.data import tires_db, tires_payloads
+from app.core.offload import OffloadPool, OffloadRejected, OffloadWorkerLost, set_offload_pool
+from app.core.profiling import ProfileSampler, ProfilingMiddleware
+from app.core.security import reload_internal_keys
+from app.main import app
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+RL_PAYLOAD = {
+    "unit_system": "metric",
+    "inputs": {"bore": 57.0, "stroke": 54.5, "rod_length": 110},
+}
+
+
+def _sweep_payload(bore_stop: float, stroke_stop: float) -> dict:
+    return {
+        "unit_system": "metric",
+        "layout": "columnar",
+        "inputs": {
+            "bore": {"start": 50, "stop": bore_stop, "step": 0.1},
+            "stroke": {"start": 50, "stop": stroke_stop, "step": 0.1},
+            "cylinders": 4,
+            "chamber_volume": {"start": 20},
+        },
+    }
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # One spawned worker for the whole module: starting it imports the app once.
+    offload_pool = OffloadPool(1, 1, 3, main._init_offload_worker, nice=main.OFFLOAD_NICE)
+    asyncio.run(offload_pool.warm_up())
+    yield offload_pool
+    offload_pool.shutdown()
+
+
+@pytest.fixture(scope="module")
+def gates():
+    # Events a pool job can wait on: the manager's proxies pickle into spawned workers.
+    manager = multiprocessing.get_context("spawn").Manager()
+    yield manager
+    manager.shutdown()
+
+
+@pytest.fixture()
+def client(monkeypatch, pool):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    monkeypatch.setattr(main, "ETAG_ENABLED", True)
+    monkeypatch.setattr(main, "OFFLOAD_BATCH_MIN_ITEMS", 5)
+    monkeypatch.setattr(main, "OFFLOAD_SWEEP_MIN_POINTS", 100)
+    monkeypatch.setattr(main, "OFFLOAD_OPTIMIZE_MIN_COMBINATIONS", 100)
+    return TestClient(app)
+
+
+def _without_timestamps(body):
+    if isinstance(body, dict):
+        return {
+            key: _without_timestamps(value) for key, value in body.items() if key != "timestamp"
+        }
+    if isinstance(body, list):
+        return [_without_timestamps(value) for value in body]
+    return body
+
+
+def test_pool_rejects_beyond_queue_depth():
+    pool = OffloadPool(1, 0, 2)
+    try:
+
+        async def scenario():
+            slow = asyncio.create_task(pool.run(time.sleep, 0.3))
+            await asyncio.sleep(0)
+            with pytest.raises(OffloadRejected):
+                await pool.run(math.factorial, 5)
+            await slow
+            return await pool.run(math.factorial, 5)
+
+        assert asyncio.run(scenario()) == 120
+        assert pool.stats() == {
+            "workers": 1,
+            "queue_depth": 0,
+            "nice": 0,
+            "in_flight": 0,
+            "completed": 2,
+            "failed": 0,
+            "rejected": 1,
+            "restarts": 0,
+        }
+    finally:
+        pool.shutdown()
+
+
+def test_pool_replaces_executor_after_worker_dies():
+    pool = OffloadPool(1, 1, 2)
+    try:
+
+        async def scenario():
+            with pytest.raises(OffloadWorkerLost):
+                await pool.run(os._exit, 1)
+            return await pool.run(math.factorial, 5)
+
+        broken = pool.executor
+        assert asyncio.run(scenario()) == 120
+        assert pool.executor is not broken
+        stats = pool.stats()
+        assert (stats["completed"], stats["failed"], stats["restarts"]) == (1, 1, 1)
+        assert stats["in_flight"] == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.parametrize(
+    "route,payload",
+    [
+        ("/v1/calc/displacement/sweep", _sweep_payload(52, 52)),
+        (
+            "/v1/calc/rl/batch",
+            {"unit_system": "metric", "inputs": [RL_PAYLOAD["inputs"]] * 5 + [{"bore": -1}]},
+        ),
+        (
+            "/v1/calc/tires/batch",
+            {
+                "unit_system": "metric",
+                "inputs": [
+                    {"vehicle_type": "Car", "rim_in": 16, "width_mm": 205, "aspect_percent": 55}
+                ]
+                * 6,
+            },
+        ),
+        (
+            "/v1/calc/sprocket/optimize",
+            {"unit_system": "metric", "inputs": {"target_ratio": 3.1, "chain_pitch": "520"}},
+        ),
+    ],
+)
+def test_offloaded_results_match_inline(client, pool, route, payload):
+    set_offload_pool(None)
+    inline = client.post(route, json=payload, headers=HEADERS)
+    set_offload_pool(pool)
+    try:
+        completed = pool.completed
+        offloaded = client.post(route, json=payload, headers=HEADERS)
+        assert pool.completed == completed + 1
+    finally:
+        set_offload_pool(None)
+    assert offloaded.status_code == inline.status_code == 200
+    assert offloaded.headers["etag"] == inline.headers["etag"]
+    assert _without_timestamps(offloaded.json()) == _without_timestamps(inline.json())
+
+
+def test_small_jobs_stay_inline(client, pool):
+    set_offload_pool(pool)
+    try:
+        completed = pool.completed
+        payload = {"unit_system": "metric", "inputs": [RL_PAYLOAD["inputs"]] * 2}
+        assert client.post("/v1/calc/rl/batch", json=payload, headers=HEADERS).status_code == 200
+        assert client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS).status_code == 200
+        assert pool.completed == completed
+    finally:
+        set_offload_pool(None)
+
+
+def test_offloaded_validation_errors(client, pool):
+    set_offload_pool(pool)
+    try:
+        payload = _sweep_payload(52, 52)
+        payload["inputs"]["chamber_volume"] = {"start": -1}
+        response = client.post("/v1/calc/displacement/sweep", json=payload, headers=HEADERS)
+    finally:
+        set_offload_pool(None)
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "validation_error"
+
+
+def test_full_queue_answers_503(client, pool, monkeypatch):
+    set_offload_pool(pool)
+    monkeypatch.setattr(pool, "in_flight", pool.capacity)
+    try:
+        response = client.post(
+            "/v1/calc/displacement/sweep", json=_sweep_payload(52, 52), headers=HEADERS
+        )
+    finally:
+        set_offload_pool(None)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["error_code"] == "overloaded"
+
+
+def test_killed_worker_answers_503_and_pool_recovers(client, pool):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test", headers=HEADERS
+        ) as http:
+            sweep = asyncio.create_task(
+                http.post("/v1/calc/displacement/sweep", json=_sweep_payload(80, 80))
+            )
+            while pool.in_flight == 0:
+                await asyncio.sleep(0.001)
+            for process in list(pool.executor._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+            lost = await sweep
+            retried = await http.post(
+                "/v1/calc/displacement/sweep", json=_sweep_payload(52, 52)
+            )
+            return lost, retried
+
+    set_offload_pool(pool)
+    try:
+        restarts = pool.restarts
+        lost, retried = asyncio.run(scenario())
+    finally:
+        set_offload_pool(None)
+    assert lost.status_code == 503
+    assert lost.headers["retry-after"] == "3"
+    assert lost.json()["error_code"] == "worker_lost"
+    assert pool.restarts == restarts + 1
+    assert retried.status_code == 200
+
+
+NDJSON_HEADERS = {**HEADERS, "Accept": "application/x-ndjson"}
+TIRE_ITEM = {"vehicle_type": "Car", "rim_in": 16, "width_mm": 205, "aspect_percent": 55}
+
+
+@pytest.mark.parametrize(
+    "route,payload,chunks",
+    [
+        ("/v1/calc/displacement/sweep", _sweep_payload(52, 52), 4),
+        (
+            "/v1/calc/tires/batch",
+            {"unit_system": "metric", "inputs": [TIRE_ITEM] * 20 + [{"rim_in": 16}]},
+            2,
+        ),
+    ],
+)
+def test_offloaded_streams_match_inline(client, pool, monkeypatch, route, payload, chunks):
+    monkeypatch.setattr(main, "SWEEP_STREAM_CHUNK_POINTS", 128)
+    inline = client.post(route, json=payload, headers=NDJSON_HEADERS)
+    set_offload_pool(pool)
+    try:
+        completed = pool.completed
+        offloaded = client.post(route, json=payload, headers=NDJSON_HEADERS)
+        assert pool.completed == completed + chunks
+        assert pool.in_flight == 0
+    finally:
+        set_offload_pool(None)
+    assert offloaded.status_code == inline.status_code == 200
+    assert offloaded.headers["content-type"].startswith("application/x-ndjson")
+    assert _without_timestamps([json.loads(line) for line in offloaded.iter_lines()]) == (
+        _without_timestamps([json.loads(line) for line in inline.iter_lines()])
+    )
+
+
+def test_offloaded_stream_errors_before_streaming(client, pool, monkeypatch):
+    payload = _sweep_payload(52, 52)
+    payload["inputs"]["chamber_volume"] = {"start": -1}
+    set_offload_pool(pool)
+    try:
+        invalid = client.post("/v1/calc/displacement/sweep", json=payload, headers=NDJSON_HEADERS)
+        monkeypatch.setattr(pool, "in_flight", pool.capacity)
+        full = client.post(
+            "/v1/calc/displacement/sweep", json=_sweep_payload(52, 52), headers=NDJSON_HEADERS
+        )
+    finally:
+        set_offload_pool(None)
+    assert invalid.status_code == 400
+    assert invalid.json()["error_code"] == "validation_error"
+    assert full.status_code == 503
+    assert full.json()["error_code"] == "overloaded"
+
+
+def test_stream_chunks_wait_for_a_slot_when_the_pool_fills_mid_stream(pool, gates):
+    payload = main.DisplacementSweepRequest.model_validate(_sweep_payload(52, 52))
+    inputs_json = payload.inputs.model_dump_json()
+    chunks = [
+        (main._sweep_stream_chunk, "metric", inputs_json, start, start + 100)
+        for start in range(0, 400, 100)
+    ]
+    gate = gates.Event()
+
+    async def scenario():
+        response = await main._offloaded_stream(pool, tires_db.get_tire_catalog(), chunks)
+        lines = response.body_iterator
+        received = [await lines.__anext__()]
+        # Other requests take every slot between two chunks of the stream.
+        blockers = [asyncio.create_task(pool.run(gate.wait, 60)) for _ in range(pool.capacity)]
+        next_chunk = asyncio.create_task(lines.__anext__())
+        await asyncio.sleep(0.05)
+        waiting = (pool.in_flight, next_chunk.done())
+        gate.set()
+        assert all(await asyncio.gather(*blockers))
+        received.append(await next_chunk)
+        received.extend([line async for line in lines])
+        return received, waiting
+
+    received, waiting = asyncio.run(scenario())
+    assert waiting == (pool.capacity, False)
+    assert pool.in_flight == 0
+    assert len(received) == len(chunks)
+    records = [json.loads(line) for body in received for line in body.splitlines()]
+    assert len(records) == 400
+
+
+def test_large_stream_without_pool_builds_grid_off_the_loop(client, monkeypatch):
+    threads = []
+    original = main._sweep_grid
+
+    def sweep_grid(*args):
+        try:
+            asyncio.get_running_loop()
+            threads.append("event loop")
+        except RuntimeError:
+            threads.append("threadpool")
+        return original(*args)
+
+    monkeypatch.setattr(main, "_sweep_grid", sweep_grid)
+    response = client.post(
+        "/v1/calc/displacement/sweep", json=_sweep_payload(52, 52), headers=NDJSON_HEADERS
+    )
+    assert response.status_code == 200
+    assert threads == ["threadpool"]
+
+
+def test_worker_never_computes_on_another_catalog(client, pool, monkeypatch, tmp_path):
+    # The parent pinned a release the file no longer holds (replaced again since): the
+    # worker must not compute on the file's catalog, and the parent computes instead.
+    monkeypatch.setattr(tires_db, "_CATALOG", tires_db._CATALOG)
+    monkeypatch.setattr(tires_payloads, "_PAYLOADS", tires_payloads._PAYLOADS)
+    monkeypatch.setattr(main, "_TIRE_RELEASE", main._tire_release())
+    path = tmp_path / "tires.json"
+    path.write_text(json.dumps(tires_db.TIRES_DB))
+    monkeypatch.setattr(main, "TIRES_CATALOG_PATH", str(path))
+    extended = json.loads(path.read_text())
+    extended["Car"]["16"]["205"]["aspects"].append(65)
+    main._publish_tire_release(main._prepare_tire_release(tires_db.IndexedTireCatalog(extended)))
+
+    item = {**TIRE_ITEM, "aspect_percent": 65}
+    payload = {"unit_system": "metric", "inputs": [item] * 20}
+    set_offload_pool(pool)
+    try:
+        failed = pool.failed
+        response = client.post("/v1/calc/tires/batch", json=payload, headers=HEADERS)
+        streamed = client.post("/v1/calc/tires/batch", json=payload, headers=NDJSON_HEADERS)
+        assert pool.failed == failed + 3
+    finally:
+        set_offload_pool(None)
+    assert response.status_code == streamed.status_code == 200
+    items = [*response.json()["items"], *(json.loads(line) for line in streamed.iter_lines())]
+    assert len(items) == 40
+    assert all("error_code" not in item for item in items)
+
+
+def test_sampled_offloaded_job_is_profiled_in_worker(client, pool, monkeypatch, tmp_path):
+    sampler = ProfileSampler(0.0, True, str(tmp_path))
+    monkeypatch.setattr(main, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(main, "PROFILE_SAMPLER", sampler)
+    profiled_client = TestClient(ProfilingMiddleware(app, sampler))
+    set_offload_pool(pool)
+    try:
+        completed = pool.completed
+        response = profiled_client.post(
+            "/v1/calc/displacement/sweep",
+            json=_sweep_payload(52, 52),
+            headers={**HEADERS, "X-PTP-Profile": "1"},
+        )
+        assert pool.completed == completed + 1
+    finally:
+        set_offload_pool(None)
+    assert response.status_code == 200
+    assert sampler.samples == 1
+
+    summary = sampler.summary(limit=50)
+    names = [item["function"] for item in summary["functions"]]
+    assert any("(_serialized_result)" in name for name in names)
+    assert any("vectorized.py" in name for name in names)
+    # The stored file is a regular pstats dump.
+    (filename,) = os.listdir(tmp_path)
+    assert pstats.Stats(str(tmp_path / filename)).total_calls > 0
+
+
+def test_light_request_is_answered_while_sweep_is_in_the_pool(client, pool, gates):
+    # The pool's only worker is held on an event, so the sweep stays queued in the pool
+    # for as long as the test needs: no timing involved.
+    gate = gates.Event()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test", headers=HEADERS
+        ) as http:
+            blocker = asyncio.create_task(pool.run(gate.wait, 60))
+            while pool.in_flight == 0:
+                await asyncio.sleep(0.001)
+            sweep = asyncio.create_task(
+                http.post("/v1/calc/displacement/sweep", json=_sweep_payload(52, 52))
+            )
+            while pool.in_flight < 2:
+                await asyncio.sleep(0.001)
+            light = await http.post("/v1/calc/rl", json=RL_PAYLOAD)
+            in_flight = pool.in_flight
+            sweep_done = sweep.done()
+            gate.set()
+            assert await blocker
+            return light, in_flight, sweep_done, await sweep
+
+    set_offload_pool(pool)
+    try:
+        completed = pool.completed
+        light, in_flight, sweep_done, sweep = asyncio.run(scenario())
+        assert pool.completed == completed + 2
+    finally:
+        set_offload_pool(None)
+    assert light.status_code == 200
+    assert (in_flight, sweep_done) == (2, False)
+    assert sweep.status_code == 200
@@ -0,0 +1,99 @@
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.profiling import ProfileSampler, ProfilingMiddleware
+from app.core.security import reload_internal_keys
+from app.main import app
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+RL_PAYLOAD = {
+    "unit_system": "metric",
+    "inputs": {"bore": 57.0, "stroke": 54.5, "rod_length": 110},
+}
+
+
+@pytest.fixture()
+def profiled(monkeypatch, tmp_path):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+
+    def factory(sample_rate=0.0, header_enabled=True, rng=lambda: 1.0):
+        sampler = ProfileSampler(sample_rate, header_enabled, str(tmp_path), rng=rng)
+        monkeypatch.setattr(main, "PROFILING_ENABLED", True)
+        monkeypatch.setattr(main, "PROFILE_SAMPLER", sampler)
+        return sampler, TestClient(ProfilingMiddleware(app, sampler))
+
+    return factory
+
+
+def test_header_profiles_request_and_summarizes(profiled, tmp_path):
+    sampler, client = profiled()
+    response = client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+    assert response.status_code == 200
+    assert sampler.samples == 0
+
+    response = client.post(
+        "/v1/calc/rl", json=RL_PAYLOAD, headers={**HEADERS, "X-PTP-Profile": "1"}
+    )
+    assert response.status_code == 200
+    assert sampler.samples == 1
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].startswith("v1_calc_rl-")
+
+    summary = client.get("/v1/debug/profiles?limit=50", headers=HEADERS).json()
+    assert summary["enabled"] is True
+    assert summary["samples"] == 1
+    names = [item["function"] for item in summary["functions"]]
+    assert any("(_rl)" in name for name in names)
+    cumulative = [item["cumtime_ms"] for item in summary["functions"]]
+    assert cumulative == sorted(cumulative, reverse=True)
+
+
+def test_profile_is_stored_off_the_event_loop(profiled, monkeypatch, tmp_path):
+    sampler, client = profiled()
+    record = sampler.record
+    loops = []
+
+    def recording(request_profile):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return record(request_profile)
+
+    monkeypatch.setattr(sampler, "record", recording)
+    client.post("/v1/calc/rl", json=RL_PAYLOAD, headers={**HEADERS, "X-PTP-Profile": "1"})
+    assert loops == [None]
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_header_requires_internal_key(profiled):
+    sampler, client = profiled()
+    client.post(
+        "/v1/calc/rl",
+        json=RL_PAYLOAD,
+        headers={"X-PTP-Internal-Key": "wrong", "X-PTP-Profile": "1"},
+    )
+    assert sampler.samples == 0
+
+
+def test_sample_rate(profiled):
+    draws = iter([0.9, 0.1])
+    sampler, client = profiled(sample_rate=0.5, header_enabled=False, rng=lambda: next(draws))
+    client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+    assert sampler.samples == 0
+    client.post("/v1/calc/rl", json=RL_PAYLOAD, headers=HEADERS)
+    assert sampler.samples == 1
+
+
+def test_profiling_disabled_by_default(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    assert main.PROFILE_SAMPLER is None
+    assert not any(item.cls is ProfilingMiddleware for item in app.user_middleware)
+    client = TestClient(app)
+    assert client.get("/v1/debug/profiles", headers=HEADERS).json() == {"enabled": False}
@@ -3,6 +3,7 @@ from fastapi.testclient import TestClient
 from pydantic import ValidationError
 
 from app.calculators.rl import calculate_rl_ratio, calculate_rod_stroke_ratio, classify_smoothness
+from app.core.security import reload_internal_keys
 from app.main import app
 from app.schemas.rl import RLResults, RLInputs
 
@@ -50,6 +51,7 @@ def test_smoothness_classification():
 @pytest.fixture()
 def client(monkeypatch):
     monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
     return TestClient(app)
 
 
@@ -1,8 +1,17 @@
+import math
+
 import pytest
 from fastapi.testclient import TestClient
 from pydantic import ValidationError
 
-from app.calculators.sprocket import calculate_ratio
+from app.calculators.sprocket import (
+    CHAIN_PITCH_MM,
+    calculate_center_distance_mm,
+    calculate_ratio,
+    chain_links_for_center_distance,
+    solve_center_distance,
+)
+from app.core.security import reload_internal_keys
 from app.main import app
 from app.schemas.sprocket import SprocketInputs, SprocketResults
 
@@ -11,6 +20,50 @@ def test_sprocket_ratio():
     assert round(calculate_ratio(38, 14), 2) == 2.71
 
 
+def _legacy_center_distance_mm(z1, z2, p, links, wear_factor):
+    c = (links * p - (math.pi * (z1 + z2) * p / 2.0)) / 2.0
+    for _ in range(1000):
+        l_calc = 2 * (c / p) + (z1 + z2) / 2.0 + (z2 - z1) ** 2 / (4 * math.pi * math.pi * (c / p))
+        if abs(l_calc - links) < 0.01:
+            break
+        c += (links - l_calc) * p * wear_factor / 2.0
+    return max(620.0, min(680.0, c))
+
+
+def test_center_distance_matches_legacy_iteration():
+    # The published value is the legacy one, bit for bit; the exact root sits within the
+    # legacy stop (0.01 link, a little over 0.005 * pitch of center distance).
+    for pitch_mm in sorted(set(CHAIN_PITCH_MM.values())):
+        for sprocket_teeth in range(10, 21):
+            for crown_teeth in range(30, 61):
+                for links in range(90, 142, 2):
+                    exact = solve_center_distance(
+                        sprocket_teeth, crown_teeth, pitch_mm, links
+                    ).center_distance_mm
+                    for wear_factor in (1.0, 0.98):
+                        legacy = _legacy_center_distance_mm(
+                            sprocket_teeth, crown_teeth, pitch_mm, links, wear_factor
+                        )
+                        assert calculate_center_distance_mm(
+                            sprocket_teeth, crown_teeth, pitch_mm, links, wear_factor
+                        ) == legacy
+                        assert abs(exact - legacy) <= 0.006 * pitch_mm
+
+
+def test_center_distance_solution_is_exact():
+    solution = solve_center_distance(12, 64, 19.05, 106)
+    assert solution.iterations <= 1
+    assert abs(solution.residual_links) < 1e-9
+    assert 620.0 < solution.center_distance_mm < 680.0
+    links = chain_links_for_center_distance(12, 64, 19.05, solution.center_distance_mm)
+    assert math.isclose(links, 106, rel_tol=1e-12)
+
+
+def test_center_distance_clamp():
+    assert calculate_center_distance_mm(15, 45, 15.875, 100) == 620.0
+    assert calculate_center_distance_mm(15, 45, 15.875, 140) == 680.0
+
+
 def test_sprocket_validation_errors():
     with pytest.raises(ValidationError):
         SprocketInputs(sprocket_teeth=0, crown_teeth=38)
@@ -36,6 +89,7 @@ def test_sprocket_results_shape():
 @pytest.fixture()
 def client(monkeypatch):
     monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
     return TestClient(app)
 
 
@@ -53,3 +107,63 @@ def test_sprocket_diff_ratio(client):
     assert response.status_code == 200
     data = response.json()
     assert data["results"]["diff_ratio_percent"] == -6.67
+
+
+def test_sprocket_diagnostics(client):
+    headers = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+    payload = {
+        "unit_system": "metric",
+        "include_diagnostics": True,
+        "inputs": {
+            "sprocket_teeth": 12,
+            "crown_teeth": 64,
+            "chain_pitch": "630",
+            "chain_links": 106,
+        },
+    }
+    response = client.post("/v1/calc/sprocket", json=payload, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    diagnostics = data["diagnostics"]["center_distance"]
+    assert diagnostics["method"] == "closed_form"
+    assert abs(diagnostics["residual_links"]) < 1e-9
+    assert diagnostics["clamped"] is False
+    assert data["diagnostics"]["baseline_center_distance"] is None
+    # The exact root lives only in diagnostics; the public value stays the legacy one.
+    exact = solve_center_distance(12, 64, 19.05, 106).center_distance_mm
+    assert diagnostics["exact_mm"] == exact
+    assert data["results"]["center_distance_mm"] == round(
+        _legacy_center_distance_mm(12, 64, 19.05, 106, 1.0), 2
+    )
+    assert data["results"]["center_distance_mm"] != round(exact, 2)
+
+    payload["include_diagnostics"] = False
+    response = client.post("/v1/calc/sprocket", json=payload, headers=headers)
+    assert response.json()["diagnostics"] is None
+
+
+def test_sprocket_center_distances_match_legacy_api(client):
+    headers = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "sprocket_teeth": 12,
+            "crown_teeth": 64,
+            "chain_pitch": "630",
+            "chain_links": 106,
+            "baseline": {
+                "sprocket_teeth": 13,
+                "crown_teeth": 60,
+                "chain_pitch": "630",
+                "chain_links": 106,
+            },
+        },
+    }
+    response = client.post("/v1/calc/sprocket", json=payload, headers=headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    # Legacy: the compared setup used wear factor 0.98, the baseline 1.0.
+    current = _legacy_center_distance_mm(12, 64, 19.05, 106, 0.98)
+    baseline = _legacy_center_distance_mm(13, 60, 19.05, 106, 1.0)
+    assert results["center_distance_mm"] == round(current, 2)
+    assert results["diff_center_distance_absolute"] == round(current - baseline, 2)
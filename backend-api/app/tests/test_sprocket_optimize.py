@@ -0,0 +1,133 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.calculators.sprocket import search_gearing, solve_center_distance
+from app.core.security import reload_internal_keys
+from app.main import app
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+
+
+def _brute_force(target_ratio, pitch_mm, window):
+    matches = []
+    for sprocket in range(10, 21):
+        for crown in range(30, 61):
+            for links in range(90, 141, 2):
+                center = solve_center_distance(sprocket, crown, pitch_mm, links).unclamped_mm
+                unclamped = window[0] < center < window[1]
+                if unclamped:
+                    matches.append((abs(crown / sprocket - target_ratio), sprocket, crown, links))
+    return sorted(matches)
+
+
+def test_search_matches_brute_force():
+    candidates, _ = search_gearing(
+        3.0, 15.875, (10, 20), (30, 60), (90, 140), (620.0, 680.0), limit=200
+    )
+    brute = _brute_force(3.0, 15.875, (620.0, 680.0))
+    best_error = brute[0][0]
+    found = {(c.sprocket_teeth, c.crown_teeth, c.chain_links) for c in candidates}
+    expected = {(s, c, l) for error, s, c, l in brute if error == best_error}
+    assert expected <= found
+    for candidate in candidates:
+        assert 620.0 <= candidate.center_distance_mm <= 680.0
+    errors = [candidate.ratio_error for candidate in candidates]
+    assert errors == sorted(errors)
+
+
+def test_search_prunes_by_ratio():
+    _, evaluated = search_gearing(
+        2.71, 15.875, (10, 20), (30, 60), (90, 140), (620.0, 680.0), limit=5
+    )
+    assert evaluated < 11 * 31
+
+
+def test_optimize_target_ratio(client):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {"target_ratio": 3.0, "chain_pitch": "520", "limit": 5},
+    }
+    started = time.perf_counter()
+    response = client.post("/v1/calc/sprocket/optimize", json=payload, headers=HEADERS)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    data = response.json()
+    assert elapsed < 0.5
+    assert len(data["results"]) == 5
+    first = data["results"][0]
+    assert first["ratio"] == 3.0
+    assert first["ratio_error_percent"] == 0.0
+    assert 620 <= first["center_distance_mm"] <= 680
+    assert first["crown_teeth"] == 3 * first["sprocket_teeth"]
+
+
+def test_optimize_target_change_percent(client):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "target_change_percent": 10,
+            "baseline": {"sprocket_teeth": 15, "crown_teeth": 40},
+            "chain_pitch": "428",
+            "max_error_percent": 1,
+        },
+    }
+    response = client.post("/v1/calc/sprocket/optimize", json=payload, headers=HEADERS)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["target_ratio"] == round(40 / 15 * 1.1, 4)
+    assert data["results"]
+    for result in data["results"]:
+        assert abs(result["ratio_error_percent"]) <= 1
+        assert abs(result["diff_ratio_percent"] - 10) <= 1.2
+
+
+def test_optimize_validation(client):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "target_ratio": 3.0,
+            "chain_pitch": "999",
+            "center_distance_min_mm": 600,
+        },
+    }
+    response = client.post("/v1/calc/sprocket/optimize", json=payload, headers=HEADERS)
+    assert response.status_code == 400
+    fields = {error["field"] for error in response.json()["field_errors"]}
+    assert fields == {"inputs.chain_pitch", "inputs.center_distance_min_mm"}
+
+    payload = {"unit_system": "metric", "inputs": {"chain_pitch": "520"}}
+    response = client.post("/v1/calc/sprocket/optimize", json=payload, headers=HEADERS)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "links,accepted",
+    [
+        ({"min": 2, "max": 400}, True),
+        ({"min": 90, "max": 141}, False),
+        ({"min": 91, "max": 140}, False),
+        ({"min": 90, "max": 402}, False),
+        ({"min": 0, "max": 140}, False),
+    ],
+)
+def test_optimize_link_range(client, links, accepted):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {"target_ratio": 3.0, "chain_pitch": "520", "chain_links": links},
+    }
+    response = client.post("/v1/calc/sprocket/optimize", json=payload, headers=HEADERS)
+    assert (response.status_code == 200) is accepted
+    if not accepted:
+        assert response.status_code == 400
+        fields = {error["field"] for error in response.json()["field_errors"]}
+        assert any(field.startswith("inputs.chain_links") for field in fields)
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.calculators.sprocket import calculate_center_distance_mm
+from app.core.etag import calculator_version
+from app.core.security import reload_internal_keys
+from app.data import sprocket_table
+from app.data.sprocket_table import (
+    SprocketTable,
+    TableVersionMismatch,
+    configure_sprocket_table,
+    lookup_center_distance_mm,
+    solver_version,
+    sprocket_table_version,
+)
+from app.main import app
+
+
+@pytest.fixture()
+def table():
+    built = SprocketTable.build()
+    sprocket_table.set_sprocket_table(built)
+    yield built
+    sprocket_table.set_sprocket_table(None)
+
+
+def test_table_matches_live_computation(table):
+    for pitch_mm in table.center_distances:
+        for sprocket_teeth in (10, 14, 20):
+            for crown_teeth in (30, 45, 60):
+                for links in (90, 112, 140):
+                    assert table.center_distance_mm(
+                        sprocket_teeth, crown_teeth, pitch_mm, links
+                    ) == calculate_center_distance_mm(sprocket_teeth, crown_teeth, pitch_mm, links)
+
+
+def test_table_misses_outside_range(table):
+    assert table.center_distance_mm(9, 45, 15.875, 112) is None
+    assert table.center_distance_mm(15, 61, 15.875, 112) is None
+    assert table.center_distance_mm(15, 45, 15.875, 142) is None
+    assert table.center_distance_mm(15, 45, 15.875, 111) is None
+    assert table.center_distance_mm(15, 45, 10.0, 112) is None
+    assert lookup_center_distance_mm(9, 45, 15.875, 112) == calculate_center_distance_mm(
+        9, 45, 15.875, 112
+    )
+
+
+def test_table_reports_size(table):
+    assert table.entries == 3 * 11 * 31 * 26
+    assert table.memory_bytes > table.entries * 8
+    assert table.build_seconds > 0
+
+
+def test_table_round_trip(tmp_path, table):
+    path = tmp_path / "sprocket_table.json"
+    table.dump(str(path))
+    loaded = SprocketTable.load(str(path))
+    assert loaded.center_distances == table.center_distances
+    assert loaded.center_distance_mm(15, 45, 15.875, 112) == table.center_distance_mm(
+        15, 45, 15.875, 112
+    )
+
+
+def test_startup_builds_table(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    monkeypatch.setenv("PTP_SPROCKET_TABLE", "build")
+    headers = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "sprocket_teeth": 15,
+            "crown_teeth": 45,
+            "chain_pitch": "520",
+            "chain_links": 112,
+        },
+    }
+    try:
+        with TestClient(app) as client:
+            assert sprocket_table.get_sprocket_table() is not None
+            response = client.post("/v1/calc/sprocket", json=payload, headers=headers)
+    finally:
+        sprocket_table.set_sprocket_table(None)
+    assert response.status_code == 200
+    expected = calculate_center_distance_mm(15, 45, 15.875, 112)
+    assert response.json()["results"]["center_distance_mm"] == round(expected, 2)
+
+
+def test_table_from_other_solver_is_rebuilt(tmp_path, table):
+    path = tmp_path / "sprocket_table.json"
+    table.dump(str(path))
+    data = json.loads(path.read_text())
+    assert data["solver_version"] == solver_version()
+    data["solver_version"] = "0000000000000000"
+    data["center_distances"] = {
+        pitch: [value + 0.1 for value in values]
+        for pitch, values in data["center_distances"].items()
+    }
+    path.write_text(json.dumps(data))
+    with pytest.raises(TableVersionMismatch):
+        SprocketTable.load(str(path))
+    try:
+        rebuilt = configure_sprocket_table(str(path))
+        assert rebuilt.solver_version == solver_version()
+        assert rebuilt.center_distances == table.center_distances
+    finally:
+        sprocket_table.set_sprocket_table(None)
+
+
+def test_table_version_feeds_etags(table):
+    assert sprocket_table_version() == solver_version()
+    assert calculator_version("", sprocket_table_version=solver_version()) != calculator_version("")
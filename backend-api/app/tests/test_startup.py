@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.security import reload_internal_keys
+from app.core.startup import StartupReport, process_age_seconds
+from app.data import tires_payloads
+from app.main import app
+from app.schemas.common import SchemaModel
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def _schema_models():
+    pending = [SchemaModel]
+    while pending:
+        model = pending.pop()
+        yield model
+        pending.extend(model.__subclasses__())
+
+
+def test_import_leaves_heavy_work_for_first_use():
+    # A fresh interpreter: the test process has long imported numpy and built the schemas.
+    script = (
+        "import sys\n"
+        "from app.main import _TIRE_RELEASE, app\n"
+        "from app.data import tires_db\n"
+        "from app.schemas.rl import RLResults\n"
+        "print('numpy' in sys.modules, RLResults.__pydantic_complete__, app.openapi_schema)\n"
+        "print(tires_db._BUILTIN, _TIRE_RELEASE)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert output.split() == ["False", "False", "None", "None", "None"]
+
+
+def test_warm_up_builds_deferred_work(monkeypatch, caplog):
+    monkeypatch.setattr(main, "_TIRE_RELEASE", None)
+    monkeypatch.setattr(tires_payloads, "_PAYLOADS", None)
+    monkeypatch.setattr(main, "STARTUP_REPORT_ENABLED", True)
+    with caplog.at_level(logging.INFO, logger="uvicorn.error"):
+        asyncio.run(main.warm_up(0))
+    assert main._TIRE_RELEASE is not None
+    assert tires_payloads.current_tire_payloads() is not None
+    assert "numpy" in sys.modules
+    assert all(model.__pydantic_complete__ for model in _schema_models())
+    assert "Startup report (warm-up): tire index " in caplog.text
+    for phase in ("calculator version", "tire payloads", "numpy", "schemas"):
+        assert f"{phase} " in caplog.text
+    assert "interpreter and server" not in caplog.text
+
+
+def test_report_phases(caplog):
+    report = StartupReport()
+    report.phase("imports")
+    report.phase("routes")
+    names = [name for name, _ in report.phases]
+    assert names[-2:] == ["imports", "routes"]
+    if process_age_seconds() is not None:
+        assert names[0] == "interpreter and server"
+        assert report.phases[0][1] > 0
+    with caplog.at_level(logging.INFO, logger="uvicorn.error"):
+        report.log("ready to serve")
+    assert "Startup report (ready to serve): " in caplog.text
+    assert "imports " in caplog.text and " ms total" in caplog.text
+
+
+def test_lifespan_logs_report_and_serves(monkeypatch, caplog):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    monkeypatch.setattr(main, "STARTUP_REPORT_ENABLED", True)
+    monkeypatch.setattr(main, "WARM_UP_DELAY_SECONDS", -1)
+    with caplog.at_level(logging.INFO, logger="uvicorn.error"):
+        with TestClient(app) as client:
+            assert client.get("/health").json() == {"status": "ok"}
+            assert main._TIRE_RELEASE is None
+    assert "Startup report (ready to serve): " in caplog.text
+    for phase in ("framework imports", "app imports", "app and routes", "lifespan"):
+        assert f"{phase} " in caplog.text
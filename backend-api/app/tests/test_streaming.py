@@ -0,0 +1,104 @@
+import json
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import reload_internal_keys
+import app.main as main
+from app.main import app
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+NDJSON_HEADERS = {**HEADERS, "Accept": "application/x-ndjson"}
+TIMESTAMP = re.compile(r'"timestamp":"[^"]+"')
+SWEEP_PAYLOAD = {
+    "unit_system": "imperial",
+    "inputs": {
+        "bore": {"start": 3.0, "stop": 3.2, "step": 0.05},
+        "stroke": {"start": 3.0, "stop": 3.1, "step": 0.05},
+        "cylinders": 4,
+        "chamber_volume": {"start": 3.0, "stop": 3.4, "step": 0.2},
+        "deck_height": {"start": 0.0, "stop": 0.01, "step": 0.01},
+    },
+}
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+def _lines(response):
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(TIMESTAMP.sub('"timestamp":""', line)) for line in response.iter_lines()]
+
+
+def test_batch_stream_matches_json_items(client):
+    payload = {
+        "unit_system": "metric",
+        "inputs": [
+            {"vehicle_type": "Car", "rim_in": 16, "width_mm": 205, "aspect_percent": 55},
+            {"vehicle_type": "Car", "rim_in": 16, "width_mm": 999, "aspect_percent": 55},
+            {"vehicle_type": "Car"},
+            {"vehicle_type": "LightTruck", "rim_in": 15, "flotation": "31x10.5R15"},
+        ],
+    }
+    streamed = client.post("/v1/calc/tires/batch", json=payload, headers=NDJSON_HEADERS)
+    regular = client.post("/v1/calc/tires/batch", json=payload, headers=HEADERS)
+
+    assert streamed.status_code == 200
+    lines = _lines(streamed)
+    items = json.loads(TIMESTAMP.sub('"timestamp":""', regular.text))["items"]
+    assert lines == items
+    assert lines[1]["error_code"] == "validation_error"
+    assert lines[2]["field_errors"][0]["field"].startswith("inputs.")
+
+
+@pytest.mark.parametrize(
+    "route,item",
+    [
+        ("/v1/calc/displacement/batch", {"bore": 58, "stroke": 50, "cylinders": 4}),
+        ("/v1/calc/rl/batch", {"bore": 57, "stroke": 54.5, "rod_length": 110}),
+        ("/v1/calc/sprocket/batch", {"sprocket_teeth": 14, "crown_teeth": 42}),
+    ],
+)
+def test_every_batch_route_streams(client, route, item):
+    payload = {"unit_system": "metric", "inputs": [item, item, {}]}
+    lines = _lines(client.post(route, json=payload, headers=NDJSON_HEADERS))
+    assert len(lines) == 3
+    assert lines[0] == lines[1]
+    assert lines[2]["error_code"] == "validation_error"
+
+
+def test_batch_stream_rejects_oversized_batch_up_front(client, monkeypatch):
+    monkeypatch.setattr(main, "BATCH_MAX_ITEMS", 2)
+    payload = {"unit_system": "metric", "inputs": [{}, {}, {}]}
+    response = client.post("/v1/calc/rl/batch", json=payload, headers=NDJSON_HEADERS)
+    assert response.status_code == 400
+    assert response.json()["field_errors"][0]["field"] == "inputs"
+
+
+def test_sweep_stream_matches_records_layout(client, monkeypatch):
+    monkeypatch.setattr(main, "SWEEP_STREAM_CHUNK_POINTS", 4)
+    streamed = client.post(
+        "/v1/calc/displacement/sweep", json=SWEEP_PAYLOAD, headers=NDJSON_HEADERS
+    )
+    records = client.post(
+        "/v1/calc/displacement/sweep", json={**SWEEP_PAYLOAD, "layout": "records"}, headers=HEADERS
+    ).json()
+
+    assert streamed.status_code == 200
+    assert _lines(streamed) == records["points"]
+    assert records["points_count"] == 5 * 3 * 3 * 2
+
+
+def test_sweep_stream_reports_request_errors_as_json(client, monkeypatch):
+    monkeypatch.setattr(main, "SWEEP_MAX_POINTS", 10)
+    response = client.post(
+        "/v1/calc/displacement/sweep", json=SWEEP_PAYLOAD, headers=NDJSON_HEADERS
+    )
+    assert response.status_code == 400
+    assert response.headers["content-type"] == "application/json"
+    assert "points" in response.json()["field_errors"][0]["reason"]
@@ -0,0 +1,148 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import reload_internal_keys
+import app.main as main
+from app.main import app
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+
+
+def _single(client, bore, stroke, deck, gasket, chamber):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "bore": bore,
+            "stroke": stroke,
+            "cylinders": 2,
+            "compression": {
+                "chamber_volume": chamber,
+                "gasket_thickness": gasket,
+                "gasket_bore": bore,
+                "deck_height": deck,
+                "piston_volume": 0,
+            },
+        },
+    }
+    return client.post("/v1/calc/displacement", json=payload, headers=HEADERS).json()["results"]
+
+
+def test_sweep_columnar_matches_single_route(client):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "bore": {"start": 56, "stop": 58, "step": 1},
+            "stroke": {"start": 50, "stop": 52, "step": 2},
+            "cylinders": 2,
+            "deck_height": {"start": 0.1, "stop": 0.3, "step": 0.1},
+            "gasket_thickness": {"start": 0.8},
+            "chamber_volume": {"start": 10, "stop": 12, "step": 1},
+        },
+    }
+    response = client.post("/v1/calc/displacement/sweep", json=payload, headers=HEADERS)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["shape"] == [3, 2, 3, 1, 3]
+    assert data["points_count"] == 54
+    assert data["axes"]["deck_height_mm"] == [0.1, 0.2, 0.3]
+    assert data["points"] is None
+    columns = data["columns"]
+    assert len(columns["displacement_cc"]) == 54
+
+    # Last point in C order is the last value of every axis.
+    single = _single(client, 58, 52, 0.3, 0.8, 12)
+    assert columns["displacement_cc"][-1] == single["displacement_cc"]
+    assert columns["compression_ratio"][-1] == single["compression"]["compression_ratio"]
+
+    # Index (1, 0, 2, 0, 1) -> bore 57, stroke 50, deck 0.3, gasket 0.8, chamber 11.
+    index = (((1 * 2 + 0) * 3 + 2) * 1 + 0) * 3 + 1
+    single = _single(client, 57, 50, 0.3, 0.8, 11)
+    assert columns["displacement_cc"][index] == single["displacement_cc"]
+    assert columns["compression_ratio"][index] == single["compression"]["compression_ratio"]
+
+
+def test_sweep_records_layout(client):
+    payload = {
+        "unit_system": "metric",
+        "layout": "records",
+        "inputs": {
+            "bore": {"start": 100},
+            "stroke": {"start": 100},
+            "cylinders": 1,
+            "gasket_thickness": {"start": 1},
+            "chamber_volume": {"start": 50, "stop": 60, "step": 10},
+        },
+    }
+    response = client.post("/v1/calc/displacement/sweep", json=payload, headers=HEADERS)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["columns"] is None
+    assert [point["chamber_volume_cc"] for point in data["points"]] == [50.0, 60.0]
+    assert data["points"][0]["compression_ratio"] == 14.58
+    assert data["points"][0]["displacement_cc"] == 785.4
+
+
+def test_sweep_grid_limit(client, monkeypatch):
+    monkeypatch.setattr(main, "SWEEP_MAX_POINTS", 10)
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "bore": {"start": 50, "stop": 60, "step": 1},
+            "stroke": {"start": 50},
+            "cylinders": 1,
+            "chamber_volume": {"start": 10},
+        },
+    }
+    response = client.post("/v1/calc/displacement/sweep", json=payload, headers=HEADERS)
+    assert response.status_code == 400
+    assert response.json()["field_errors"][0]["field"] == "inputs"
+
+
+def test_sweep_invalid_range(client):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "bore": {"start": 60, "stop": 50, "step": 1},
+            "stroke": {"start": 50},
+            "cylinders": 1,
+            "chamber_volume": {"start": 10},
+        },
+    }
+    response = client.post("/v1/calc/displacement/sweep", json=payload, headers=HEADERS)
+    assert response.status_code == 400
+    assert response.json()["field_errors"][0]["field"] == "inputs.bore"
+
+
+@pytest.mark.parametrize(
+    "bore",
+    [
+        {"start": 50, "stop": 60, "step": 1e-320},
+        {"start": 50, "stop": 1e308, "step": 1e-300},
+    ],
+)
+def test_sweep_range_too_long_for_float(client, bore):
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "bore": bore,
+            "stroke": {"start": 50},
+            "cylinders": 1,
+            "chamber_volume": {"start": 10},
+        },
+    }
+    for accept in ("application/json", "application/x-ndjson"):
+        response = client.post(
+            "/v1/calc/displacement/sweep",
+            json=payload,
+            headers={**HEADERS, "Accept": accept},
+        )
+        assert response.status_code == 400
+        assert response.json()["field_errors"][0]["field"] == "inputs.bore"
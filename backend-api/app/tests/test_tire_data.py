@@ -0,0 +1,132 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.precompressed import PrecompressedBody, content_version, preferred_encoding
+from app.core.security import reload_internal_keys
+from app.data import tires_payloads
+from app.data.tires_db import TIRES_DB
+from app.main import app
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+def test_full_catalog_and_slices_match_database(client):
+    response = client.get("/v1/data/tires", headers={**HEADERS, "Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    data = response.json()
+    assert data["data"] == TIRES_DB
+    assert data["version"] == content_version(TIRES_DB)
+    assert response.headers["etag"] == f'"{data["version"]}"'
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    for vehicle_type, vehicle_db in TIRES_DB.items():
+        sliced = client.get(f"/v1/data/tires/{vehicle_type}", headers=HEADERS).json()
+        assert sliced["vehicle_type"] == vehicle_type
+        assert sliced["data"] == vehicle_db
+        assert sliced["version"] == content_version(vehicle_db)
+
+
+def test_gzip_body_is_precompressed(client):
+    response = client.get(
+        "/v1/data/tires/Car", headers={**HEADERS, "Accept-Encoding": "gzip, deflate"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f'"{content_version(TIRES_DB["Car"])}-gzip"'
+    # httpx decodes transparently; the wire size is what the header reports.
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json()["data"] == TIRES_DB["Car"]
+
+
+def test_each_encoding_has_its_own_etag(client):
+    gzipped = client.get("/v1/data/tires/Car", headers={**HEADERS, "Accept-Encoding": "gzip"})
+    plain = client.get("/v1/data/tires/Car", headers={**HEADERS, "Accept-Encoding": "identity"})
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+
+    # Either validator revalidates; the 304 carries the one of the negotiated encoding.
+    revalidated = client.get(
+        "/v1/data/tires/Car",
+        headers={
+            **HEADERS,
+            "Accept-Encoding": "identity",
+            "If-None-Match": gzipped.headers["etag"],
+        },
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == plain.headers["etag"]
+
+
+def test_if_none_match_and_pinned_version(client):
+    first = client.get("/v1/data/tires/Kart", headers=HEADERS)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    revalidated = client.get("/v1/data/tires/Kart", headers={**HEADERS, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+    version = first.json()["version"]
+    pinned = client.get(f"/v1/data/tires/Kart?version={version}", headers=HEADERS)
+    assert "immutable" in pinned.headers["cache-control"]
+    stale = client.get("/v1/data/tires/Kart?version=0000", headers=HEADERS)
+    assert stale.headers["cache-control"] == "no-cache"
+
+
+def test_calc_requests_leave_the_bodies_to_the_data_routes(client, monkeypatch):
+    # With ETag on, the calc request needs the release (catalog and calculator version).
+    monkeypatch.setattr(main, "ETAG_ENABLED", True)
+    monkeypatch.setattr(main, "_TIRE_RELEASE", None)
+    monkeypatch.setattr(tires_payloads, "_PAYLOADS", None)
+    payload = {
+        "unit_system": "metric",
+        "inputs": {"vehicle_type": "Car", "rim_in": 16, "width_mm": 205, "aspect_percent": 55},
+    }
+    assert client.post("/v1/calc/tires", json=payload, headers=HEADERS).status_code == 200
+    assert main._TIRE_RELEASE is not None
+    assert tires_payloads._PAYLOADS is None
+
+    assert client.get("/v1/data/tires/Car", headers=HEADERS).status_code == 200
+    built = tires_payloads.current_tire_payloads()
+    assert built is not None
+    assert client.get("/v1/data/tires", headers=HEADERS).status_code == 200
+    assert tires_payloads.current_tire_payloads() is built
+
+
+def test_unknown_vehicle_and_auth(client):
+    response = client.get("/v1/data/tires/Boat", headers=HEADERS)
+    assert response.status_code == 404
+    assert response.json()["error_code"] == "not_found"
+    assert client.get("/v1/data/tires").status_code == 401
+
+
+def test_preferred_encoding():
+    assert preferred_encoding(None, True) is None
+    assert preferred_encoding("gzip, br", True) == "br"
+    assert preferred_encoding("gzip, br", False) == "gzip"
+    assert preferred_encoding("br;q=0.5, gzip", True) == "gzip"
+    assert preferred_encoding("gzip;q=0, identity", True) is None
+    assert preferred_encoding("*", False) == "gzip"
+    assert preferred_encoding("*, gzip;q=0", False) is None
+
+
+def test_precompressed_body_is_deterministic():
+    first = PrecompressedBody.from_data({"a": [1, 2]}, kind="test")
+    second = PrecompressedBody.from_data({"a": [1, 2]}, kind="test")
+    assert first.gzip == second.gzip
+    assert first.etags[None] == f'"{first.version}"'
+    assert first.etags["gzip"] == f'"{first.version}-gzip"'
+    assert gzip.decompress(first.gzip) == first.identity
+    document = json.loads(first.identity)
+    assert document == {"version": first.version, "kind": "test", "data": {"a": [1, 2]}}
@@ -7,6 +7,7 @@ from app.calculators.tires import (
     parse_motorcycle_flotation,
     calculate_diameter_mm,
 )
+from app.core.security import reload_internal_keys
 from app.main import app
 from app.schemas.tires import TiresInputs, TiresResults
 
@@ -50,6 +51,7 @@ def test_tires_results_shape():
 @pytest.fixture()
 def client(monkeypatch):
     monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
     return TestClient(app)
 
 
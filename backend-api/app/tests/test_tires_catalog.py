@@ -0,0 +1,136 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.calculators.tires import flotation_dimensions_mm
+from app.core.security import reload_internal_keys
+from app.data import tires_db
+from app.data.tires_catalog import (
+    MappedTireCatalog,
+    compile_catalog,
+    configure_tire_catalog,
+    load_dataset,
+)
+from app.data.tires_db import TIRE_INDEX, TIRES_DB, get_tire_catalog
+from app.main import app
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+
+
+@pytest.fixture()
+def mapped(tmp_path):
+    path = tmp_path / "tires.bin"
+    compile_catalog(TIRES_DB, str(path))
+    return MappedTireCatalog(str(path))
+
+
+def test_mapped_catalog_answers_like_the_literal(mapped):
+    builtin = get_tire_catalog()
+    assert mapped.version == builtin.version
+    assert mapped.to_db() == TIRES_DB
+    for (vehicle_type, rim_in), widths in TIRE_INDEX.widths.items():
+        assert mapped.has_vehicle(vehicle_type)
+        assert mapped.has_rim(vehicle_type, rim_in)
+        assert mapped.flotations_for(vehicle_type, rim_in) == builtin.flotations_for(
+            vehicle_type, rim_in
+        )
+        for width_mm in widths:
+            assert mapped.has_width(vehicle_type, rim_in, width_mm)
+            assert mapped.aspects_for(vehicle_type, rim_in, width_mm) == builtin.aspects_for(
+                vehicle_type, rim_in, width_mm
+            )
+        for flotation in builtin.flotations_for(vehicle_type, rim_in):
+            assert mapped.flotation_locations(
+                vehicle_type, flotation
+            ) == builtin.flotation_locations(vehicle_type, flotation)
+            assert mapped.flotation_dimensions(
+                vehicle_type, flotation
+            ) == builtin.flotation_dimensions(vehicle_type, flotation)
+    for diameter_mm in range(300, 1400, 7):
+        for tolerance_percent in (0.5, 2.0, 5.0):
+            assert mapped.sizes_within(diameter_mm, tolerance_percent) == builtin.sizes_within(
+                diameter_mm, tolerance_percent
+            )
+
+
+def test_mapped_catalog_misses(mapped):
+    assert not mapped.has_vehicle("Bicycle")
+    assert not mapped.has_rim("Car", 28)
+    assert not mapped.has_width("Car", 16, 200)
+    assert mapped.aspects_for("Bicycle", 16, 205) == frozenset()
+    assert mapped.flotations_for("Car", 28) == frozenset()
+    assert mapped.flotation_locations("Kart", "99x9.00-9") == ()
+    assert mapped.flotation_dimensions("LightTruck", "33x12.5R15") == flotation_dimensions_mm(
+        "LightTruck", "33x12.5R15"
+    )
+    assert mapped.flotation_dimensions("LightTruck", "not-a-size") is None
+    assert mapped.sizes_within(50.0, 1.0) == ()
+
+
+def test_csv_dataset_compiles(tmp_path):
+    dataset = tmp_path / "tires.csv"
+    dataset.write_text(
+        "vehicle_type,rim_in,width_mm,aspect_percent,flotation\n"
+        "LightTruck,15,235,75,\n"
+        "LightTruck,15,235,70,\n"
+        "LightTruck,15,265,,31x10.5R15\n"
+        "TruckCommercial,22.5,295,80,\n"
+    )
+    db = load_dataset(str(dataset))
+    assert db == {
+        "LightTruck": {
+            "rims": [15],
+            "15": {
+                "widths": ["235", "265"],
+                "235": {"aspects": [70, 75]},
+                "265": {"aspects": [], "flotation": ["31x10.5R15"]},
+            },
+        },
+        "TruckCommercial": {
+            "rims": [22.5],
+            "22.5": {"widths": ["295"], "295": {"aspects": [80]}},
+        },
+    }
+    path = tmp_path / "tires.bin"
+    header = compile_catalog(db, str(path))
+    catalog = MappedTireCatalog(str(path))
+    assert header["sizes"] == 4
+    assert catalog.to_db() == db
+    assert catalog.has_rim("TruckCommercial", 22.5)
+    assert catalog.flotation_locations("LightTruck", "31x10.5R15") == ((15.0, 265.0),)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "tires.bin"
+    path.write_bytes(b"not a catalog")
+    with pytest.raises(ValueError):
+        MappedTireCatalog(str(path))
+
+
+def test_api_serves_from_mapped_catalog(monkeypatch, mapped):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    client = TestClient(app)
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "vehicle_type": "LightTruck",
+            "rim_in": 15,
+            "width_mm": 235,
+            "aspect_percent": 75,
+            "flotation": "31x10.5R15",
+        },
+    }
+    expected = client.post("/v1/calc/tires", json=payload, headers=HEADERS)
+    assert expected.status_code == 200
+    monkeypatch.setattr(tires_db, "_CATALOG", mapped)
+    response = client.post("/v1/calc/tires", json=payload, headers=HEADERS)
+    assert response.status_code == 200
+    assert response.json()["results"] == expected.json()["results"]
+
+
+def test_configure_defaults_to_builtin(monkeypatch):
+    monkeypatch.setattr(tires_db, "_CATALOG", tires_db._CATALOG)
+    catalog = configure_tire_catalog("")
+    assert catalog.source == "builtin"
+    assert catalog.index is TIRE_INDEX
+    assert get_tire_catalog() is catalog
@@ -0,0 +1,85 @@
+from app.calculators.tires import flotation_dimensions_mm, parse_flotation
+from app.data.tires_db import (
+    TIRE_INDEX,
+    TIRES_DB,
+    aspects_for,
+    flotation_dimensions,
+    flotation_locations,
+    flotations_for,
+    has_rim,
+    has_vehicle,
+    has_width,
+    sizes_within,
+)
+
+
+def test_index_covers_every_entry():
+    for vehicle_type, vehicle_db in TIRES_DB.items():
+        assert has_vehicle(vehicle_type)
+        for rim in vehicle_db["rims"]:
+            assert has_rim(vehicle_type, rim)
+            rim_db = vehicle_db[str(rim)]
+            for width in rim_db["widths"]:
+                assert has_width(vehicle_type, rim, float(width))
+                assert aspects_for(vehicle_type, rim, float(width)) == frozenset(
+                    rim_db[width]["aspects"]
+                )
+                for flotation in rim_db[width].get("flotation", []):
+                    assert flotation in flotations_for(vehicle_type, rim)
+                    assert (rim, float(width)) in flotation_locations(vehicle_type, flotation)
+
+
+def test_index_lookups_normalize_keys():
+    assert has_rim("TruckCommercial", 22.5)
+    assert has_rim("Car", 16.0)
+    assert not has_rim("Car", 28)
+    assert not has_vehicle("Bicycle")
+    assert 55 in aspects_for("Car", 16, 205.0)
+    assert 55.0 in aspects_for("Car", 16, 205)
+    assert aspects_for("Car", 16, 999) == frozenset()
+    assert flotations_for("Kart", 5) == frozenset(
+        {"10x3.50-5", "10x4.50-5", "11x6.00-5", "11x7.10-5"}
+    )
+    assert not has_width("Car", 16, 200)
+    assert flotation_locations("Kart", "10x4.50-5") == ((5.0, 100.0), (5.0, 110.0))
+    assert flotation_locations("LightTruck", "35x12.5R17") == ((17.0, 285.0), (17.0, 305.0))
+
+
+def test_index_is_read_only():
+    try:
+        TIRE_INDEX.aspects[("Car", 16.0, 205.0)] = frozenset()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("index should be immutable")
+
+
+def test_sizes_are_sorted_and_searchable():
+    diameters = [size.diameter_mm for size in TIRE_INDEX.sizes]
+    assert diameters == sorted(diameters)
+    assert list(TIRE_INDEX.diameters) == diameters
+
+    found = sizes_within(650.0, 2.0)
+    assert found
+    assert all(637.0 <= size.diameter_mm <= 663.0 for size in found)
+    expected = [size for size in TIRE_INDEX.sizes if abs(size.diameter_mm - 650.0) <= 13.0]
+    assert list(found) == expected
+    assert any(size.flotation == "31x10.5R15" for size in sizes_within(787.4, 0.1))
+
+
+def test_flotation_dimensions_are_precomputed():
+    for vehicle_type, flotation in [("LightTruck", "31x10.5R15"), ("Motorcycle", "4.10-18")]:
+        assert (vehicle_type, flotation) in TIRE_INDEX.flotation_dimensions
+        assert flotation_dimensions(vehicle_type, flotation) == flotation_dimensions_mm(
+            vehicle_type, flotation
+        )
+
+    misses = parse_flotation.cache_info().misses
+    flotation_dimensions("LightTruck", "31x10.5R15")
+    assert parse_flotation.cache_info().misses == misses
+
+    assert flotation_dimensions("LightTruck", "40x15.5R24") == flotation_dimensions_mm(
+        "LightTruck", "40x15.5R24"
+    )
+    assert flotation_dimensions("LightTruck", "not-a-size") is None
+    assert parse_flotation.cache_info().maxsize is not None
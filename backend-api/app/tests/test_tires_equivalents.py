@@ -0,0 +1,103 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.calculators.tires import calculate_diameter_mm
+from app.core.security import reload_internal_keys
+from app.data.tires_db import TIRE_INDEX
+from app.main import app
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    return TestClient(app)
+
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+URL = "/v1/calc/tires/equivalents"
+
+
+def test_equivalents_match_brute_force(client):
+    reference_mm = calculate_diameter_mm(16, 205, 55)
+    payload = {
+        "unit_system": "metric",
+        "inputs": {
+            "reference": {
+                "vehicle_type": "Car",
+                "rim_in": 16,
+                "width_mm": 205,
+                "aspect_percent": 55,
+            },
+            "tolerance_percent": 3,
+            "limit": 200,
+        },
+    }
+    response = client.post(URL, json=payload, headers=HEADERS)
+    assert response.status_code == 200
+    data = response.json()
+
+    expected = [
+        size
+        for size in TIRE_INDEX.sizes
+        if size.vehicle_type == "Car"
+        and abs(size.diameter_mm - reference_mm) <= reference_mm * 0.03
+    ]
+    assert data["reference_diameter"] == round(reference_mm, 2)
+    assert data["total"] == len(expected)
+    deltas = [abs(item["diff_diameter"]) for item in data["results"]]
+    assert deltas == sorted(deltas)
+    assert data["results"][0]["diff_diameter"] == 0
+    assert {(r["rim_in"], r["width_mm"], r["aspect_percent"]) for r in data["results"]} == {
+        (size.rim_in, size.width_mm, size.aspect_percent) for size in expected
+    }
+
+
+def test_equivalents_pagination_and_filters(client):
+    base = {"diameter": 650, "tolerance_percent": 5, "vehicle_types": ["Car"], "rims_in": [17, 18]}
+    first = client.post(
+        URL, json={"unit_system": "metric", "inputs": {**base, "limit": 3}}, headers=HEADERS
+    ).json()
+    second = client.post(
+        URL,
+        json={"unit_system": "metric", "inputs": {**base, "offset": 3, "limit": 3}},
+        headers=HEADERS,
+    ).json()
+    assert first["total"] == second["total"] > 3
+    assert len(first["results"]) == 3
+    assert first["results"][-1] != second["results"][0]
+    for item in first["results"] + second["results"]:
+        assert item["vehicle_type"] == "Car"
+        assert item["rim_in"] in (17, 18)
+
+
+def test_equivalents_imperial_diameter_includes_flotation(client):
+    payload = {
+        "unit_system": "imperial",
+        "inputs": {"diameter": 31, "tolerance_percent": 1, "vehicle_types": ["LightTruck"]},
+    }
+    data = client.post(URL, json=payload, headers=HEADERS).json()
+    assert data["unit_system"] == "imperial"
+    assert data["reference_diameter"] == 31
+    assert any(item["flotation"] == "31x10.5R15" for item in data["results"])
+
+
+def test_equivalents_validation(client):
+    response = client.post(URL, json={"unit_system": "metric", "inputs": {}}, headers=HEADERS)
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "validation_error"
+
+    bad_reference = {
+        "unit_system": "metric",
+        "inputs": {
+            "reference": {
+                "vehicle_type": "Car",
+                "rim_in": 16,
+                "width_mm": 999,
+                "aspect_percent": 55,
+            }
+        },
+    }
+    response = client.post(URL, json=bad_reference, headers=HEADERS)
+    assert response.status_code == 400
+    assert response.json()["field_errors"][0]["field"] == "inputs.reference.width_mm"
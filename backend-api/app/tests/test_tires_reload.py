@@ -0,0 +1,195 @@
+import asyncio
+import copy
+import json
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.cache import MemoryCacheBackend, ResultCache, cache_key, set_result_cache
+from app.core.etag import make_etag
+from app.core.security import reload_internal_keys
+from app.data import tires_db, tires_payloads
+from app.data.tires_catalog import compile_catalog, open_tire_catalog
+from app.data.tires_db import TIRES_DB, get_tire_catalog
+from app.main import app
+from app.schemas.tires import TiresEquivalentsRequest
+
+HEADERS = {"X-PTP-Internal-Key": "test-key", "Authorization": "Bearer test-key"}
+PAYLOAD = {
+    "unit_system": "metric",
+    "inputs": {"vehicle_type": "Car", "rim_in": 16, "width_mm": 205, "aspect_percent": 65},
+}
+
+
+def _extended_db() -> dict:
+    db = copy.deepcopy(TIRES_DB)
+    db["Car"]["16"]["205"]["aspects"].append(65)
+    return db
+
+
+def _write_json(path, db) -> None:
+    partial_path = f"{path}.partial"
+    with open(partial_path, "w", encoding="utf-8") as handle:
+        json.dump(db, handle)
+    os.replace(partial_path, path)
+
+
+@pytest.fixture()
+def catalog_path(tmp_path, monkeypatch):
+    # Reloads replace module-level state; monkeypatch puts the originals back afterwards.
+    monkeypatch.setattr(tires_db, "_CATALOG", tires_db._CATALOG)
+    monkeypatch.setattr(tires_payloads, "_PAYLOADS", tires_payloads._PAYLOADS)
+    monkeypatch.setattr(main, "_TIRE_RELEASE", main._tire_release())
+    path = tmp_path / "tires.json"
+    _write_json(path, TIRES_DB)
+    monkeypatch.setattr(main, "TIRES_CATALOG_PATH", str(path))
+    return path
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setenv("PTP_INTERNAL_KEY", "test-key")
+    reload_internal_keys()
+    monkeypatch.setattr(main, "ETAG_ENABLED", True)
+    return TestClient(app)
+
+
+def test_admin_reload_publishes_new_catalog(client, catalog_path):
+    assert client.post("/v1/calc/tires", json=PAYLOAD, headers=HEADERS).status_code == 400
+    old_version = main._tire_release().calculator_version
+    old_data = client.get("/v1/data/tires", headers=HEADERS).json()["version"]
+
+    response = client.post("/v1/admin/tires/reload", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.json()["changed"] is False
+
+    _write_json(catalog_path, _extended_db())
+    response = client.post("/v1/admin/tires/reload", headers=HEADERS)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["changed"] is True
+    assert body["source"] == str(catalog_path)
+    assert body["version"] == get_tire_catalog().version
+    assert main._tire_release().calculator_version != old_version
+
+    assert client.post("/v1/calc/tires", json=PAYLOAD, headers=HEADERS).status_code == 200
+    data = client.get("/v1/data/tires", headers=HEADERS).json()
+    assert data["version"] != old_data
+    assert data["data"]["Car"]["16"]["205"]["aspects"] == [50, 55, 60, 65]
+
+
+def test_admin_reload_requires_auth(client, catalog_path):
+    assert client.post("/v1/admin/tires/reload").status_code == 401
+
+
+def test_failed_reload_keeps_current_catalog(client, catalog_path):
+    current = get_tire_catalog()
+    catalog_path.write_text("{not json")
+    response = client.post("/v1/admin/tires/reload", headers=HEADERS)
+    assert response.status_code == 500
+    assert response.json()["error_code"] == "server_error"
+    assert get_tire_catalog() is current
+
+
+def test_reload_changes_cache_keys_and_etags(client, catalog_path):
+    cache = ResultCache(MemoryCacheBackend(16, 1024 * 1024), ttl_seconds=60)
+    set_result_cache(cache)
+    try:
+        payload = {**PAYLOAD, "inputs": {**PAYLOAD["inputs"], "aspect_percent": 55}}
+        first = client.post("/v1/calc/tires", json=payload, headers=HEADERS)
+        client.post("/v1/calc/tires", json=payload, headers=HEADERS)
+        assert cache.hits == 1
+
+        _write_json(catalog_path, _extended_db())
+        client.post("/v1/admin/tires/reload", headers=HEADERS)
+        headers = {**HEADERS, "If-None-Match": first.headers["etag"]}
+        again = client.post("/v1/calc/tires", json=payload, headers=headers)
+        assert again.status_code == 200
+        assert again.headers["etag"] != first.headers["etag"]
+        assert cache.hits == 1
+    finally:
+        set_result_cache(None)
+
+
+def test_watcher_reloads_replaced_file(catalog_path, tmp_path):
+    compiled = tmp_path / "tires.bin"
+    compile_catalog(TIRES_DB, str(compiled))
+    main.TIRES_CATALOG_PATH = str(compiled)
+    tires_db.set_tire_catalog(open_tire_catalog(str(compiled)))
+
+    async def scenario():
+        watcher = asyncio.create_task(main.watch_tire_catalog(str(compiled), 0.01))
+        await asyncio.sleep(0.05)
+        compile_catalog(_extended_db(), str(compiled))
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if 65 in get_tire_catalog().aspects_for("Car", 16, 205):
+                break
+        watcher.cancel()
+
+    old = get_tire_catalog()
+    asyncio.run(scenario())
+    assert get_tire_catalog() is not old
+    assert 65 in get_tire_catalog().aspects_for("Car", 16, 205)
+    # The replaced file stays readable through the old mapping.
+    assert 65 not in old.aspects_for("Car", 16, 205)
+
+
+def test_requests_see_one_whole_catalog_during_swaps(catalog_path, client):
+    # 205/65R16 (672.9 mm) exists only in the extended release: checking it fails in the old
+    # one, and a search around its diameter finds one size more in the new one.
+    set_result_cache(ResultCache(MemoryCacheBackend(1000, 1024 * 1024), 60))
+    releases = [
+        main._prepare_tire_release(tires_db.IndexedTireCatalog(db))
+        for db in (TIRES_DB, _extended_db())
+    ]
+    search = {"unit_system": "metric", "inputs": {"diameter": 672.9, "tolerance_percent": 1}}
+    expected = []
+    for release in releases:
+        key = cache_key(
+            "tires/equivalents",
+            TiresEquivalentsRequest.model_validate(search),
+            release.calculator_version,
+        )
+        total = len(release.catalog.sizes_within(672.9, 1))
+        expected.append((make_etag(key), total))
+    assert expected[0][1] + 1 == expected[1][1]
+    stop = threading.Event()
+    seen = []
+
+    def requests():
+        while not stop.is_set():
+            response = client.post("/v1/calc/tires/equivalents", json=search, headers=HEADERS)
+            seen.append(("search", response.headers.get("etag"), response.json().get("total")))
+            response = client.post("/v1/calc/tires", json=PAYLOAD, headers=HEADERS)
+            seen.append(("check", response.headers.get("etag"), response.status_code))
+
+    workers = [threading.Thread(target=requests) for _ in range(4)]
+    try:
+        for worker in workers:
+            worker.start()
+        index = 0
+        while len(seen) < 400:
+            main._publish_tire_release(releases[index % 2])
+            index += 1
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+        set_result_cache(None)
+
+    searches = [(etag, total) for kind, etag, total in seen if kind == "search"]
+    checks = [(etag, status_code) for kind, etag, status_code in seen if kind == "check"]
+    # Cached or computed, every response pairs its release's version with its release's data.
+    assert set(searches) == set(expected)
+    assert {status_code for _, status_code in checks} <= {200, 400}
+    new_check = make_etag(
+        cache_key(
+            "tires", main.TiresRequest.model_validate(PAYLOAD), releases[1].calculator_version
+        )
+    )
+    assert all(etag == new_check for etag, status_code in checks if status_code == 200)
+    assert all(etag is None for etag, status_code in checks if status_code == 400)
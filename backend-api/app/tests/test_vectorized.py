@@ -0,0 +1,108 @@
+import random
+
+import numpy as np
+
+from app.calculators import vectorized
+from app.calculators.compression import (
+    clearance_volume_cc,
+    compression_ratio,
+    deck_volume_cc,
+    gasket_volume_cc,
+    swept_volume_cc,
+    trapped_swept_volume_cc,
+)
+from app.calculators.displacement import calculate_displacement_cc, classify_geometry
+from app.calculators.rl import calculate_rl_ratio, calculate_rod_stroke_ratio, classify_smoothness
+
+
+def _samples(count: int = 2000) -> dict:
+    rng = random.Random(1234)
+    bore = [round(rng.uniform(30.0, 120.0), 2) for _ in range(count)]
+    # Every third stroke sits near its bore so the square tolerance boundary is covered.
+    stroke = [
+        round(b * rng.uniform(0.95, 1.05), 2) if i % 3 == 0 else round(rng.uniform(30.0, 120.0), 2)
+        for i, b in enumerate(bore)
+    ]
+    return {
+        "bore": bore,
+        "stroke": stroke,
+        "cylinders": [rng.randint(1, 12) for _ in range(count)],
+        "rod_length": [round(rng.uniform(60.0, 220.0), 2) for _ in range(count)],
+        "chamber": [round(rng.uniform(5.0, 80.0), 2) for _ in range(count)],
+        "gasket_thickness": [round(rng.uniform(0.3, 2.0), 2) for _ in range(count)],
+        "deck_height": [round(rng.uniform(0.0, 1.5), 2) for _ in range(count)],
+        "piston_volume": [round(rng.uniform(-5.0, 5.0), 2) for _ in range(count)],
+        "port_height": [round(rng.uniform(1.0, 25.0), 2) for _ in range(count)],
+    }
+
+
+def _assert_rounded_parity(vector_values: np.ndarray, scalar_values: list[float]) -> None:
+    assert len(vector_values) == len(scalar_values)
+    for vector_value, scalar_value in zip(vector_values.tolist(), scalar_values):
+        assert round(vector_value, 2) == round(scalar_value, 2)
+
+
+def test_displacement_parity():
+    data = _samples()
+    vector_cc = vectorized.calculate_displacement_cc(
+        data["bore"], data["stroke"], data["cylinders"]
+    )
+    scalar_cc = [
+        calculate_displacement_cc(b, s, c)
+        for b, s, c in zip(data["bore"], data["stroke"], data["cylinders"])
+    ]
+    _assert_rounded_parity(vector_cc, scalar_cc)
+
+    vector_geometry = vectorized.classify_geometry(data["bore"], data["stroke"])
+    scalar_geometry = [classify_geometry(b, s) for b, s in zip(data["bore"], data["stroke"])]
+    assert vector_geometry.tolist() == scalar_geometry
+
+
+def test_compression_parity():
+    data = _samples()
+    bore = np.asarray(data["bore"])
+    stroke = np.asarray(data["stroke"])
+    swept = vectorized.swept_volume_cc(bore, stroke)
+    gasket = vectorized.gasket_volume_cc(bore, data["gasket_thickness"])
+    deck = vectorized.deck_volume_cc(bore, data["deck_height"])
+    clearance = vectorized.clearance_volume_cc(data["chamber"], gasket, deck, data["piston_volume"])
+    ratio = vectorized.compression_ratio(swept, clearance)
+    trapped = vectorized.trapped_swept_volume_cc(bore, stroke + 30.0, data["port_height"])
+
+    scalar_ratio = []
+    scalar_clearance = []
+    scalar_trapped = []
+    for i, (b, s) in enumerate(zip(data["bore"], data["stroke"])):
+        clearance_cc = clearance_volume_cc(
+            data["chamber"][i],
+            gasket_volume_cc(b, data["gasket_thickness"][i]),
+            deck_volume_cc(b, data["deck_height"][i]),
+            data["piston_volume"][i],
+        )
+        scalar_clearance.append(clearance_cc)
+        scalar_ratio.append(compression_ratio(swept_volume_cc(b, s), clearance_cc))
+        scalar_trapped.append(trapped_swept_volume_cc(b, s + 30.0, data["port_height"][i]))
+
+    _assert_rounded_parity(clearance, scalar_clearance)
+    _assert_rounded_parity(ratio, scalar_ratio)
+    _assert_rounded_parity(trapped, scalar_trapped)
+
+
+def test_rod_ratio_parity():
+    data = _samples()
+    rl_ratio = vectorized.calculate_rl_ratio(data["stroke"], data["rod_length"])
+    rod_stroke = vectorized.calculate_rod_stroke_ratio(data["stroke"], data["rod_length"])
+    scalar_rl = [calculate_rl_ratio(s, r) for s, r in zip(data["stroke"], data["rod_length"])]
+    scalar_rod_stroke = [
+        calculate_rod_stroke_ratio(s, r) for s, r in zip(data["stroke"], data["rod_length"])
+    ]
+    _assert_rounded_parity(rl_ratio, scalar_rl)
+    _assert_rounded_parity(rod_stroke, scalar_rod_stroke)
+    assert vectorized.classify_smoothness(rl_ratio).tolist() == [
+        classify_smoothness(value) for value in scalar_rl
+    ]
+
+
+def test_smoothness_boundaries():
+    labels = vectorized.classify_smoothness([0.31, 0.30, 0.26, 0.25, 0.2])
+    assert labels.tolist() == ["rough", "rough", "normal", "normal", "smooth"]
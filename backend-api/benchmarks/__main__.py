@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import fnmatch
+import sys
+from pathlib import Path
+
+from benchmarks.history import HISTORY_PATH, append_run, compare_runs, load_runs
+from benchmarks.runner import (
+    MIN_BATCH_SECONDS,
+    QUICK_BATCH_SECONDS,
+    QUICK_REPEAT,
+    REPEAT,
+    environment,
+    measure,
+    measure_async,
+)
+
+
+def _selected(name: str, patterns: list[str]) -> bool:
+    return not patterns or any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def run(args: argparse.Namespace) -> int:
+    min_seconds = QUICK_BATCH_SECONDS if args.quick else MIN_BATCH_SECONDS
+    repeat = QUICK_REPEAT if args.quick else REPEAT
+    results = {}
+    if args.layer in ("micro", "all"):
+        from benchmarks.micro import micro_cases
+
+        for name, func in micro_cases():
+            name = f"micro:{name}"
+            if _selected(name, args.filter):
+                results[name] = measure(func, min_seconds, repeat)
+                _print_result(name, results[name])
+    if args.layer in ("macro", "all"):
+        from benchmarks.macro import macro_cases
+
+        loop = asyncio.new_event_loop()
+        try:
+            for name, func in macro_cases():
+                name = f"macro:{name}"
+                if _selected(name, args.filter):
+                    results[name] = measure_async(loop, func, min_seconds, repeat)
+                    _print_result(name, results[name])
+        finally:
+            loop.close()
+
+    run_record = {
+        **environment(),
+        "label": args.label,
+        "quick": args.quick,
+        "results": results,
+    }
+    if not args.no_save:
+        append_run(run_record, args.history)
+        print(f"saved {len(results)} results to {args.history}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    runs = load_runs(args.history)
+    try:
+        base = runs[args.base]
+        head = runs[args.head]
+    except IndexError:
+        print(f"need runs {args.base} and {args.head} in {args.history}, found {len(runs)}")
+        return 2
+    print(
+        f"base: {base.get('label') or base['timestamp']} ({base.get('commit')})  "
+        f"head: {head.get('label') or head['timestamp']} ({head.get('commit')})"
+    )
+    rows = compare_runs(base, head, args.threshold)
+    regressions = 0
+    for row in rows:
+        if row["status"] in ("ok", "improvement", "regression"):
+            print(
+                f"{row['status']:<12} {row['change_percent']:+7.1f}%  "
+                f"{row['base_ns'] / 1000.0:10.2f} -> {row['head_ns'] / 1000.0:10.2f} us  "
+                f"{row['name']}"
+            )
+        else:
+            print(f"{row['status']:<12} {'':>8}  {row['head_ns'] / 1000.0:27.2f} us  {row['name']}")
+        regressions += row["status"] == "regression"
+    print(f"{regressions} regression(s) beyond {args.threshold:.1f}%")
+    return 1 if regressions else 0
+
+
+def _print_result(name: str, result: dict) -> None:
+    print(
+        f"{result['min_ns'] / 1000.0:10.2f} us min  {result['median_ns'] / 1000.0:10.2f} us median"
+        f"  x{result['number']:<7} {name}",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run benchmarks and append to the history")
+    run_parser.add_argument("--layer", choices=("micro", "macro", "all"), default="all")
+    run_parser.add_argument("--filter", action="append", default=[], help="fnmatch pattern")
+    run_parser.add_argument("--quick", action="store_true", help="shorter, noisier batches")
+    run_parser.add_argument("--label", default=None)
+    run_parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    run_parser.add_argument("--no-save", action="store_true")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser("compare", help="compare two runs from the history")
+    compare_parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    compare_parser.add_argument("--base", type=int, default=-2, help="run index (default -2)")
+    compare_parser.add_argument("--head", type=int, default=-1, help="run index (default -1)")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.loadtest import BACKEND_DIR, STARTUP_TIMEOUT_SECONDS, _free_port, stop_server
+from benchmarks.macro import BENCH_KEY, load_corpus
+
+POLL_SECONDS = 0.002
+# First requests after /health: a single calculation, then a sweep (the numpy path).
+FIRST_REQUESTS = (("/v1/calc/rl", "metric"), ("/v1/calc/displacement/sweep", "columnar_2k"))
+
+
+def _request(port: int, method: str, route: str, body: bytes = b"") -> int:
+    # A raw HTTP/1.1 exchange keeps the poller cheap: on a small host it shares the CPU
+    # with the server it is timing.
+    head = (
+        f"{method} {route} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n"
+        f"X-PTP-Internal-Key: {BENCH_KEY}\r\nAuthorization: Bearer {BENCH_KEY}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    )
+    with socket.create_connection(("127.0.0.1", port), timeout=STARTUP_TIMEOUT_SECONDS) as sock:
+        sock.sendall(head.encode("ascii") + body)
+        response = b""
+        while b"\r\n\r\n" not in response:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+        length = 0
+        for line in response.split(b"\r\n\r\n", 1)[0].split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        received = len(response.split(b"\r\n\r\n", 1)[-1])
+        while received < length:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            received += len(chunk)
+    return int(response.split(b" ", 2)[1])
+
+
+def sample(extra_env: dict, bodies: list[tuple[str, bytes]]) -> dict:
+    port = _free_port()
+    env = {**os.environ, **extra_env, "PTP_INTERNAL_KEY": BENCH_KEY, "PTP_STARTUP_REPORT": "1"}
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "info",
+        "--no-access-log",
+    ]
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env=env, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        deadline = started + STARTUP_TIMEOUT_SECONDS
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            if time.perf_counter() > deadline:
+                raise RuntimeError("uvicorn did not answer /health in time")
+            try:
+                if _request(port, "GET", "/health") == 200:
+                    break
+            except OSError:
+                time.sleep(POLL_SECONDS)
+        result = {"health_ms": (time.perf_counter() - started) * 1000.0}
+        for route, body in bodies:
+            request_started = time.perf_counter()
+            status = _request(port, "POST", route, body)
+            if status != 200:
+                raise RuntimeError(f"{route} answered {status}")
+            result[route] = (time.perf_counter() - request_started) * 1000.0
+    finally:
+        stop_server(process)
+    report = [line.strip() for line in process.stderr if "Startup report" in line]
+    result["report"] = report[-1] if report else None
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--env", action="append", default=[], help="NAME=VALUE for the started server"
+    )
+    parser.add_argument("--output", type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus()
+    bodies = [
+        (route, json.dumps(corpus[route][name]).encode("utf-8")) for route, name in FIRST_REQUESTS
+    ]
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    samples = [sample(extra_env, bodies) for _ in range(args.repeat)]
+
+    report = {"server_env": extra_env, "samples": samples}
+    for field in ["health_ms", *(route for route, _ in FIRST_REQUESTS)]:
+        values = [sample_result[field] for sample_result in samples]
+        report[field] = {"min": round(min(values), 1), "median": round(statistics.median(values), 1)}
+        label = "process start -> /health" if field == "health_ms" else f"first {field}"
+        print(
+            f"{label:<45} min {report[field]['min']:>8.1f} ms   "
+            f"median {report[field]['median']:>8.1f} ms"
+        )
+    if samples[-1]["report"]:
+        print(samples[-1]["report"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+
+HISTORY_PATH = Path(__file__).resolve().parent / "history.jsonl"
+
+
+def append_run(run: dict, path: Path = HISTORY_PATH) -> None:
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(run, sort_keys=True) + "\n")
+
+
+def load_runs(path: Path = HISTORY_PATH) -> list[dict]:
+    if not Path(path).exists():
+        return []
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def compare_runs(base: dict, head: dict, threshold_percent: float) -> list[dict]:
+    # min_ns is the least noisy statistic on a shared host: noise only ever adds time.
+    # Only cases in the head run are compared, so a filtered run checks just its subset.
+    rows = []
+    base_results = base["results"]
+    head_results = head["results"]
+    for name in sorted(head_results):
+        head_ns = head_results[name]["min_ns"]
+        if name not in base_results:
+            rows.append({"name": name, "status": "new", "head_ns": head_ns})
+            continue
+        base_ns = base_results[name]["min_ns"]
+        change_percent = (head_ns - base_ns) / base_ns * 100.0
+        if change_percent > threshold_percent:
+            status = "regression"
+        elif change_percent < -threshold_percent:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "name": name,
+                "status": status,
+                "base_ns": base_ns,
+                "head_ns": head_ns,
+                "change_percent": round(change_percent, 1),
+            }
+        )
+    return rows
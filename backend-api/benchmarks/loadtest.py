@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from benchmarks.macro import BENCH_KEY, load_corpus
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SCENARIOS_DIR = Path(__file__).resolve().parent / "scenarios"
+STARTUP_TIMEOUT_SECONDS = 30.0
+
+
+class MixEntry:
+    __slots__ = ("route", "label", "body", "weight")
+
+    def __init__(self, route: str, label: str, body: bytes, weight: float):
+        self.route = route
+        self.label = label
+        self.body = body
+        self.weight = weight
+
+
+def load_scenario(path: Path, corpus: Optional[dict] = None) -> list[MixEntry]:
+    # Entries name a corpus payload ("payload") or carry their own ("body"), so mixes
+    # derived from production logs can be dropped in without touching the corpus.
+    with open(path, encoding="utf-8") as handle:
+        scenario = json.load(handle)
+    corpus = load_corpus() if corpus is None else corpus
+    entries = []
+    for item in scenario["mix"]:
+        route = item["route"]
+        if "body" in item:
+            body = item["body"]
+            label = item.get("label", "inline")
+        else:
+            body = corpus[route][item["payload"]]
+            label = item["payload"]
+        weight = float(item.get("weight", 1))
+        if weight <= 0:
+            raise ValueError(f"{path}: weight must be positive for {route} [{label}]")
+        entries.append(MixEntry(route, label, json.dumps(body).encode("utf-8"), weight))
+    if not entries:
+        raise ValueError(f"{path}: empty mix")
+    return entries
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(
+    latencies: dict[str, list[float]], errors: dict[str, int], elapsed_seconds: float
+) -> dict:
+    routes = {}
+    for route in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(route, []))
+        failed = errors.get(route, 0)
+        requests = len(values) + failed
+        routes[route] = {
+            "requests": requests,
+            "errors": failed,
+            "error_rate": round(failed / requests, 4) if requests else 0.0,
+            "rps": round(requests / elapsed_seconds, 1),
+            "p50_ms": round(percentile(values, 50) * 1000.0, 2),
+            "p95_ms": round(percentile(values, 95) * 1000.0, 2),
+            "p99_ms": round(percentile(values, 99) * 1000.0, 2),
+        }
+    all_values = sorted(value for values in latencies.values() for value in values)
+    failed = sum(errors.values())
+    requests = len(all_values) + failed
+    total = {
+        "requests": requests,
+        "errors": failed,
+        "error_rate": round(failed / requests, 4) if requests else 0.0,
+        "rps": round(requests / elapsed_seconds, 1),
+        "p50_ms": round(percentile(all_values, 50) * 1000.0, 2),
+        "p95_ms": round(percentile(all_values, 95) * 1000.0, 2),
+        "p99_ms": round(percentile(all_values, 99) * 1000.0, 2),
+    }
+    return {"total": total, "routes": routes}
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    mix: list[MixEntry],
+    concurrency: int,
+    duration_seconds: float,
+    warmup_seconds: float = 0.0,
+    seed: int = 0,
+) -> dict:
+    # Closed loop: each of the `concurrency` virtual users sends its next request as soon
+    # as the previous one completes. Requests finishing during warm-up are not counted.
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    weights = [entry.weight for entry in mix]
+    perf_counter = time.perf_counter
+    started = perf_counter()
+    measure_from = started + warmup_seconds
+    deadline = measure_from + duration_seconds
+
+    async def user(index: int) -> None:
+        rng = random.Random(seed * 100003 + index)
+        while True:
+            entry = rng.choices(mix, weights)[0]
+            sent = perf_counter()
+            if sent >= deadline:
+                return
+            try:
+                response = await client.post(entry.route, content=entry.body)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            finished = perf_counter()
+            if finished < measure_from or finished > deadline:
+                continue
+            if ok:
+                latencies.setdefault(entry.route, []).append(finished - sent)
+            else:
+                errors[entry.route] = errors.get(entry.route, 0) + 1
+
+    cpu_started = time.process_time()
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    client_cpu = time.process_time() - cpu_started
+    wall = perf_counter() - started
+    result = summarize(latencies, errors, duration_seconds)
+    # Near 1.0 means the single-threaded generator, not the server, set the pace.
+    result["client_cpu_utilization"] = round(client_cpu / wall, 2) if wall else 0.0
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, key: str, extra_env: dict) -> subprocess.Popen:
+    env = {**os.environ, **extra_env, "PTP_INTERNAL_KEY": key}
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    stop_server(process)
+    raise RuntimeError(f"uvicorn did not answer /health within {STARTUP_TIMEOUT_SECONDS:.0f} s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def _run_against(
+    base_url: str, key: str, mix: list[MixEntry], concurrency: int, args: argparse.Namespace
+) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {
+        "Content-Type": "application/json",
+        "X-PTP-Internal-Key": key,
+        "Authorization": f"Bearer {key}",
+    }
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+        return await run_load(client, mix, concurrency, args.duration, args.warmup, args.seed)
+
+
+def _print_result(workers: Optional[int], concurrency: int, result: dict) -> None:
+    print(
+        f"\nworkers={workers if workers is not None else '-'} concurrency={concurrency} "
+        f"client_cpu={result['client_cpu_utilization']:.2f}"
+    )
+    print(f"{'route':<34} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>8}")
+    rows = [*result["routes"].items(), ("TOTAL", result["total"])]
+    for route, stats in rows:
+        print(
+            f"{route:<34} {stats['rps']:>8.1f} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+            f"{stats['p99_ms']:>8.2f} {stats['error_rate'] * 100.0:>7.2f}%"
+        )
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    parser.add_argument("--scenario", type=Path, default=SCENARIOS_DIR / "calculators_mix.json")
+    parser.add_argument("--workers", type=_int_list, default=[1], help="e.g. 1,2,4")
+    parser.add_argument("--concurrency", type=_int_list, default=[8], help="e.g. 4,16,64")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds per run")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=None, help="target a running server instead")
+    parser.add_argument("--key", default=None, help="internal key (default: env or bench key)")
+    parser.add_argument(
+        "--env", action="append", default=[], help="NAME=VALUE for the started server"
+    )
+    parser.add_argument("--output", type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    mix = load_scenario(args.scenario)
+    key = args.key or os.getenv("PTP_INTERNAL_KEY") or BENCH_KEY
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    runs = []
+    for workers in [None] if args.url else args.workers:
+        process = None
+        base_url = args.url
+        if base_url is None:
+            port = _free_port()
+            process = start_server(workers, port, key, extra_env)
+            base_url = f"http://127.0.0.1:{port}"
+        try:
+            for concurrency in args.concurrency:
+                result = asyncio.run(_run_against(base_url, key, mix, concurrency, args))
+                _print_result(workers, concurrency, result)
+                runs.append({"workers": workers, "concurrency": concurrency, **result})
+        finally:
+            if process is not None:
+                stop_server(process)
+
+    if args.output:
+        report = {
+            "scenario": str(args.scenario),
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "server_env": extra_env,
+            "runs": runs,
+        }
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
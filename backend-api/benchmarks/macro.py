@@ -0,0 +1,84 @@
+import json
+import os
+from pathlib import Path
+from typing import Awaitable, Callable
+
+CORPUS_PATH = Path(__file__).resolve().parent / "corpus.json"
+BENCH_KEY = "bench-key"
+
+AsyncBenchCase = tuple[str, Callable[[], Awaitable[object]]]
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> dict[str, dict[str, dict]]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _scope(route: str, body: bytes, key: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": route,
+        "raw_path": route.encode("ascii"),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"x-ptp-internal-key", key.encode("latin-1")),
+            (b"authorization", b"Bearer " + key.encode("latin-1")),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+def asgi_post(app, route: str, payload: dict, key: str) -> Callable[[], Awaitable[bytes]]:
+    # Drives the full ASGI stack (middleware, validation, handler, serialization) without
+    # a socket, so the numbers exclude the server and the network.
+    body = json.dumps(payload).encode("utf-8")
+    scope = _scope(route, body, key)
+
+    async def call() -> bytes:
+        sent = False
+        status = None
+        chunks = []
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await app(dict(scope), receive, send)
+        response = b"".join(chunks)
+        if status != 200:
+            raise RuntimeError(f"{route} returned {status}: {response[:200]!r}")
+        return response
+
+    return call
+
+
+def macro_cases(corpus: dict[str, dict[str, dict]] | None = None) -> list[AsyncBenchCase]:
+    os.environ.setdefault("PTP_INTERNAL_KEY", BENCH_KEY)
+    from app.main import app
+
+    key = os.environ["PTP_INTERNAL_KEY"]
+    corpus = load_corpus() if corpus is None else corpus
+    return [
+        (f"{route}[{name}]", asgi_post(app, route, payload, key))
+        for route, payloads in corpus.items()
+        for name, payload in payloads.items()
+    ]
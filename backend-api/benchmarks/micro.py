@@ -0,0 +1,127 @@
+from functools import partial
+from types import SimpleNamespace
+from typing import Callable
+
+import numpy as np
+
+from app.calculators import common, compression, displacement, rl, sprocket, tires, vectorized
+from app.core.metrics import MetricsRegistry, RequestTimings
+from app.data.tires_db import flotation_dimensions, get_tire_catalog
+
+# A name, and a zero-argument callable running one kernel on fixed, representative inputs.
+BenchCase = tuple[str, Callable[[], object]]
+
+_SWEEP = np.linspace(50.0, 100.0, 1000)
+
+
+def micro_cases() -> list[BenchCase]:
+    # Imported here so the app (and its startup work) only loads when micro cases run.
+    from app.main import validate_against_db
+
+    catalog = get_tire_catalog()
+    car = SimpleNamespace(
+        vehicle_type="Car", rim_in=16, width_mm=205, aspect_percent=55, flotation=None
+    )
+    truck = SimpleNamespace(
+        vehicle_type="LightTruck",
+        rim_in=15,
+        width_mm=None,
+        aspect_percent=None,
+        flotation="31x10.5R15",
+    )
+    # The per-request bookkeeping of MetricsMiddleware on a /v1/calc/* route (all phases).
+    registry = MetricsRegistry()
+    timings = RequestTimings()
+    timings.handler_started = 1.0002
+    timings.compute_finished = 1.0005
+    cases = [
+        ("common.percent_diff", partial(common.percent_diff, 1998.0, 1796.0)),
+        ("common.absolute_diff", partial(common.absolute_diff, 1998.0, 1796.0)),
+        ("compression.swept_volume_cc", partial(compression.swept_volume_cc, 86.0, 86.0)),
+        ("compression.gasket_volume_cc", partial(compression.gasket_volume_cc, 87.0, 1.0)),
+        ("compression.deck_volume_cc", partial(compression.deck_volume_cc, 86.0, 0.2)),
+        (
+            "compression.clearance_volume_cc",
+            partial(compression.clearance_volume_cc, 50.0, 5.9, 1.2, -3.0),
+        ),
+        ("compression.compression_ratio", partial(compression.compression_ratio, 499.6, 54.1)),
+        (
+            "compression.trapped_swept_volume_cc",
+            partial(compression.trapped_swept_volume_cc, 56.0, 54.5, 28.0),
+        ),
+        ("displacement.classify_geometry", partial(displacement.classify_geometry, 86.0, 86.0)),
+        (
+            "displacement.calculate_displacement_cc",
+            partial(displacement.calculate_displacement_cc, 86.0, 86.0, 4),
+        ),
+        (
+            "displacement.displacement_results",
+            partial(displacement.displacement_results, 86.0, 86.0, 4, 1800.0),
+        ),
+        ("rl.calculate_rl_ratio", partial(rl.calculate_rl_ratio, 54.5, 110.0)),
+        ("rl.calculate_rod_stroke_ratio", partial(rl.calculate_rod_stroke_ratio, 54.5, 110.0)),
+        ("rl.classify_smoothness", partial(rl.classify_smoothness, 2.02)),
+        ("sprocket.calculate_ratio", partial(sprocket.calculate_ratio, 42, 14)),
+        ("sprocket.chain_pitch_to_mm", partial(sprocket.chain_pitch_to_mm, "520")),
+        (
+            "sprocket.calculate_chain_length_mm",
+            partial(sprocket.calculate_chain_length_mm, 108, 15.875),
+        ),
+        (
+            "sprocket.chain_links_for_center_distance",
+            partial(sprocket.chain_links_for_center_distance, 14, 42, 15.875, 560.0),
+        ),
+        (
+            "sprocket.solve_center_distance",
+            partial(sprocket.solve_center_distance, 14, 42, 15.875, 108),
+        ),
+        (
+            "sprocket.calculate_center_distance_mm",
+            partial(sprocket.calculate_center_distance_mm, 14, 42, 15.875, 108),
+        ),
+        (
+            "sprocket.search_gearing",
+            partial(
+                sprocket.search_gearing, 3.1, 15.875, (10, 20), (30, 60), (90, 140), (0, 1000), 10
+            ),
+        ),
+        ("tires.parse_flotation", partial(tires.parse_flotation, "31x10.5R15")),
+        ("tires.parse_motorcycle_flotation", partial(tires.parse_motorcycle_flotation, "4.10-18")),
+        ("tires.calculate_diameter_mm", partial(tires.calculate_diameter_mm, 16, 205, 55)),
+        (
+            "tires.flotation_dimensions_mm",
+            partial(tires.flotation_dimensions_mm, "LightTruck", "31x10.5R15"),
+        ),
+        (
+            "tires.calculate_assembly_width_mm",
+            partial(tires.calculate_assembly_width_mm, 205, 7.0),
+        ),
+        (
+            "tires_db.flotation_dimensions",
+            partial(flotation_dimensions, "LightTruck", "31x10.5R15"),
+        ),
+        ("main.validate_against_db[width]", partial(validate_against_db, catalog, car, "")),
+        ("main.validate_against_db[flotation]", partial(validate_against_db, catalog, truck, "")),
+        (
+            "metrics.MetricsRegistry.observe",
+            partial(registry.observe, "/v1/calc/rl", "POST", 200, 1.0, 1.0006, 1.0007, timings),
+        ),
+    ]
+    sweep = _SWEEP
+    vectorized_args = {
+        "calculate_displacement_cc": (sweep, sweep, 4),
+        "classify_geometry": (sweep, sweep),
+        "swept_volume_cc": (sweep, sweep),
+        "gasket_volume_cc": (sweep, 1.0),
+        "deck_volume_cc": (sweep, 0.2),
+        "clearance_volume_cc": (sweep, 5.9, 1.2, -3.0),
+        "compression_ratio": (sweep * 10.0, sweep),
+        "trapped_swept_volume_cc": (sweep, sweep, 20.0),
+        "calculate_rl_ratio": (sweep, sweep * 2.0),
+        "calculate_rod_stroke_ratio": (sweep, sweep * 2.0),
+        "classify_smoothness": (sweep / 25.0,),
+    }
+    for name, args in vectorized_args.items():
+        func = getattr(vectorized, name)
+        cases.append((f"vectorized.{name}[{sweep.size}]", partial(func, *args)))
+    return cases
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+MIN_BATCH_SECONDS = 0.05
+QUICK_BATCH_SECONDS = 0.01
+REPEAT = 5
+QUICK_REPEAT = 3
+
+
+def _calibrate(timed: Callable[[int], float], min_seconds: float) -> int:
+    # The first call pays for imports, caches and thread start-up; keep it out of the numbers.
+    timed(1)
+    number = 1
+    while True:
+        if timed(number) >= min_seconds or number >= 1_000_000:
+            return number
+        number *= 2
+
+
+def _summary(samples: list[float], number: int) -> dict:
+    per_op = [sample / number * 1e9 for sample in samples]
+    return {
+        "min_ns": round(min(per_op), 1),
+        "median_ns": round(statistics.median(per_op), 1),
+        "number": number,
+        "repeat": len(per_op),
+    }
+
+
+def measure(func: Callable[[], object], min_seconds: float, repeat: int) -> dict:
+    perf_counter = time.perf_counter
+
+    def timed(number: int) -> float:
+        started = perf_counter()
+        for _ in range(number):
+            func()
+        return perf_counter() - started
+
+    number = _calibrate(timed, min_seconds)
+    return _summary([timed(number) for _ in range(repeat)], number)
+
+
+def measure_async(
+    loop: asyncio.AbstractEventLoop,
+    func: Callable[[], Awaitable[object]],
+    min_seconds: float,
+    repeat: int,
+) -> dict:
+    # The loop is entered once per batch, so its own start-up cost stays out of the numbers.
+    perf_counter = time.perf_counter
+
+    async def batch(number: int) -> float:
+        started = perf_counter()
+        for _ in range(number):
+            await func()
+        return perf_counter() - started
+
+    def timed(number: int) -> float:
+        return loop.run_until_complete(batch(number))
+
+    number = _calibrate(timed, min_seconds)
+    return _summary([timed(number) for _ in range(repeat)], number)
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
@@ -0,0 +1,162 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from app.calculators.tires import calculate_diameter_mm
+from app.data.tires_catalog import compile_catalog, db_from_records
+from app.data.tires_db import TIRES_DB
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SYNTHETIC_VEHICLES = ("Car", "Motorcycle", "LightTruck", "TruckCommercial", "Kart", "Kartcross")
+FLOTATION_VEHICLES = ("LightTruck", "Kartcross")
+
+# Runs in a fresh interpreter per sample: "literal" imports a generated TIRES_DB module and
+# indexes it the way tires_db does at import, "mapped" opens the compiled file. Both then
+# run the same diameter sweep, which touches every size, and report the RSS split from
+# /proc: RssAnon is private to the worker, RssFile pages are shared by every worker.
+CHILD = """
+import json, sys, time
+
+def memory():
+    fields = {}
+    with open("/proc/self/status") as handle:
+        for line in handle:
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "RssAnon", "RssFile"):
+                fields[name] = int(value.split()[0])
+    return fields
+
+mode, target = sys.argv[1], sys.argv[2]
+from app.data.tires_catalog import MappedTireCatalog
+from app.data.tires_db import IndexedTireCatalog
+before = memory()
+started = time.perf_counter()
+if mode == "literal":
+    sys.path.insert(0, target)
+    from synthetic_tires import TIRES_DB
+    catalog = IndexedTireCatalog(TIRES_DB)
+else:
+    catalog = MappedTireCatalog(target)
+loaded = time.perf_counter()
+opened = memory()
+for diameter_mm in range(200, 1600):
+    catalog.sizes_within(float(diameter_mm), 0.05)
+print(json.dumps({
+    "startup_ms": (loaded - started) * 1000.0,
+    "opened": {name: value - before[name] for name, value in opened.items()},
+    "queried": {name: value - before[name] for name, value in memory().items()},
+}))
+"""
+
+
+def synthetic_db(vehicle_count: int, rims: range, widths: range, aspects: range) -> dict:
+    records = []
+    for vehicle_type in SYNTHETIC_VEHICLES[:vehicle_count]:
+        for rim in rims:
+            for width in widths:
+                for aspect in aspects:
+                    records.append(
+                        {
+                            "vehicle_type": vehicle_type,
+                            "rim_in": rim,
+                            "width_mm": width,
+                            "aspect_percent": aspect,
+                        }
+                    )
+                if vehicle_type in FLOTATION_VEHICLES:
+                    overall_in = round(calculate_diameter_mm(rim, width, aspects[0]) / 25.4)
+                    records.append(
+                        {
+                            "vehicle_type": vehicle_type,
+                            "rim_in": rim,
+                            "width_mm": width,
+                            "flotation": f"{overall_in}x{width / 25.4:.1f}R{rim}",
+                        }
+                    )
+    return db_from_records(records)
+
+
+def _sample(mode: str, target: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, mode, target],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def measure_dataset(name: str, db: dict, workdir: Path, repeat: int) -> dict:
+    literal_dir = workdir / name
+    literal_dir.mkdir()
+    module = literal_dir / "synthetic_tires.py"
+    module.write_text(f"TIRES_DB = {db!r}\n", encoding="utf-8")
+    catalog_path = workdir / f"{name}.bin"
+    header = compile_catalog(db, str(catalog_path))
+
+    result = {
+        "sizes": header["sizes"],
+        "literal_source_bytes": module.stat().st_size,
+        "catalog_bytes": catalog_path.stat().st_size,
+        # The first import also compiles the module to bytecode, as after a fresh deploy.
+        "literal_first_import_ms": round(_sample("literal", str(literal_dir))["startup_ms"], 2),
+    }
+    for mode, target in (("literal", str(literal_dir)), ("mapped", str(catalog_path))):
+        samples = [_sample(mode, target) for _ in range(repeat)]
+        result[mode] = {
+            "startup_ms": round(min(sample["startup_ms"] for sample in samples), 2),
+            **{
+                f"{stage}_{field}_kib": statistics.median(
+                    sample[stage][field] for sample in samples
+                )
+                for stage in ("opened", "queried")
+                for field in ("VmRSS", "RssAnon", "RssFile")
+            },
+        }
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.tire_catalog")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    datasets = {
+        "builtin": TIRES_DB,
+        "synthetic": synthetic_db(6, range(12, 31), range(105, 405, 5), range(30, 85, 5)),
+    }
+    report = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, db in datasets.items():
+            report[name] = result = measure_dataset(name, db, Path(workdir), args.repeat)
+            print(
+                f"\n{name}: {result['sizes']} sizes, literal {result['literal_source_bytes']} B, "
+                f"catalog {result['catalog_bytes']} B, "
+                f"literal first import {result['literal_first_import_ms']:.1f} ms"
+            )
+            print(
+                f"{'mode':<8} {'startup ms':>11} {'anon KiB':>9} {'file KiB':>9} "
+                f"{'anon KiB after sweep':>21} {'file KiB after sweep':>20}"
+            )
+            for mode in ("literal", "mapped"):
+                stats = result[mode]
+                print(
+                    f"{mode:<8} {stats['startup_ms']:>11.2f} {stats['opened_RssAnon_kib']:>9.0f} "
+                    f"{stats['opened_RssFile_kib']:>9.0f} {stats['queried_RssAnon_kib']:>21.0f} "
+                    f"{stats['queried_RssFile_kib']:>20.0f}"
+                )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())